@@ -1,53 +1,303 @@
-from flask import Flask, render_template, request, redirect, url_for, jsonify, session
+from flask import Flask, Response, render_template, request, redirect, url_for, jsonify, session
+import functools
 import json
+import math
 import random
 import time
 import os
-from transformers import pipeline
+import uuid
 import numpy as np
 import pickle
-import torch
-from src.rl_env import AdaptiveLearningEnv
-from src.nlp_feedback import correct_grammar
-from src.data_loader import load_dataset
+# torch, transformers, stable_baselines3 and the grammar model are imported on
+# first use (or by warm_up) so that worker boot stays fast and light
+from src.question_bank import open_question_bank
+from src.spaced_repetition import QuestionScheduler
+from src.model_registry import ModelRegistry
+from src.grammar_batcher import GrammarBatcher, correct_grammar_batch, grammar_model_id
+from src.grammar_cache import GrammarCache
+from src.paragraph import correct_paragraph, split_sentences
+from src.grammar_filter import DEFAULT_THRESHOLD, GrammarFilter, TieredCorrector
+from src.learner_store import make_learner_store
+from src.learner_features import check_feature_schema
+from src.job_queue import QueueFull, make_job_queue
+from src.metrics import Metrics
 
 app = Flask(__name__)
 app.secret_key = "adaptive_ai_tutor_secret_key"  # For session management
 
-# Load questions from JSON file
-def load_questions(file_path='questions.json'):
-    """Load questions from a JSON file."""
+# Per-route and per-stage latency histograms, error counts and cache stats on
+# /metrics (Prometheus text format). Set PROFILE_SLOW_MS to sample the stacks
+# of every request and write those slower than that to PROFILE_DIR as
+# flamegraph-ready .folded files.
+metrics = Metrics(
+    profile_slow_ms=float(os.environ["PROFILE_SLOW_MS"]) if os.environ.get("PROFILE_SLOW_MS") else None,
+    profile_dir=os.environ.get("PROFILE_DIR", "profiles"),
+)
+metrics.instrument(app)
+
+# Questions are loaded once and re-indexed only when the file changes; point
+# QUESTION_BANK at a .qbank file to share one memory-mapped copy across workers
+question_bank = open_question_bank(os.environ.get("QUESTION_BANK", "questions.json"))
+# Per-learner Leitner schedule: due reviews first, then unseen questions, no recent repeats.
+# It is kept per worker, so with several workers those guarantees hold per worker only.
+question_scheduler = QuestionScheduler(question_bank)
+
+ML_MODEL_PATH = "model/next_difficulty_model.pkl"
+# Set to an export_forest.py artifact to serve the forest from flat arrays
+ML_FOREST_PATH = os.environ.get("ML_FOREST_PATH")
+RL_MODEL_PATH = "model/adaptive_difficulty_dqn_v4.zip"
+# Set to an export_policy.py artifact to serve the RL policy without torch
+RL_POLICY_PATH = os.environ.get("RL_POLICY_PATH")
+# Set to a build_decision_table.py artifact to serve RL decisions by table lookup;
+# the network above is then only loaded for states outside the table's grid
+RL_TABLE_PATH = os.environ.get("RL_TABLE_PATH")
+
+# The ML model must have been fitted on the features the learner store builds;
+# one trained on another column layout is refused rather than fed misaligned inputs
+def _load_pickle(path):
+    with open(path, "rb") as f:
+        return check_feature_schema(pickle.load(f), path)
+
+def _load_forest(path):
+    from src.forest_export import CompiledForest
+    return check_feature_schema(CompiledForest(path), path)
+
+def _load_dqn(path):
+    from stable_baselines3 import DQN
+    return DQN.load(path)
+
+def _load_policy(path):
+    from src.policy_export import PolicyRunner
+    return PolicyRunner(path)
+
+def _load_table(path):
+    from src.decision_table import DecisionTable
+    return DecisionTable(path, fallback=lambda: model_registry.get("rl_network"))
+
+# Models are loaded once per worker and hot-swapped when a new file lands on disk
+model_registry = ModelRegistry()
+if ML_FOREST_PATH:
+    model_registry.register("ml", ML_FOREST_PATH, _load_forest)
+else:
+    model_registry.register("ml", ML_MODEL_PATH, _load_pickle)
+rl_network_name = "rl_network" if RL_TABLE_PATH else "rl"
+if RL_POLICY_PATH:
+    model_registry.register(rl_network_name, RL_POLICY_PATH, _load_policy)
+else:
+    model_registry.register(rl_network_name, RL_MODEL_PATH, _load_dqn)
+if RL_TABLE_PATH:
+    model_registry.register("rl", RL_TABLE_PATH, _load_table)
+
+# Concurrent grammar requests are grouped into one pipeline call
+grammar_batcher = GrammarBatcher(
+    max_batch_size=int(os.environ.get("GRAMMAR_MAX_BATCH_SIZE", 16)),
+    max_wait_ms=float(os.environ.get("GRAMMAR_MAX_WAIT_MS", 5)),
+)
+MAX_BATCH_SENTENCES = 256
+MAX_BATCH_ATTEMPTS = 500
+MAX_ANSWER_AGE = 30 * 24 * 3600  # seconds; older offline answers would backdate the review schedule
+MAX_PARAGRAPH_CHARS = 20000
+
+# Corrections are cached per (model, normalized sentence); set GRAMMAR_CACHE_DB
+# to keep them across restarts. The model id follows src/nlp_feedback.py and,
+# with GRAMMAR_WEIGHTS_PATH, the weights' mtime, so a new model starts cold.
+grammar_cache = GrammarCache(
+    model_id=os.environ.get("GRAMMAR_MODEL_ID") or grammar_model_id(os.environ.get("GRAMMAR_WEIGHTS_PATH")),
+    max_size=int(os.environ.get("GRAMMAR_CACHE_SIZE", 10000)),
+    ttl=float(os.environ.get("GRAMMAR_CACHE_TTL", 24 * 3600)),
+    db_path=os.environ.get("GRAMMAR_CACHE_DB"),
+)
+
+# Cache misses first go through a cheap filter trained by train_grammar_filter.py;
+# sentences it is confident need no more than trivial fixes skip the model.
+# Raise GRAMMAR_FILTER_THRESHOLD to skip more, lower it to be more careful.
+GRAMMAR_FILTER_PATH = os.environ.get("GRAMMAR_FILTER_PATH")
+grammar_engine = TieredCorrector(
+    grammar_batcher.correct_many,
+    GrammarFilter.load(GRAMMAR_FILTER_PATH) if GRAMMAR_FILTER_PATH else None,
+    threshold=float(os.environ.get("GRAMMAR_FILTER_THRESHOLD", DEFAULT_THRESHOLD)),
+)
+
+# /run_simulation?mode=async runs on this bounded pool; when it is full new
+# jobs are rejected with 503 instead of tying up request threads. Job records go
+# to SIMULATION_JOBS_DB (default: the LEARNER_STORE_DB file) so that any worker
+# can answer a poll; without either they stay in the accepting process.
+simulation_jobs = make_job_queue(
+    os.environ.get("SIMULATION_JOBS_DB") or os.environ.get("LEARNER_STORE_DB"),
+    max_workers=int(os.environ.get("SIMULATION_WORKERS", 4)),
+    max_pending=int(os.environ.get("SIMULATION_MAX_PENDING", 32)),
+    result_ttl=float(os.environ.get("SIMULATION_RESULT_TTL", 600)),
+)
+
+# Learner progress lives server-side; the cookie only carries the learner id.
+# Set LEARNER_STORE_DB to keep it in SQLite across workers and restarts; without
+# it progress is per process and the app must run as a single worker.
+learner_store = make_learner_store(os.environ.get("LEARNER_STORE_DB"))
+
+def check_worker_count(workers):
+    """Refuse to serve from several processes when per-process state would diverge between them."""
+    if workers > 1 and not learner_store.shared_across_processes:
+        raise RuntimeError(
+            f"{workers} workers would each keep their own learner progress; "
+            "set LEARNER_STORE_DB to share it, or run a single worker."
+        )
+    if workers > 1 and not simulation_jobs.shared_across_processes:
+        raise RuntimeError(
+            f"{workers} workers would each keep their own simulation jobs, so polls would miss them; "
+            "set SIMULATION_JOBS_DB (or LEARNER_STORE_DB), or run a single worker."
+        )
+
+def _collect_stats():
+    cache = grammar_cache.stats()
+    batcher = grammar_batcher.stats()
+    engine = grammar_engine.stats()
+    jobs = simulation_jobs.stats()
+    models = model_registry.describe()
+    return [
+        ('grammar_cache_lookups_total', 'counter', 'Grammar cache lookups by tier that answered them.',
+         [({'result': 'memory_hit'}, cache['hits']), ({'result': 'disk_hit'}, cache['disk_hits']),
+          ({'result': 'miss'}, cache['misses'])]),
+        ('grammar_cache_hit_ratio', 'gauge', 'Share of grammar cache lookups served from either tier.',
+         [({}, cache['hit_rate'])]),
+        ('grammar_cache_entries', 'gauge', 'Corrections held in the in-process cache tier.',
+         [({}, cache['entries'])]),
+        ('grammar_fast_path_total', 'counter', 'Cache misses checked by the grammar filter, by outcome.',
+         [({'result': 'skipped'}, engine['skipped']), ({'result': 'model'}, engine['checked'] - engine['skipped']),
+          ({'result': 'other_language'}, engine['other_language'])]),
+        ('grammar_filter_rule_hits_total', 'counter', 'Sentences sent to the model by a filter rule.',
+         [({'rule': rule}, hits) for rule, hits in engine['rule_hits'].items()]),
+        ('grammar_batches_total', 'counter', 'Grammar pipeline calls made by the batcher.',
+         [({}, batcher['batches'])]),
+        ('grammar_batch_sentences_total', 'counter', 'Sentences sent through the grammar pipeline.',
+         [({}, batcher['sentences'])]),
+        ('model_gets_total', 'counter', 'Model registry lookups by model.',
+         [({'model': name}, handle['gets']) for name, handle in models.items()]),
+        ('model_loads_total', 'counter', 'Model loads from disk by model; gets minus loads were cache hits.',
+         [({'model': name}, handle['loads']) for name, handle in models.items()]),
+        ('model_load_seconds', 'gauge', 'Duration of the last load by model.',
+         [({'model': name}, handle['load_seconds']) for name, handle in models.items()]),
+        ('simulation_jobs', 'gauge', 'Simulation jobs by state.',
+         [({'state': 'queued'}, jobs['queued']), ({'state': 'running'}, jobs['running'])]),
+        ('simulation_jobs_rejected_total', 'counter', 'Simulation jobs rejected because the queue was full.',
+         [({}, jobs['rejected'])]),
+        ('scheduled_learners', 'gauge', 'Learners with a question schedule in this worker.',
+         [({}, question_scheduler.stats()['learners'])]),
+    ]
+
+metrics.add_collector(_collect_stats)
+
+_preloaded = False
+_warmed_up_pid = None
+
+def preload():
+    """
+    Load every model and heavy dependency now instead of on the first request,
+    without running any inference.
+
+    gunicorn.conf.py calls it in the master with preload_app, so the loaded
+    weights are shared copy-on-write by all forked workers. Nothing here may
+    start torch's or OpenMP's thread pools: forking a process that has them
+    running can hang the children.
+    """
+    global _preloaded
+    if _preloaded:
+        return
+    start = time.perf_counter()
+    for name in model_registry.names():
+        model_registry.get(name)
+    import src.rl_env  # noqa: F401  (gymnasium)
+    import src.nlp_feedback  # noqa: F401  (loads the grammar model's weights)
+    print(f"✅ Models loaded in {time.perf_counter() - start:.1f}s")
+    _preloaded = True
+
+def warm_up():
+    """
+    `preload`, then one grammar correction and one RL decision so the first
+    request does not pay for lazy initialization. Runs once per process:
+    call it in each worker after the fork (gunicorn's post_fork), never in
+    the master.
+    """
+    global _warmed_up_pid
+    if _warmed_up_pid == os.getpid():
+        return
+    preload()
+    start = time.perf_counter()
+    correct_grammar_batch(["This is a warm-up sentence."])
+    from src.rl_env import AdaptiveLearningEnv
+    rl_model = model_registry.get("rl")
+    if rl_model is not None:
+        rl_model.predict(AdaptiveLearningEnv().reset()[0], deterministic=True)
+    print(f"✅ Worker {os.getpid()} warmed up in {time.perf_counter() - start:.1f}s")
+    _warmed_up_pid = os.getpid()
+
+def current_learner_id():
+    if 'learner_id' not in session:
+        session['learner_id'] = uuid.uuid4().hex
+    return session['learner_id']
+
+def grammar_language(learner_id):
+    """Language the learner writes in, which decides whether the grammar filter may answer."""
+    return learner_store.get(learner_id).language
+
+def correct_sentences(sentences, language):
+    """Correct a list of sentences, serving repeats from the cache. Only model corrections are cached."""
+    with metrics.stage("grammar"):
+        fast_path = functools.partial(grammar_engine.fast_path, language=language)
+        return grammar_cache.get_or_compute_many(sentences, grammar_engine.correct_many, fast_path)
+
+# Difficulty after an answer: one level up when correct, one down when not
+DIFFICULTY_UP = {"easy": "medium", "medium": "hard", "hard": "medium"}
+DIFFICULTY_DOWN = {"medium": "easy", "hard": "medium"}
+
+def answer_seconds(value):
+    """A client-measured answer time, or None unless it is a finite, non-negative number of seconds."""
+    return value if value is not None and math.isfinite(value) and value >= 0 else None
+
+def json_number(value):
+    """A JSON number as a finite float, or None for anything else (true/false, inf, nan, strings)."""
+    # bool is an int subclass, but true/false are not durations or times
+    if not isinstance(value, (int, float)) or isinstance(value, bool):
+        return None
     try:
-        with open(file_path, 'r', encoding='utf-8') as file:
-            questions = json.load(file)
-        return questions
-    except FileNotFoundError:
-        print("❌ Error: Questions file not found.")
-        return []
-    except json.JSONDecodeError:
-        print("❌ Error: Failed to decode JSON file.")
-        return []
+        value = float(value)
+    except OverflowError:
+        return None
+    return value if math.isfinite(value) else None
+
+def next_difficulty_after(current_difficulty, correct):
+    if correct:
+        return DIFFICULTY_UP.get(current_difficulty, "medium")
+    return DIFFICULTY_DOWN.get(current_difficulty, "easy")
+
+def accuracy_feedback(learner):
+    """Overall accuracy in percent and the matching study suggestion."""
+    if learner.attempts == 0:
+        return 0, ""
+    accuracy = learner.accuracy * 100
+    if accuracy < 50:
+        suggestion = "Focus on reviewing the basics to improve your understanding."
+    elif accuracy < 80:
+        suggestion = "You're doing well! Keep practicing to reach mastery."
+    else:
+        suggestion = "Excellent work! Consider trying harder questions for a challenge."
+    return accuracy, suggestion
+
+def schedule_answer(learner_id, question_id, correct, now=None):
+    """Move the question through the learner's review schedule, as of `now` (default: the current time)."""
+    question = question_bank.get(question_id) if question_id is not None else None
+    if question is not None:
+        question_scheduler.record(learner_id, question_id, correct, question.get("language"), question.get("difficulty"),
+                                  now)
 
 # Load ML model for predicting next difficulty
 def load_ml_model():
-    try:
-        with open("model/next_difficulty_model.pkl", "rb") as f:
-            return pickle.load(f)
-    except FileNotFoundError:
-        print("❌ Error: ML model file not found.")
-        return None
+    with metrics.stage("ml_load"):
+        return model_registry.get("ml")
 
 # Load RL model
 def load_rl_model():
-    try:
-        from stable_baselines3 import DQN
-        return DQN.load("model/adaptive_difficulty_dqn_v4.zip")
-    except FileNotFoundError:
-        print("❌ Error: RL model file not found.")
-        return None
-    except Exception as e:
-        print(f"❌ Error loading RL model: {e}")
-        return None
+    with metrics.stage("rl_load"):
+        return model_registry.get("rl")
 
 # Home page route
 @app.route('/')
@@ -57,36 +307,31 @@ def home():
 # Main Tutor routes
 @app.route('/main_tutor', methods=['GET', 'POST'])
 def main_tutor():
-    if 'current_difficulty' not in session:
-        session['current_difficulty'] = "easy"
-    if 'user_performance' not in session:
-        session['user_performance'] = {"correct": 0, "incorrect": 0}
-    if 'language' not in session:
-        session['language'] = 'en'  # Default language
+    learner_id = current_learner_id()
 
     if request.method == 'POST':
         selected_language = request.form.get('language')
         if selected_language in ['en', 'fr', 'de']:
-            session['language'] = selected_language
-            session.modified = True
+            learner_store.update(learner_id, language=selected_language)
         return redirect(url_for('main_tutor'))
 
-    questions = load_questions()
-    if not questions:
-        return render_template('main_tutor.html', error="No questions loaded. Please check questions.json file.")
+    with metrics.stage("learner_load"):
+        learner = learner_store.get(learner_id)
 
-    filtered_questions = [q for q in questions if q["language"] == session['language'] and q["difficulty"] == session['current_difficulty']]
-    if not filtered_questions:
-        return render_template('main_tutor.html', error=f"No questions available for language {session['language']} and difficulty level: {session['current_difficulty']}.")
+    if not len(question_bank):
+        return render_template('main_tutor.html', error="No questions loaded. Please check questions.json file.")
 
-    question = random.choice(filtered_questions)
+    with metrics.stage("question_filter"):
+        question = question_scheduler.next_question(learner_id, learner.language, learner.current_difficulty)
+    if question is None:
+        return render_template('main_tutor.html', error=f"No questions available for language {learner.language} and difficulty level: {learner.current_difficulty}.")
 
     return render_template(
         'main_tutor.html',
         question=question,
-        difficulty=session['current_difficulty'],
-        performance=session['user_performance'],
-        selected_language=session['language']
+        difficulty=learner.current_difficulty,
+        performance=learner.performance(),
+        selected_language=learner.language
     )
 
 @app.route('/submit_answer', methods=['POST'])
@@ -95,45 +340,28 @@ def submit_answer():
     correct_answer = request.form.get('correct_answer', '').strip().lower()
     question_text = request.form.get('question_text', '')
     tip = request.form.get('tip', 'Review the related topic for better understanding.')
-    
-    # Update user performance
-    if 'user_performance' not in session:
-        session['user_performance'] = {"correct": 0, "incorrect": 0}
+    question_id = request.form.get('question_id', type=int)
+    # Seconds, if the client measures it; "inf", "nan" or negative times would corrupt the learner's features
+    time_taken = answer_seconds(request.form.get('time_taken', type=float))
     
     if user_answer == correct_answer:
-        session['user_performance']["correct"] += 1
         feedback = 1  # Correct answer
         result = "correct"
     else:
-        session['user_performance']["incorrect"] += 1
         feedback = 0  # Incorrect answer
         result = "incorrect"
     
-    # Calculate accuracy
-    total_attempts = session['user_performance']["correct"] + session['user_performance']["incorrect"]
-    accuracy = 0
-    suggestion = ""
-    if total_attempts > 0:
-        accuracy = (session['user_performance']["correct"] / total_attempts) * 100
-        if accuracy < 50:
-            suggestion = "Focus on reviewing the basics to improve your understanding."
-        elif accuracy < 80:
-            suggestion = "You're doing well! Keep practicing to reach mastery."
-        else:
-            suggestion = "Excellent work! Consider trying harder questions for a challenge."
-    
-    # Adjust difficulty based on feedback
-    current_difficulty = session.get('current_difficulty', "easy")
-    difficulty_map = {"easy": "medium", "medium": "hard", "hard": "medium"}
-    reverse_difficulty_map = {"medium": "easy", "hard": "medium"}
-    
-    if feedback == 1:  # Correct answer
-        next_difficulty = difficulty_map.get(current_difficulty, "medium")
-    else:  # Incorrect answer
-        next_difficulty = reverse_difficulty_map.get(current_difficulty, "easy")
+    # Log the attempt, update the learner's running aggregates and adjust the
+    # difficulty based on feedback, in one store write
+    learner_id = current_learner_id()
+    with metrics.stage("learner_update"):
+        learner, _ = learner_store.record_attempts(
+            learner_id, [(question_id, feedback, time_taken, None)], next_difficulty_after
+        )
+    with metrics.stage("schedule_update"):
+        schedule_answer(learner_id, question_id, feedback)
     
-    session['current_difficulty'] = next_difficulty
-    session.modified = True
+    accuracy, suggestion = accuracy_feedback(learner)
     
     return jsonify({
         'result': result,
@@ -141,14 +369,91 @@ def submit_answer():
         'tip': tip,
         'accuracy': f"{accuracy:.2f}%",
         'suggestion': suggestion,
-        'next_difficulty': next_difficulty
+        'next_difficulty': learner.current_difficulty
+    })
+
+@app.route('/submit_answers', methods=['POST'])
+def submit_answers():
+    """
+    Ordered batch of answers buffered by an offline client, as JSON:
+    {"attempts": [{"answer", "correct_answer", "question_id", "time_taken", "answered_at"}, ...]}.
+
+    Every answer moves the difficulty exactly as /submit_answer would, but
+    the whole batch is applied in one pass with a single store write.
+    `correct_answer` may be left out when `question_id` is given.
+    `time_taken` (optional) must be a non-negative number of seconds.
+    `answered_at` (Unix seconds, optional) is when the answer was given
+    offline; it is capped at the server's time, defaults to it, and may be
+    at most MAX_ANSWER_AGE old.
+    """
+    payload = request.get_json(silent=True)
+    attempts = payload.get('attempts') if isinstance(payload, dict) else None
+    if not isinstance(attempts, list) or not attempts:
+        return jsonify({'error': 'Please provide a non-empty list of attempts.'})
+    if len(attempts) > MAX_BATCH_ATTEMPTS:
+        return jsonify({'error': f'At most {MAX_BATCH_ATTEMPTS} attempts can be submitted per request.'})
+
+    answers = []
+    correct_answers = []
+    oldest = time.time() - MAX_ANSWER_AGE
+    for i, attempt in enumerate(attempts):
+        if not isinstance(attempt, dict) or not isinstance(attempt.get('answer'), str):
+            return jsonify({'error': f'Attempt {i} must be an object with an "answer" string.'})
+        question_id = attempt.get('question_id')
+        time_taken = attempt.get('time_taken')
+        answered_at = attempt.get('answered_at')
+        # bool is an int subclass, but true/false are not ids
+        if question_id is not None and (not isinstance(question_id, int) or isinstance(question_id, bool)):
+            return jsonify({'error': f'Attempt {i} has a non-integer question_id.'})
+        if time_taken is not None:
+            time_taken = json_number(time_taken)
+            if time_taken is None or time_taken < 0:
+                return jsonify({'error': f'Attempt {i} needs a time_taken that is a non-negative number of seconds.'})
+        if answered_at is not None:
+            answered_at = json_number(answered_at)
+            if answered_at is None:
+                return jsonify({'error': f'Attempt {i} has a non-numeric answered_at.'})
+            if answered_at < oldest:
+                return jsonify({'error': f'Attempt {i} was answered more than {MAX_ANSWER_AGE // 86400} days ago.'})
+        correct_answer = attempt.get('correct_answer')
+        if correct_answer is None and question_id is not None:
+            correct_answer = (question_bank.get(question_id) or {}).get('answer')
+        if not isinstance(correct_answer, str):
+            return jsonify({'error': f'Attempt {i} needs a correct_answer or a known question_id.'})
+        correct_answer = correct_answer.strip().lower()
+        correct = int(attempt['answer'].strip().lower() == correct_answer)
+        answers.append((question_id, correct, time_taken, answered_at))
+        correct_answers.append(correct_answer)
+
+    learner_id = current_learner_id()
+    with metrics.stage("learner_update"):
+        learner, logged = learner_store.record_attempts(learner_id, answers, next_difficulty_after)
+    with metrics.stage("schedule_update"):
+        for attempt in logged:
+            schedule_answer(learner_id, attempt.question_id, attempt.correct, attempt.timestamp)
+
+    accuracy, suggestion = accuracy_feedback(learner)
+    next_difficulties = [attempt.difficulty for attempt in logged[1:]] + [learner.current_difficulty]
+    return jsonify({
+        'results': [
+            {
+                'question_id': attempt.question_id,
+                'result': "correct" if attempt.correct else "incorrect",
+                'correct_answer': correct_answer,
+                'difficulty': attempt.difficulty,
+                'next_difficulty': next_difficulty,
+            }
+            for attempt, correct_answer, next_difficulty in zip(logged, correct_answers, next_difficulties)
+        ],
+        'accuracy': f"{accuracy:.2f}%",
+        'suggestion': suggestion,
+        'next_difficulty': learner.current_difficulty
     })
 
 @app.route('/reset_main_tutor')
 def reset_main_tutor():
-    session.pop('current_difficulty', None)
-    session.pop('user_performance', None)
-    session.pop('language', None)  # Reset language to default
+    # Settings and aggregates go back to defaults; the attempt log is kept
+    learner_store.reset(current_learner_id())
     return redirect(url_for('main_tutor'))
 
 # Interactive Tutor routes
@@ -163,15 +468,104 @@ def correct_grammar_route():
     if not sentence:
         return jsonify({'error': 'Please enter a valid sentence.'})
     
+    # mode=paragraph splits longer text into sentences and streams them back
+    if request.values.get('mode') == 'paragraph':
+        if len(sentence) > MAX_PARAGRAPH_CHARS:
+            return jsonify({'error': f'At most {MAX_PARAGRAPH_CHARS} characters can be corrected per request.'})
+        stream_format = request.values.get('format', 'sse')
+        if stream_format not in ('sse', 'ndjson'):
+            return jsonify({'error': 'format must be sse or ndjson.'})
+        response = Response(
+            stream_paragraph(sentence, stream_format, grammar_language(current_learner_id())),
+            mimetype='text/event-stream' if stream_format == 'sse' else 'application/x-ndjson',
+        )
+        response.headers['Cache-Control'] = 'no-cache'
+        response.headers['X-Accel-Buffering'] = 'no'  # let nginx pass chunks through
+        return response
+    
     try:
-        corrected = correct_grammar(sentence)
+        corrected = correct_sentences([sentence], grammar_language(current_learner_id()))[0]
         return jsonify({
             'original': sentence,
             'corrected': corrected
         })
     except Exception as e:
+        metrics.record_error('correct_grammar')
+        app.logger.exception("Grammar correction failed")
+        return jsonify({'error': f'Error during grammar correction: {str(e)}'})
+
+def stream_paragraph(text, stream_format='sse', language='en'):
+    """
+    Correct `text` sentence by sentence, yielding one event per sentence as
+    soon as it is ready: `start`, then `sentence` events carrying the
+    sentence's index (they arrive cached first, then shortest first), then
+    `done` with the whole corrected text, or `error`. `language` is the
+    learner's, for the grammar filter.
+    """
+    def event(name, data):
+        if stream_format == 'sse':
+            return f"event: {name}\ndata: {json.dumps(data)}\n\n"
+        return json.dumps(dict(data, event=name)) + "\n"
+
+    pieces = split_sentences(text)
+    corrected = [None] * len(pieces)
+    yield event('start', {'sentences': len(pieces)})
+    try:
+        with metrics.stage("grammar_paragraph"):
+            fast_path = functools.partial(grammar_engine.fast_path, language=language)
+            for positions, fixed, cached in correct_paragraph(pieces, grammar_cache, grammar_batcher, fast_path):
+                for i in positions:
+                    corrected[i] = fixed
+                    yield event('sentence', {'index': i, 'original': pieces[i][0], 'corrected': fixed, 'cached': cached})
+    except Exception as e:
+        metrics.record_error('correct_paragraph')
+        app.logger.exception("Paragraph correction failed")
+        yield event('error', {'error': f'Error during grammar correction: {str(e)}'})
+        return
+    yield event('done', {
+        'original': text,
+        'corrected': ''.join(fixed + separator for fixed, (_, separator) in zip(corrected, pieces)),
+    })
+
+@app.route('/correct_grammar_batch', methods=['POST'])
+def correct_grammar_batch_route():
+    # Accepts {"sentences": [...]} as JSON, or repeated `sentences` form fields
+    payload = request.get_json(silent=True)
+    if isinstance(payload, dict):
+        sentences = payload.get('sentences')
+    else:
+        sentences = request.form.getlist('sentences')
+
+    if not isinstance(sentences, list) or not sentences:
+        return jsonify({'error': 'Please provide a non-empty list of sentences.'})
+    if len(sentences) > MAX_BATCH_SENTENCES:
+        return jsonify({'error': f'At most {MAX_BATCH_SENTENCES} sentences can be corrected per request.'})
+    if not all(isinstance(sentence, str) and sentence.strip() for sentence in sentences):
+        return jsonify({'error': 'Every sentence must be a non-empty string.'})
+
+    sentences = [sentence.strip() for sentence in sentences]
+    try:
+        corrected = correct_sentences(sentences, grammar_language(current_learner_id()))
+        return jsonify({
+            'results': [
+                {'original': original, 'corrected': fixed}
+                for original, fixed in zip(sentences, corrected)
+            ]
+        })
+    except Exception as e:
+        metrics.record_error('correct_grammar_batch')
+        app.logger.exception("Batch grammar correction failed")
         return jsonify({'error': f'Error during grammar correction: {str(e)}'})
 
+@app.route('/grammar_cache_stats')
+def grammar_cache_stats():
+    return jsonify(dict(grammar_cache.stats(), fast_path=grammar_engine.stats()))
+
+# Introspection of the loaded models
+@app.route('/model_stats')
+def model_stats():
+    return jsonify(model_registry.describe())
+
 # Simulate Tutor routes
 @app.route('/simulate_tutor')
 def simulate_tutor():
@@ -184,51 +578,93 @@ def run_simulation():
     if not sentence:
         return jsonify({'error': 'Please enter a valid sentence.'})
     
+    # The learner id comes from the session, which only exists in the request thread
+    learner_id = current_learner_id()
+    
+    # mode=async queues the work and returns a job id to poll
+    if request.values.get('mode') == 'async':
+        try:
+            job_id = simulation_jobs.submit(simulate, sentence, learner_id)
+        except QueueFull as e:
+            response = jsonify({'error': f'Simulation queue is full: {e} Please retry shortly.'})
+            response.headers['Retry-After'] = '1'
+            return response, 503
+        return jsonify({
+            'job_id': job_id,
+            'status': 'queued',
+            'result_url': url_for('simulation_result', job_id=job_id)
+        }), 202
+    
+    return jsonify(simulate(sentence, learner_id))
+
+def simulate(sentence, learner_id):
+    """Correct `sentence` and suggest the next difficulty for the learner."""
     try:
         # Correct grammar
-        corrected = correct_grammar(sentence)
+        corrected = correct_sentences([sentence], grammar_language(learner_id))[0]
         
         # Load models
         ml_model = load_ml_model()
         rl_model = load_rl_model()
         
         if not ml_model or not rl_model:
-            return jsonify({
+            metrics.record_error('model_load')
+            return {
                 'original': sentence,
                 'corrected': corrected,
                 'error': 'Could not load ML or RL models.' 
-            })
+            }
         
-        # Create dummy user features for demonstration
-        user_features = [0.2] * 18
+        # Features of the current learner, kept up to date on every answer
+        user_features = learner_store.get(learner_id).feature_vector()
         
         # Predict next difficulty using ML model
-        predicted_difficulty = ml_model.predict([user_features])[0]
+        with metrics.stage("ml_predict"):
+            predicted_difficulty = ml_model.predict([user_features])[0]
         
         # Use RL model to decide difficulty level
+        from src.rl_env import AdaptiveLearningEnv
         env = AdaptiveLearningEnv()
         obs, _ = env.reset()  # Unpack the tuple properly
         
         # Predict action from model
-        action, _ = rl_model.predict(obs)
+        with metrics.stage("rl_predict"):
+            action, _ = rl_model.predict(obs)
         if isinstance(action, np.ndarray):
             action = int(action.item())
         
         action_map = {0: "EASIER", 1: "SAME", 2: "HARDER"}
         action_result = action_map[action]
         
-        return jsonify({
+        return {
             'original': sentence,
             'corrected': corrected,
             'predicted_difficulty': f"{float(predicted_difficulty):.2f}",
             'rl_suggestion': action_result
-        })
+        }
     except Exception as e:
-        return jsonify({
+        metrics.record_error('simulation')
+        app.logger.exception("Simulation failed")
+        return {
             'original': sentence,
             'corrected': corrected if 'corrected' in locals() else None,
             'error': f'Error during simulation: {str(e)}'
-        })
+        }
+
+@app.route('/simulation_result/<job_id>')
+def simulation_result(job_id):
+    job = simulation_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown or expired simulation job.'}), 404
+    return jsonify(job.describe())
+
+@app.route('/simulation_queue_stats')
+def simulation_queue_stats():
+    return jsonify(simulation_jobs.stats())
+
+# Outside gunicorn, TUTOR_WARM_UP=1 loads the models on import
+if os.environ.get("TUTOR_WARM_UP") == "1":
+    preload()
 
 if __name__ == '__main__':
     app.run(debug=True)
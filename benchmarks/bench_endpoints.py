@@ -0,0 +1,304 @@
+"""
+Load test for the tutor endpoints through the Flask test client.
+
+Drives /main_tutor, /submit_answer, /correct_grammar and /run_simulation
+from `--concurrency` threads, each with its own client (and so its own
+learner session), and reports p50/p95/p99 latency, requests/sec and RSS per
+endpoint. By default the grammar model, the ML and RL models and the RL
+environment are replaced by stand-ins that sleep for a configurable time
+(and templates missing from the checkout by minimal ones), so the run
+needs no model files or network and measures the app itself; pass
+--real-models to use whatever app.py would load.
+
+Results can be saved as a baseline and later runs compared against it;
+the comparison exits with status 1 when an endpoint's p95 or throughput is
+worse than the baseline by more than --tolerance, or when more of its
+requests fail than in the baseline. The committed baseline,
+benchmarks/baselines/endpoints.json, was recorded with the defaults below;
+re-record it on the machine you compare on, since absolute numbers vary.
+
+Run from the project root:
+    python -m benchmarks.bench_endpoints --save-baseline benchmarks/baselines/endpoints.json
+    python -m benchmarks.bench_endpoints --compare benchmarks/baselines/endpoints.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import threading
+import time
+import types
+
+from src.memory import current_rss_bytes, peak_rss_bytes
+
+ENDPOINTS = ('main_tutor', 'submit_answer', 'correct_grammar', 'run_simulation')
+SENTENCES = [
+    "she go to school every day",
+    "They was playing football yesterday.",
+    "I has a apple in my bag.",
+    "He don't like coffee.",
+    "We is going to the cinema tonight.",
+    "The childrens are in the garden.",
+]
+
+
+class _StubModel:
+    """Stand-in for the forest and the DQN: fixed latency, constant output."""
+
+    def __init__(self, delay, output):
+        self.delay = delay
+        self.output = output
+
+    def predict(self, X, *args, **kwargs):
+        time.sleep(self.delay)
+        return self.output(X)
+
+
+# Used only for templates missing from the checkout, so those pages still render
+_FALLBACK_TEMPLATES = {
+    'main_tutor.html': (
+        "{% if error %}<p>{{ error }}</p>{% else %}"
+        "<h1>{{ difficulty }} / {{ selected_language }}</h1><p>{{ question }}</p>"
+        "<p>{{ performance.correct }} correct, {{ performance.incorrect }} incorrect</p>{% endif %}"
+    ),
+}
+
+
+class _StubEnv:
+    def reset(self, seed=None, options=None):
+        return 0, {}
+
+
+def install_stubs(app_module, grammar_ms, ml_ms, rl_ms):
+    """Swap the app's heavy dependencies for fixed-latency stand-ins."""
+    import numpy as np
+
+    def correct_batch(sentences):
+        time.sleep(grammar_ms / 1000.0)
+        return [sentence[:1].upper() + sentence[1:] for sentence in sentences]
+
+    app_module.grammar_batcher.batch_fn = correct_batch
+
+    # The registry stats the artifact path, so point it at an empty file
+    placeholder = tempfile.NamedTemporaryFile(suffix='.stub', delete=False)
+    placeholder.close()
+    ml = _StubModel(ml_ms / 1000.0, lambda X: np.full(len(X), 1.0))
+    rl = _StubModel(rl_ms / 1000.0, lambda obs: (np.array(1), None))
+    app_module.model_registry.register('ml', placeholder.name, lambda path: ml)
+    app_module.model_registry.register('rl', placeholder.name, lambda path: rl)
+
+    rl_env = types.ModuleType('src.rl_env')
+    rl_env.AdaptiveLearningEnv = _StubEnv
+    sys.modules['src.rl_env'] = rl_env
+
+    from jinja2 import ChoiceLoader, DictLoader
+    jinja_env = app_module.app.jinja_env
+    jinja_env.loader = ChoiceLoader([jinja_env.loader, DictLoader(_FALLBACK_TEMPLATES)])
+    return placeholder.name
+
+
+def _scenario(name, app_module, distinct_sentences):
+    question_ids = list(range(len(app_module.question_bank)))
+
+    def main_tutor(client, rng):
+        return client.get('/main_tutor')
+
+    def submit_answer(client, rng):
+        question_id = rng.choice(question_ids) if question_ids else None
+        question = app_module.question_bank.get(question_id) if question_id is not None else {}
+        answer = question.get('answer', 'a')
+        return client.post('/submit_answer', data={
+            'answer': answer if rng.random() < 0.7 else 'z',
+            'correct_answer': answer,
+            'question_id': '' if question_id is None else question_id,
+            'time_taken': f"{rng.uniform(2, 30):.1f}",
+        })
+
+    def sentence(rng):
+        # A numbered variant, so the grammar cache sees a realistic mix of hits and misses
+        return f"{rng.choice(SENTENCES)} ({rng.randrange(distinct_sentences)})"
+
+    def correct_grammar(client, rng):
+        return client.post('/correct_grammar', data={'sentence': sentence(rng)})
+
+    def run_simulation(client, rng):
+        return client.post('/run_simulation', data={'sentence': sentence(rng)})
+
+    return {
+        'main_tutor': main_tutor,
+        'submit_answer': submit_answer,
+        'correct_grammar': correct_grammar,
+        'run_simulation': run_simulation,
+    }[name]
+
+
+def _percentile(ordered, q):
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def run_load(app_module, endpoint, requests, concurrency, warmup, seed, distinct_sentences=1000, start_timeout=300.0):
+    """
+    Fire `requests` requests at one endpoint from `concurrency` threads.
+
+    The threads warm up and then start together; if one of them fails
+    before the start, or they are not all ready within `start_timeout`
+    seconds, the run is abandoned instead of waiting forever.
+    """
+    scenario = _scenario(endpoint, app_module, distinct_sentences)
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+    counter = iter(range(requests))
+
+    def worker(index):
+        try:
+            client = app_module.app.test_client()
+            rng = random.Random(seed + index)
+            for _ in range(warmup):
+                scenario(client, rng)
+        except BaseException:
+            start_line.abort()
+            raise
+        try:
+            start_line.wait()
+        except threading.BrokenBarrierError:
+            return
+        local, failed = [], 0
+        while True:
+            with lock:
+                if next(counter, None) is None:
+                    break
+            start = time.perf_counter()
+            response = scenario(client, rng)
+            local.append(time.perf_counter() - start)
+            failed += response.status_code >= 400
+        with lock:
+            latencies.extend(local)
+            errors.append(failed)
+
+    start_line = threading.Barrier(concurrency + 1, timeout=start_timeout)
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    try:
+        start_line.wait()
+    except threading.BrokenBarrierError:
+        for thread in threads:
+            thread.join()
+        raise RuntimeError(f"{endpoint}: a client thread failed or did not warm up within {start_timeout:.0f}s "
+                           "(see the thread errors above)") from None
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    ordered = sorted(latencies)
+    return {
+        'requests': len(ordered),
+        'errors': sum(errors),
+        'concurrency': concurrency,
+        'rps': len(ordered) / elapsed,
+        'p50_ms': _percentile(ordered, 0.50) * 1000,
+        'p95_ms': _percentile(ordered, 0.95) * 1000,
+        'p99_ms': _percentile(ordered, 0.99) * 1000,
+        'rss_bytes': current_rss_bytes(),
+    }
+
+
+def compare(results, baseline, tolerance):
+    """
+    Print deltas against `baseline`; returns the endpoints that regressed.
+
+    An endpoint regresses when its p95 or throughput is worse by more than
+    `tolerance`, or when it has more failed requests than the baseline had:
+    failing requests are often fast, so latency alone would hide them.
+    """
+    regressed = []
+    for endpoint, result in results.items():
+        before = baseline['endpoints'].get(endpoint)
+        if before is None:
+            continue
+        p95 = result['p95_ms'] / before['p95_ms'] - 1
+        rps = result['rps'] / before['rps'] - 1
+        worse = p95 > tolerance or rps < -tolerance or result['errors'] > before['errors']
+        print(f"  {endpoint:<16} p95 {p95:+7.1%}  rps {rps:+7.1%}  errors {before['errors']:>5} -> "
+              f"{result['errors']:<5}  {'REGRESSED' if worse else 'ok'}")
+        if worse:
+            regressed.append(endpoint)
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--endpoints', nargs='*', default=list(ENDPOINTS), choices=ENDPOINTS)
+    parser.add_argument('--requests', type=int, default=2000, help="Measured requests per endpoint")
+    parser.add_argument('--concurrency', type=int, default=8, help="Client threads")
+    parser.add_argument('--warmup', type=int, default=5, help="Unmeasured requests per thread first")
+    parser.add_argument('--start-timeout', type=float, default=300.0,
+                        help="Seconds allowed for every thread to finish its warm-up")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--questions', default='questions.json')
+    parser.add_argument('--distinct-sentences', type=int, default=1000, help="Sentence variants sent for correction")
+    parser.add_argument('--real-models', action='store_true', help="Use the app's real models instead of stand-ins")
+    parser.add_argument('--grammar-ms', type=float, default=20.0, help="Stand-in grammar latency per batch")
+    parser.add_argument('--ml-ms', type=float, default=1.0, help="Stand-in ML predict latency")
+    parser.add_argument('--rl-ms', type=float, default=1.0, help="Stand-in RL predict latency")
+    parser.add_argument('--save-baseline', metavar='PATH', help="Write the results as a baseline JSON")
+    parser.add_argument('--compare', metavar='PATH', help="Compare with a saved baseline")
+    parser.add_argument('--tolerance', type=float, default=0.15, help="Allowed p95/rps regression (fraction)")
+    args = parser.parse_args()
+
+    os.environ['QUESTION_BANK'] = args.questions
+    os.environ.setdefault('TUTOR_WARM_UP', '0')
+    start = time.perf_counter()
+    import app as app_module
+    import_seconds = time.perf_counter() - start
+
+    placeholder = None if args.real_models else install_stubs(app_module, args.grammar_ms, args.ml_ms, args.rl_ms)
+    try:
+        print(f"🚦 {args.requests} requests x {len(args.endpoints)} endpoints, {args.concurrency} threads, "
+              f"{'real models' if args.real_models else 'stand-in models'} (app import {import_seconds:.2f}s)")
+        results = {}
+        for endpoint in args.endpoints:
+            result = run_load(app_module, endpoint, args.requests, args.concurrency, args.warmup, args.seed,
+                              args.distinct_sentences, args.start_timeout)
+            results[endpoint] = result
+            print(f"  {endpoint:<16} {result['rps']:9,.0f} req/s  p50 {result['p50_ms']:7.2f} ms  "
+                  f"p95 {result['p95_ms']:7.2f} ms  p99 {result['p99_ms']:7.2f} ms  "
+                  f"errors {result['errors']:5d}  rss {result['rss_bytes'] / 2**20:7.1f} MiB")
+        peak = peak_rss_bytes()
+        if peak is not None:
+            print(f"  peak rss {peak / 2**20:.1f} MiB")
+    finally:
+        if placeholder is not None:
+            os.unlink(placeholder)
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.save_baseline) or '.', exist_ok=True)
+        baseline = {
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'args': {k: v for k, v in vars(args).items() if k not in ('save_baseline', 'compare')},
+            'peak_rss_bytes': peak,
+            'endpoints': results,
+        }
+        with open(args.save_baseline, 'w', encoding='utf-8') as f:
+            json.dump(baseline, f, indent=2)
+        print(f"💾 Baseline saved to {args.save_baseline}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        print(f"📏 Against {args.compare} ({baseline['created']}), tolerance {args.tolerance:.0%}")
+        regressed = compare(results, baseline, args.tolerance)
+        if regressed:
+            print(f"❌ Regressed: {', '.join(regressed)}")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""
+Pickled sklearn forest vs CompiledForest: size, load time, latency and
+exact agreement of predictions.
+
+Uses model/next_difficulty_model.pkl when it exists, otherwise a 100-tree
+RandomForest fitted on synthetic 18-feature data. Exact equality is
+enforced by tests/test_forest_export.py; here it is only reported.
+
+Run from the project root:
+    python -m benchmarks.bench_forest --rows 100000
+"""
+import argparse
+import os
+import pickle
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.bench_predictor import load_or_fit_model
+from src.forest_export import CompiledForest, export_forest
+
+
+def timed(fn, repeats=1):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        result = fn()
+    return result, (time.perf_counter() - start) / repeats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100000, help="Rows for the batch and equality check")
+    parser.add_argument('--single', type=int, default=300, help="Single-row predict calls timed")
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    model, source = load_or_fit_model(args.seed)
+    X = np.random.default_rng(args.seed).random((args.rows, model.n_features_in_), dtype=np.float32)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pickle_path = os.path.join(tmp, 'forest.pkl')
+        compiled_path = os.path.join(tmp, 'forest.npz')
+        with open(pickle_path, 'wb') as f:
+            pickle.dump(model, f)
+        export_forest(model, compiled_path)
+
+        def load_pickle():
+            with open(pickle_path, 'rb') as f:
+                return pickle.load(f)
+
+        sklearn_model, sklearn_load = timed(load_pickle)
+        compiled, compiled_load = timed(lambda: CompiledForest(compiled_path))
+        sizes = os.path.getsize(pickle_path), os.path.getsize(compiled_path)
+
+    expected, sklearn_batch = timed(lambda: sklearn_model.predict(X))
+    actual, compiled_batch = timed(lambda: compiled.predict(X))
+    _, sklearn_single = timed(lambda: sklearn_model.predict(X[:1]), args.single)
+    _, compiled_single = timed(lambda: compiled.predict(X[:1]), args.single)
+    mismatches = int(np.sum(expected != actual))
+
+    print(f"🌲 Model: {source}")
+    print(f"{'':>10} {'size MiB':>9} {'load ms':>9} {'1 row us':>10} {'batch rows/s':>14}")
+    print(f"{'sklearn':>10} {sizes[0] / 2**20:9.2f} {sklearn_load * 1000:9.1f} {sklearn_single * 1e6:10.0f} "
+          f"{args.rows / sklearn_batch:14,.0f}")
+    print(f"{'compiled':>10} {sizes[1] / 2**20:9.2f} {compiled_load * 1000:9.1f} {compiled_single * 1e6:10.0f} "
+          f"{args.rows / compiled_batch:14,.0f}")
+    print(f"  predictions identical to clf.predict: {mismatches == 0} ({mismatches} of {args.rows:,} differ)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""
+Accuracy versus latency of the grammar fast path on a held-out sentence set.
+
+For each threshold it reports how much traffic skips the model, how many
+skipped sentences the model would have corrected differently (wrong
+skips), the filter's own cost per sentence and the expected cost per
+sentence with the model behind it. The model's cost is measured with
+--with-model on a sample of the sentences, or taken from --model-ms.
+
+Run from the project root:
+    python -m benchmarks.bench_grammar_filter heldout.jsonl --filter model/grammar_filter.json --model-ms 120
+"""
+import argparse
+import time
+
+from src.grammar_filter import GrammarFilter, TieredCorrector, evaluate, load_pairs
+
+
+def measure_model_ms(sentences, batch_size):
+    from src.grammar_batcher import correct_grammar_batch
+    correct_grammar_batch(sentences[:1])  # load the pipeline outside the timing
+    start = time.perf_counter()
+    for i in range(0, len(sentences), batch_size):
+        correct_grammar_batch(sentences[i:i + batch_size])
+    return (time.perf_counter() - start) * 1000 / len(sentences)
+
+
+def measure_filter_us(grammar_filter, threshold, sentences, repeats):
+    engine = TieredCorrector(None, grammar_filter, threshold)
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for sentence in sentences:
+            engine.fast_path(sentence, 'en')
+    return (time.perf_counter() - start) * 1e6 / (repeats * len(sentences))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('pairs', help='Held-out .jsonl of {"sentence", "corrected"} pairs')
+    parser.add_argument('--filter', default="model/grammar_filter.json")
+    parser.add_argument('--thresholds', type=float, nargs='+', default=[0.02, 0.05, 0.1, 0.2, 0.3, 0.5])
+    parser.add_argument('--model-ms', type=float, default=None, help="Model cost per sentence, if not measured")
+    parser.add_argument('--with-model', type=int, default=0, metavar='N',
+                        help="Measure the real model on the first N sentences")
+    parser.add_argument('--batch-size', type=int, default=16)
+    parser.add_argument('--repeats', type=int, default=5, help="Passes over the set when timing the filter")
+    args = parser.parse_args()
+
+    sentences, corrected = load_pairs(args.pairs)
+    grammar_filter = GrammarFilter.load(args.filter)
+    model_ms = measure_model_ms(sentences[:args.with_model], args.batch_size) if args.with_model else args.model_ms
+
+    print(f"⚡ {len(sentences):,} held-out sentences"
+          + (f", model {model_ms:.1f} ms/sentence" if model_ms is not None else ""))
+    print("  threshold  skip rate  wrong skips  accuracy  filter us  expected ms  speedup")
+    for row in evaluate(grammar_filter, sentences, corrected, args.thresholds):
+        filter_us = measure_filter_us(grammar_filter, row['threshold'], sentences, args.repeats)
+        line = (f"  {row['threshold']:9.2f}  {row['skip_rate']:9.1%}  {row['wrong_skip_rate']:11.2%}  "
+                f"{row['accuracy']:8.2%}  {filter_us:9.1f}")
+        if model_ms is not None:
+            expected = filter_us / 1000 + (1 - row['skip_rate']) * model_ms
+            line += f"  {expected:11.2f}  {model_ms / expected:6.1f}x"
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""
+Parity and latency of PolicyRunner against DQN.predict.
+
+Exports the DQN at --model once per quantization, then for a batch of
+random observations from the model's observation space reports the
+largest Q-value difference, how often the greedy action agrees, and the
+latency of single-observation and batched predict calls.
+
+Run from the project root:
+    python -m benchmarks.bench_policy_runner --batch 256
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from src.policy_export import QUANTIZATIONS, PolicyRunner, export_dqn_policy
+
+
+def latency(fn, obs, repeats):
+    fn(obs)  # warm-up
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn(obs)
+    return (time.perf_counter() - start) / repeats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model', default='model/adaptive_difficulty_dqn_v4.zip')
+    parser.add_argument('--batch', type=int, default=256)
+    parser.add_argument('--repeats', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    import torch
+    from stable_baselines3 import DQN
+
+    model = DQN.load(args.model, device='cpu')
+    model.observation_space.seed(args.seed)
+    obs = np.stack([model.observation_space.sample() for _ in range(args.batch)])
+    with torch.no_grad():
+        reference_q = model.q_net(model.policy.obs_to_tensor(obs)[0]).cpu().numpy()
+    reference_actions = reference_q.argmax(axis=1)
+
+    predict_dqn = lambda o: model.predict(o, deterministic=True)
+    print(f"{'runtime':>16} {'KiB':>7} {'max |dQ|':>10} {'agree':>7} {'single us':>10} {'batch us':>10}")
+    print(f"{'DQN.predict':>16} {os.path.getsize(args.model) / 1024:7.1f} {0.0:10.2e} {1.0:7.1%} "
+          f"{latency(predict_dqn, obs[0], args.repeats) * 1e6:10.1f} "
+          f"{latency(predict_dqn, obs, args.repeats // 10) * 1e6:10.1f}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for quantize in QUANTIZATIONS:
+            path = os.path.join(tmp, f'policy_{quantize}.npz')
+            export_dqn_policy(model, path, quantize)
+            runner = PolicyRunner(path)
+            q = runner.q_values(obs)
+            agree = np.mean(q.argmax(axis=1) == reference_actions)
+            print(f"{'runner ' + quantize:>16} {os.path.getsize(path) / 1024:7.1f} "
+                  f"{np.abs(q - reference_q).max():10.2e} {agree:7.1%} "
+                  f"{latency(runner.predict, obs[0], args.repeats) * 1e6:10.1f} "
+                  f"{latency(runner.predict, obs, args.repeats // 10) * 1e6:10.1f}")
+
+
+if __name__ == '__main__':
+    main()
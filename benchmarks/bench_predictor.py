@@ -0,0 +1,65 @@
+"""
+Per-row `ml_model.predict([features])` loop vs predict_next_difficulty_batch.
+
+Uses model/next_difficulty_model.pkl when it exists, otherwise a 100-tree
+RandomForest fitted on synthetic 18-feature data.
+
+Run from the project root:
+    python -m benchmarks.bench_predictor --rows 200000
+"""
+import argparse
+import os
+import pickle
+import time
+
+import numpy as np
+
+from src.predictor import predict_next_difficulty_batch
+
+MODEL_PATH = "model/next_difficulty_model.pkl"
+N_FEATURES = 18
+
+
+def load_or_fit_model(seed):
+    if os.path.exists(MODEL_PATH):
+        with open(MODEL_PATH, "rb") as f:
+            return pickle.load(f), MODEL_PATH
+    from sklearn.ensemble import RandomForestClassifier
+    rng = np.random.default_rng(seed)
+    X = rng.random((5000, N_FEATURES), dtype=np.float32)
+    y = np.digitize(X[:, :3].mean(axis=1), [0.4, 0.6]).astype(np.float64)
+    clf = RandomForestClassifier(n_estimators=100, random_state=seed).fit(X, y)
+    return clf, "synthetic RandomForestClassifier(n_estimators=100)"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=200000, help="Learners scored by the batch API")
+    parser.add_argument('--loop-rows', type=int, default=300, help="Learners scored by the per-row loop (extrapolated)")
+    parser.add_argument('--chunk-size', type=int, default=65536)
+    parser.add_argument('--n-jobs', type=int, default=-1)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    model, source = load_or_fit_model(args.seed)
+    n_features = getattr(model, 'n_features_in_', N_FEATURES)
+    X = np.random.default_rng(args.seed).random((args.rows, n_features), dtype=np.float32)
+
+    start = time.perf_counter()
+    for row in X[:args.loop_rows]:
+        model.predict([row])
+    loop_rate = args.loop_rows / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    predictions = predict_next_difficulty_batch(model, X, chunk_size=args.chunk_size, n_jobs=args.n_jobs)
+    batch_rate = len(predictions) / (time.perf_counter() - start)
+
+    print(f"🌲 Model: {source}")
+    print(f"  per-row predict loop : {loop_rate:12,.0f} learners/s ({args.loop_rows} rows)")
+    print(f"  batch API            : {batch_rate:12,.0f} learners/s ({args.rows} rows, chunk {args.chunk_size}, n_jobs {args.n_jobs})")
+    print(f"  speedup              : {batch_rate / loop_rate:12,.1f}x")
+    print(f"  est. loop time for {args.rows:,} learners: {args.rows / loop_rate:,.0f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""
+Microbenchmark for question selection in /main_tutor.
+
+Compares the old per-request path (read + decode questions.json, filter with a
+list comprehension, random.choice) with QuestionBank.pick.
+
+Run from the project root:
+    python -m benchmarks.bench_question_bank --scale 1000
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+from src.question_bank import QuestionBank
+
+
+def load_questions(file_path):
+    with open(file_path, 'r', encoding='utf-8') as file:
+        return json.load(file)
+
+
+def pick_per_request(file_path, language, difficulty):
+    # What app.py used to do on every GET
+    questions = load_questions(file_path)
+    filtered_questions = [q for q in questions if q["language"] == language and q["difficulty"] == difficulty]
+    return random.choice(filtered_questions)
+
+
+def measure(fn, duration):
+    calls = 0
+    start = time.perf_counter()
+    deadline = start + duration
+    while time.perf_counter() < deadline:
+        fn()
+        calls += 1
+    return calls / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--questions', default='questions.json')
+    parser.add_argument('--scale', type=int, default=1, help="Replicate the bank N times to mimic a larger file")
+    parser.add_argument('--duration', type=float, default=2.0, help="Seconds per measurement")
+    parser.add_argument('--language', default='en')
+    parser.add_argument('--difficulty', default='easy')
+    args = parser.parse_args()
+
+    questions = load_questions(args.questions) * args.scale
+    with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False, encoding='utf-8') as tmp:
+        json.dump(questions, tmp)
+    try:
+        bank = QuestionBank(tmp.name)
+        before = measure(lambda: pick_per_request(tmp.name, args.language, args.difficulty), args.duration)
+        after = measure(lambda: bank.pick(args.language, args.difficulty), args.duration)
+    finally:
+        os.unlink(tmp.name)
+
+    print(f"📚 {len(questions)} questions, bucket {args.language}/{args.difficulty}")
+    print(f"  per-request load + filter : {before:12,.0f} req/s")
+    print(f"  QuestionBank.pick         : {after:12,.0f} req/s")
+    print(f"  speedup                   : {after / before:12,.1f}x")
+
+
+if __name__ == '__main__':
+    main()
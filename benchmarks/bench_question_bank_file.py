@@ -0,0 +1,80 @@
+"""
+Load time, RSS and pick rate of the JSON QuestionBank vs the memory-mapped
+.qbank format.
+
+Each measurement runs in a fresh interpreter, like a newly booted worker, so
+the RSS column is what one more worker costs. Mapped .qbank pages sit in the
+shared page cache and are only counted once they are touched.
+
+Run from the project root:
+    python -m benchmarks.bench_question_bank_file --scale 10000
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from src.question_bank_file import convert_questions
+
+_PROBE = r"""
+import json, random, sys, time
+from src.memory import current_rss_bytes
+from src.question_bank import open_question_bank
+path, language, difficulty, duration = sys.argv[1], sys.argv[2], sys.argv[3], float(sys.argv[4])
+rss_before = current_rss_bytes()
+start = time.perf_counter()
+bank = open_question_bank(path)
+load_seconds = time.perf_counter() - start
+rss_loaded = current_rss_bytes()
+calls = 0
+rng = random.Random(0)
+start = time.perf_counter()
+deadline = start + duration
+while time.perf_counter() < deadline:
+    bank.pick(language, difficulty, rng)
+    calls += 1
+print(json.dumps({'load_seconds': load_seconds, 'rss_load_bytes': rss_loaded - rss_before,
+                  'rss_bytes': current_rss_bytes(), 'picks_per_second': calls / (time.perf_counter() - start)}))
+"""
+
+
+def probe(path, language, difficulty, duration):
+    out = subprocess.run(
+        [sys.executable, '-c', _PROBE, path, language, difficulty, str(duration)],
+        capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--questions', default='questions.json')
+    parser.add_argument('--scale', type=int, default=1000, help="Replicate the bank N times to mimic a larger file")
+    parser.add_argument('--duration', type=float, default=2.0, help="Seconds of picking per measurement")
+    parser.add_argument('--language', default='en')
+    parser.add_argument('--difficulty', default='easy')
+    args = parser.parse_args()
+
+    with open(args.questions, 'r', encoding='utf-8') as file:
+        questions = json.load(file) * args.scale
+
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = os.path.join(tmp, 'questions.json')
+        qbank_path = os.path.join(tmp, 'questions.qbank')
+        with open(json_path, 'w', encoding='utf-8') as file:
+            json.dump(questions, file)
+        convert_questions(json_path, qbank_path)
+
+        print(f"📚 {len(questions):,} questions, bucket {args.language}/{args.difficulty}")
+        print(f"{'format':>8} {'file MiB':>9} {'load ms':>9} {'load RSS MiB':>13} {'worker RSS MiB':>15} {'picks/s':>12}")
+        for label, path in (('json', json_path), ('qbank', qbank_path)):
+            result = probe(path, args.language, args.difficulty, args.duration)
+            print(f"{label:>8} {os.path.getsize(path) / 2**20:9.1f} {result['load_seconds'] * 1000:9.1f} "
+                  f"{result['rss_load_bytes'] / 2**20:13.1f} {result['rss_bytes'] / 2**20:15.1f} "
+                  f"{result['picks_per_second']:12,.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""
+Worker startup cost of app.py: import time and RSS, optionally after warm_up.
+
+Each measurement runs in a fresh interpreter, like a newly booted worker.
+`--modules` additionally times importing individual heavy dependencies so
+regressions (an eager `import torch` creeping back in) are easy to spot.
+
+Run from the project root:
+    python -m benchmarks.bench_startup --runs 5 --warm-up
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+_PROBE = r"""
+import json, sys, time
+from src.memory import current_rss_bytes
+rss_before = current_rss_bytes()
+start = time.perf_counter()
+__import__(sys.argv[1])
+result = {'import_seconds': time.perf_counter() - start, 'rss_bytes': current_rss_bytes(),
+          'rss_import_bytes': current_rss_bytes() - rss_before}
+if sys.argv[2] == '1':
+    start = time.perf_counter()
+    sys.modules[sys.argv[1]].warm_up()
+    result['warm_up_seconds'] = time.perf_counter() - start
+    result['rss_warm_bytes'] = current_rss_bytes()
+print(json.dumps(result))
+"""
+
+
+def probe(module, warm_up):
+    out = subprocess.run(
+        [sys.executable, '-c', _PROBE, module, '1' if warm_up else '0'],
+        capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def report(label, samples):
+    line = f"{label:<24}"
+    line += f" import {statistics.median(s['import_seconds'] for s in samples) * 1000:8.0f} ms"
+    line += f"  rss {statistics.median(s['rss_bytes'] for s in samples) / 2**20:7.1f} MiB"
+    if 'warm_up_seconds' in samples[0]:
+        line += f"  warm-up {statistics.median(s['warm_up_seconds'] for s in samples):6.1f} s"
+        line += f"  rss after {statistics.median(s['rss_warm_bytes'] for s in samples) / 2**20:7.1f} MiB"
+    print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5, help="Fresh interpreters per measurement (median is reported)")
+    parser.add_argument('--warm-up', action='store_true', help="Also time app.warm_up() and the RSS after it")
+    parser.add_argument('--modules', nargs='*', default=[], help="Extra modules to time, e.g. torch transformers")
+    args = parser.parse_args()
+
+    report('app', [probe('app', args.warm_up) for _ in range(args.runs)])
+    for module in args.modules:
+        try:
+            report(module, [probe(module, False) for _ in range(args.runs)])
+        except subprocess.CalledProcessError as e:
+            print(f"{module:<24} failed: {e.stderr.strip().splitlines()[-1] if e.stderr else e}")
+
+
+if __name__ == '__main__':
+    main()
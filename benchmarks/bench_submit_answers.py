@@ -0,0 +1,87 @@
+"""
+Throughput of /submit_answers against the same answers sent one by one to
+/submit_answer, through the Flask test client.
+
+Each round replays a buffered session of `--batch` answers for a fresh
+learner, either as that many single-answer POSTs or as one bulk POST, and
+checks that both end on the same difficulty. Set --learner-db to measure
+the SQLite learner store instead of the in-memory one.
+
+Run from the project root:
+    python -m benchmarks.bench_submit_answers --batch 10 50 200
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+
+def make_session(question_bank, size, rng):
+    attempts = []
+    for _ in range(size):
+        question_id = rng.randrange(len(question_bank))
+        answer = question_bank.get(question_id)['answer']
+        attempts.append({
+            'question_id': question_id,
+            'answer': answer if rng.random() < 0.7 else 'z',
+            'correct_answer': answer,
+            'time_taken': round(rng.uniform(2, 30), 1),
+        })
+    return attempts
+
+
+def replay_single(app, attempts):
+    client = app.test_client()
+    for attempt in attempts:
+        response = client.post('/submit_answer', data=attempt)
+    return response.get_json()['next_difficulty']
+
+
+def replay_bulk(app, attempts):
+    client = app.test_client()
+    response = client.post('/submit_answers', json={'attempts': attempts})
+    return response.get_json()['next_difficulty']
+
+
+def measure(replay, app, sessions):
+    finals = []
+    start = time.perf_counter()
+    for attempts in sessions:
+        finals.append(replay(app, attempts))
+    return sum(len(a) for a in sessions) / (time.perf_counter() - start), finals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--batch', type=int, nargs='+', default=[10, 50, 200], help="Answers per buffered session")
+    parser.add_argument('--answers', type=int, default=5000, help="Answers replayed per measurement")
+    parser.add_argument('--questions', default='questions.json')
+    parser.add_argument('--learner-db', action='store_true', help="Use a temporary SQLite learner store")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    os.environ['QUESTION_BANK'] = args.questions
+    os.environ.setdefault('TUTOR_WARM_UP', '0')
+    db_dir = tempfile.TemporaryDirectory() if args.learner_db else None
+    if db_dir is not None:
+        os.environ['LEARNER_STORE_DB'] = os.path.join(db_dir.name, 'learners.db')
+    import app as app_module
+
+    rng = random.Random(args.seed)
+    print(f"📮 {args.answers:,} answers per run, {'SQLite' if args.learner_db else 'in-memory'} learner store")
+    try:
+        for size in args.batch:
+            sessions = [make_session(app_module.question_bank, size, rng) for _ in range(max(1, args.answers // size))]
+            single, single_finals = measure(replay_single, app_module.app, sessions)
+            bulk, bulk_finals = measure(replay_bulk, app_module.app, sessions)
+            status = "same final difficulty" if single_finals == bulk_finals else "FINAL DIFFICULTY MISMATCH"
+            print(f"  batch {size:4d}: single {single:9,.0f} answers/s  bulk {bulk:9,.0f} answers/s  "
+                  f"speedup {bulk / single:6.1f}x  ({status})")
+    finally:
+        if db_dir is not None:
+            db_dir.cleanup()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+Environment steps per second for 1, 8 and 64 parallel learners.
+
+Compares VectorizedLearningEnv (one NumPy step for all learners) with
+DummyVecEnv / SubprocVecEnv over AdaptiveLearningEnv. With --learn, also
+measures DQN.learn throughput on each configuration.
+
+Run from the project root:
+    python -m benchmarks.bench_vec_env --n-envs 1 8 64
+"""
+import argparse
+import time
+
+import numpy as np
+
+
+def make_env(kind, n_envs, seed):
+    if kind == 'numpy':
+        from src.vec_env import VectorizedLearningEnv
+        return VectorizedLearningEnv(num_envs=n_envs, seed=seed)
+    from stable_baselines3.common.env_util import make_vec_env
+    from stable_baselines3.common.vec_env import DummyVecEnv, SubprocVecEnv
+    from src.rl_env import AdaptiveLearningEnv
+    vec_env_cls = SubprocVecEnv if kind == 'subproc' else DummyVecEnv
+    return make_vec_env(AdaptiveLearningEnv, n_envs=n_envs, seed=seed, vec_env_cls=vec_env_cls)
+
+
+def step_rate(env, steps, seed):
+    rng = np.random.default_rng(seed)
+    env.reset()
+    actions = rng.integers(0, 3, size=(steps, env.num_envs))
+    start = time.perf_counter()
+    for step_actions in actions:
+        env.step(step_actions)
+    return steps * env.num_envs / (time.perf_counter() - start)
+
+
+def learn_rate(env, timesteps, seed):
+    from stable_baselines3 import DQN
+    model = DQN('MlpPolicy', env, seed=seed, learning_starts=100, verbose=0)
+    start = time.perf_counter()
+    model.learn(total_timesteps=timesteps)
+    return timesteps / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--n-envs', type=int, nargs='+', default=[1, 8, 64])
+    parser.add_argument('--kinds', nargs='+', default=['numpy', 'dummy', 'subproc'], choices=['numpy', 'dummy', 'subproc'])
+    parser.add_argument('--steps', type=int, default=2000, help="Vector steps per measurement")
+    parser.add_argument('--learn', type=int, default=0, help="Also time DQN.learn for this many timesteps")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'env':>8} {'n_envs':>7} {'env steps/s':>14}" + (f" {'learn steps/s':>14}" if args.learn else ""))
+    for kind in args.kinds:
+        for n_envs in args.n_envs:
+            try:
+                env = make_env(kind, n_envs, args.seed)
+            except ImportError as e:
+                print(f"{kind:>8} {n_envs:>7}   skipped ({e})")
+                continue
+            try:
+                line = f"{kind:>8} {n_envs:>7} {step_rate(env, args.steps, args.seed):>14,.0f}"
+                if args.learn:
+                    line += f" {learn_rate(env, args.learn, args.seed):>14,.0f}"
+            finally:
+                env.close()
+            print(line)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+import argparse
+import os
+import time
+
+import numpy as np
+
+from src.decision_table import DEFAULT_BINS, DecisionTable, agreement, build_decision_table, record_agreement
+
+MODEL_PATH = "model/adaptive_difficulty_dqn_v4.zip"
+TABLE_PATH = "model/rl_decision_table.npy"
+
+
+def load_model(path):
+    if path.endswith('.npz'):
+        from src.policy_export import PolicyRunner
+        return PolicyRunner(path)
+    from stable_baselines3 import DQN
+    return DQN.load(path, device='cpu')
+
+
+def rollout_observations(model, steps, seed):
+    """Observations visited by the greedy policy in AdaptiveLearningEnv."""
+    from src.rl_env import AdaptiveLearningEnv
+    env = AdaptiveLearningEnv()
+    obs, _ = env.reset(seed=seed)
+    visited = []
+    for _ in range(steps):
+        visited.append(np.asarray(obs))
+        action, _ = model.predict(obs, deterministic=True)
+        obs, _, terminated, truncated, _ = env.step(int(np.asarray(action).item()))
+        if terminated or truncated:
+            obs, _ = env.reset()
+    return np.stack(visited)
+
+
+def per_call_us(predict, obs, calls=2000):
+    start = time.perf_counter()
+    for _ in range(calls):
+        predict(obs, deterministic=True)
+    return (time.perf_counter() - start) * 1e6 / calls
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Tabulate the DQN's greedy action over a grid of observations "
+                    "(set RL_TABLE_PATH to serve it from app.py)."
+    )
+    parser.add_argument('--model', default=MODEL_PATH, help="DQN .zip or export_policy.py .npz")
+    parser.add_argument('--out', default=TABLE_PATH)
+    parser.add_argument('--bins', type=int, nargs='+', default=[DEFAULT_BINS], help="Cells per dimension (one or per dim)")
+    parser.add_argument('--low', type=float, nargs='+', default=None, help="Grid lower bounds (default: the space's)")
+    parser.add_argument('--high', type=float, nargs='+', default=None, help="Grid upper bounds (default: the space's)")
+    parser.add_argument('--samples', type=int, default=100_000, help="Uniform in-grid samples for the agreement check")
+    parser.add_argument('--rollout-steps', type=int, default=10_000,
+                        help="Also check agreement on states visited in AdaptiveLearningEnv (0 to skip)")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    model = load_model(args.model)
+    os.makedirs(os.path.dirname(args.out) or '.', exist_ok=True)
+    start = time.perf_counter()
+    bins = args.bins[0] if len(args.bins) == 1 else args.bins
+    meta = build_decision_table(model, args.out, bins, args.low, args.high, source=args.model)
+    print(f"✅ Tabulated {meta['cells']:,} cells ({os.path.getsize(args.out) / 1024:.1f} KiB) "
+          f"in {time.perf_counter() - start:.1f}s -> {args.out}")
+
+    table = DecisionTable(args.out)
+    rng = np.random.default_rng(args.seed)
+    if table.kind == 'box':
+        uniform = rng.uniform(table.low, table.high, size=(args.samples, len(table.bins))).astype(np.float32)
+        uniform = uniform.reshape((-1,) + table.shape)
+    else:
+        uniform = rng.integers(0, table.bins[0], args.samples)
+    results = {}
+    results['uniform'], _ = agreement(table, model, uniform)
+    print(f"  agreement on {args.samples:,} uniform samples: {results['uniform']:.2%}")
+    if args.rollout_steps:
+        visited = rollout_observations(model, args.rollout_steps, args.seed)
+        results['rollout'], in_grid = agreement(table, model, visited)
+        results['rollout_in_grid'] = in_grid
+        if results['rollout'] is None:
+            print("  no visited state falls inside the grid; widen --low/--high")
+        else:
+            print(f"  agreement on {len(visited):,} visited states: {results['rollout']:.2%} "
+                  f"({in_grid:.1%} inside the grid, the rest fall back to the network)")
+    record_agreement(args.out, results)
+
+    single = uniform[0]
+    print(f"  per decision: table {per_call_us(table.predict, single):.1f} us, "
+          f"network {per_call_us(model.predict, single):.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+import argparse
+import os
+import time
+
+from src.question_bank_file import convert_questions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Convert questions.json to the memory-mapped .qbank format (serve it with QUESTION_BANK=<out>)."
+    )
+    parser.add_argument('json_path', nargs='?', default='questions.json')
+    parser.add_argument('--out', default='questions.qbank')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    count = convert_questions(args.json_path, args.out)
+    elapsed = time.perf_counter() - start
+    size = os.path.getsize(args.out)
+    print(f"✅ Wrote {count:,} questions ({size / 2**20:.1f} MiB) in {elapsed:.1f}s -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+import argparse
+import sqlite3
+import time
+
+import pandas as pd
+
+from src.learner_features import build_training_frame
+
+
+def load_attempts(db_path):
+    with sqlite3.connect(db_path) as db:
+        return pd.read_sql_query(
+            "SELECT learner_id, difficulty, correct, seconds FROM attempts ORDER BY id", db
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Build a finall.csv-shaped training set from the learner attempt log."
+    )
+    parser.add_argument('source', help="LEARNER_STORE_DB SQLite file, or a CSV with learner_id, difficulty, correct[, seconds]")
+    parser.add_argument('--out', default='finall.csv')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.source.endswith('.csv'):
+        attempts = pd.read_csv(args.source)
+    else:
+        attempts = load_attempts(args.source)
+    frame = build_training_frame(attempts)
+    frame.to_csv(args.out, index=False)
+    elapsed = time.perf_counter() - start
+    print(f"✅ Built {len(frame):,} rows from {len(attempts):,} attempts in {elapsed:.1f}s -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+import argparse
+import os
+import pickle
+
+from src.forest_export import export_forest
+
+MODEL_PATH = "model/next_difficulty_model.pkl"
+FOREST_PATH = "model/next_difficulty_forest.npz"
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compile the next-difficulty RandomForest to flat arrays (set ML_FOREST_PATH to use it in app.py)."
+    )
+    parser.add_argument('--model', default=MODEL_PATH)
+    parser.add_argument('--out', default=FOREST_PATH)
+    args = parser.parse_args()
+
+    with open(args.model, "rb") as f:
+        model = pickle.load(f)
+    nodes = export_forest(model, args.out)
+    print(f"✅ Compiled {len(model.estimators_)} trees ({nodes:,} nodes): "
+          f"{os.path.getsize(args.model) / 2**20:.1f} MiB -> {os.path.getsize(args.out) / 2**20:.1f} MiB at {args.out}")
+
+
+if __name__ == "__main__":
+    main()
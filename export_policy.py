@@ -0,0 +1,27 @@
+import argparse
+import os
+
+from stable_baselines3 import DQN
+from src.policy_export import QUANTIZATIONS, export_dqn_policy
+
+MODEL_PATH = "model/adaptive_difficulty_dqn_v4.zip"
+POLICY_PATH = "model/adaptive_difficulty_policy.npz"
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Export the DQN Q-network for torch-free serving (set RL_POLICY_PATH to use it in app.py)."
+    )
+    parser.add_argument('--model', default=MODEL_PATH)
+    parser.add_argument('--out', default=POLICY_PATH)
+    parser.add_argument('--quantize', choices=QUANTIZATIONS, default='float32')
+    args = parser.parse_args()
+
+    model = DQN.load(args.model, device='cpu')
+    meta = export_dqn_policy(model, args.out, args.quantize)
+    size = os.path.getsize(args.out)
+    print(f"✅ Exported {meta['layers']}-layer Q-network ({args.quantize}, {size / 1024:.1f} KiB) -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
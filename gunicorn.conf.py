@@ -0,0 +1,32 @@
+# gunicorn -c gunicorn.conf.py app:app
+#
+# The app is imported once in the master and its model weights are loaded
+# there before workers are forked, so they are shared copy-on-write. Inference
+# (which starts torch's thread pools) only runs after the fork: each worker
+# warms up with one grammar correction and one RL decision in post_fork.
+# Set TUTOR_WARM_UP=0 to skip both and load models lazily in each worker.
+#
+# Learner progress is only shared between workers when LEARNER_STORE_DB is set,
+# so without it a single worker is started, and asking for more is refused.
+import os
+
+bind = os.environ.get("GUNICORN_BIND", "127.0.0.1:8000")
+workers = int(os.environ.get("GUNICORN_WORKERS", 4 if os.environ.get("LEARNER_STORE_DB") else 1))
+preload_app = True
+
+
+def on_starting(server):
+    from app import check_worker_count
+    check_worker_count(server.cfg.workers)
+
+
+def when_ready(server):
+    if os.environ.get("TUTOR_WARM_UP", "1") != "0":
+        from app import preload
+        preload()
+
+
+def post_fork(server, worker):
+    if os.environ.get("TUTOR_WARM_UP", "1") != "0":
+        from app import warm_up
+        warm_up()
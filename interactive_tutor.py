@@ -1,18 +1,14 @@
 from flask import Flask, render_template, request, redirect, url_for, jsonify, session
 import json
+import os
 import random
 import pickle
+from src.question_bank import open_question_bank
 
 app = Flask(__name__)
 app.secret_key = "adaptive_ai_tutor_secret_key"
 
-def load_questions(file_path='questions.json'):
-    try:
-        with open(file_path, 'r', encoding='utf-8') as file:
-            return json.load(file)
-    except Exception as e:
-        print(f"Error loading questions: {e}")
-        return []
+question_bank = open_question_bank(os.environ.get("QUESTION_BANK", "questions.json"))
 
 @app.route('/')
 def home():
@@ -33,20 +29,13 @@ def main_tutor():
             session['language'] = selected_language
         return redirect(url_for('main_tutor'))
 
-    questions = load_questions()
-    if not questions:
+    if not len(question_bank):
         return render_template('main_tutor.html', error="No questions loaded.")
 
-    filtered_questions = [
-        q for q in questions
-        if q.get("language") == session['language'] and q.get("difficulty") == session['current_difficulty']
-    ]
-
-    if not filtered_questions:
+    question = question_bank.pick(session['language'], session['current_difficulty'])
+    if question is None:
         return render_template('main_tutor.html', error="No questions available for this language/difficulty.")
 
-    question = random.choice(filtered_questions)
-
     return render_template(
         'main_tutor.html',
         question=question,
@@ -1,46 +1,57 @@
+import argparse
 import os
+import sys
 from stable_baselines3 import DQN
-from rl_env import AdaptiveLearningEnv
-import matplotlib.pyplot as plt
+from src.policy_eval import evaluate_policy, make_eval_env, write_report
 
 MODEL_PATH = "model/adaptive_difficulty_dqn_v4.zip"
-
-def load_and_test_model():
-    env = AdaptiveLearningEnv()
-
-    if not os.path.exists(MODEL_PATH):
-        print(f"❌ Model not found at {MODEL_PATH}")
-        return
-
-    model = DQN.load(MODEL_PATH)
-
-    total_rewards = []
-    for episode in range(10):
-        # 👉 Unpack reset()
-        obs, _ = env.reset()
-        done = False
-        total_reward = 0
-
-        while not done:
-            action, _states = model.predict(obs)
-            # 👉 Unpack all five returns from step()
-            obs, reward, terminated, truncated, info = env.step(action)
-            done = terminated or truncated
-            total_reward += reward
-
-        total_rewards.append(total_reward)
-
-    avg_reward = sum(total_rewards) / len(total_rewards)
-    print(f"✅ Average reward over 10 episodes: {avg_reward}")
-
-    plt.figure(figsize=(10, 5))
-    plt.plot(total_rewards, label="Total Rewards per Episode")
-    plt.xlabel("Episode")
-    plt.ylabel("Reward")
-    plt.title("Model Testing - Rewards per Episode")
-    plt.legend()
-    plt.tight_layout()
-    plt.show()
+# VectorizedLearningEnv has its own observation, so it is evaluated with the agent trained on it
+VECTORIZED_MODEL_PATH = "model/adaptive_difficulty_dqn_vectorized.zip"
+
+def load_and_test_model(n_episodes=1000, n_envs=8, vec_env='dummy', seed=0, deterministic=True,
+                        confidence=0.95, metrics_path='eval_metrics.json', plot_path='eval_rewards.png',
+                        model_path=None):
+    model_path = model_path or (VECTORIZED_MODEL_PATH if vec_env == 'numpy' else MODEL_PATH)
+    if not os.path.exists(model_path):
+        print(f"❌ Model not found at {model_path}")
+        return None
+
+    model = DQN.load(model_path)
+    env = make_eval_env(n_envs, vec_env, seed)
+    if model.observation_space.shape != env.observation_space.shape:
+        env.close()
+        print(f"❌ {model_path} expects observations of shape {model.observation_space.shape}, "
+              f"the {vec_env} env gives {env.observation_space.shape}; "
+              "evaluate each agent on the env it was trained on (train_rl_agent.py --vec-env).")
+        return None
+    try:
+        metrics, episode_rewards = evaluate_policy(model, env, n_episodes, seed, deterministic, confidence)
+    finally:
+        env.close()
+
+    print(f"✅ Average reward over {metrics['episodes']:,} episodes: {metrics['reward_mean']:.4f} "
+          f"± {metrics['reward_std']:.4f} "
+          f"({metrics['confidence']:.0%} CI [{metrics['reward_ci_low']:.4f}, {metrics['reward_ci_high']:.4f}], "
+          f"{metrics['episodes_per_second']:,.0f} episodes/s)")
+
+    write_report(metrics, episode_rewards, metrics_path, plot_path)
+    print(f"✅ Metrics written to {metrics_path}, plot to {plot_path}")
+    return metrics
 
 if __name__ == "__main__":
-    load_and_test_model()
+    parser = argparse.ArgumentParser(description="Evaluate the trained DQN policy headlessly.")
+    parser.add_argument('--episodes', type=int, default=1000)
+    parser.add_argument('--n-envs', type=int, default=8, help="Episodes played in parallel")
+    parser.add_argument('--vec-env', choices=['dummy', 'subproc', 'numpy'], default='dummy',
+                        help="dummy/subproc: copies of AdaptiveLearningEnv; numpy: VectorizedLearningEnv")
+    parser.add_argument('--model', default=None,
+                        help=f"DQN to evaluate (default: {MODEL_PATH}, or {VECTORIZED_MODEL_PATH} with --vec-env numpy)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--stochastic', action='store_true', help="Sample actions instead of taking the greedy one")
+    parser.add_argument('--confidence', type=float, choices=[0.90, 0.95, 0.99], default=0.95)
+    parser.add_argument('--metrics-out', default='eval_metrics.json')
+    parser.add_argument('--plot-out', default='eval_rewards.png')
+    args = parser.parse_args()
+    metrics = load_and_test_model(args.episodes, args.n_envs, args.vec_env, args.seed, not args.stochastic,
+                                  args.confidence, args.metrics_out, args.plot_out, args.model)
+    sys.exit(0 if metrics is not None else 1)
@@ -1,37 +1,21 @@
-import json
-import random
+import argparse
 import time
+from src.question_bank import open_question_bank
+from src.spaced_repetition import QuestionScheduler
 
-def load_questions(file_path=r'questions.json'):
-    """
-    Load questions from a JSON file.
-    """
-    try:
-        with open(file_path, 'r', encoding='utf-8') as file:  # Specify UTF-8 encoding
-            questions = json.load(file)
-        return questions
-    except FileNotFoundError:
-        print("❌ Error: Questions file not found.")
-        return []
-    except json.JSONDecodeError:
-        print("❌ Error: Failed to decode JSON file.")
-        return []
-
-def ask_question(questions, current_difficulty, user_performance):
+LEARNER_ID = "cli"
+
+def ask_question(scheduler, current_difficulty, user_performance, language=None):
     """
     Ask a question based on the current difficulty level and provide personalized suggestions.
+    Questions come from every language unless `language` is given.
     """
-    if not questions:
-        print("⚠️ No questions available.")
-        return current_difficulty
-
-    # Filter questions by difficulty
-    filtered_questions = [q for q in questions if q["difficulty"] == current_difficulty]
-    if not filtered_questions:
+    # Next due or unseen question for this difficulty, skipping the last few shown
+    question = scheduler.next_question(LEARNER_ID, language, current_difficulty)
+    if question is None:
         print(f"⚠️ No questions available for difficulty level: {current_difficulty}.")
         return current_difficulty
 
-    question = random.choice(filtered_questions)
     print(f"\n🧠 Difficulty: {current_difficulty}")
     print("🧠 Question:")
     print(question["question"])
@@ -58,6 +42,7 @@ def ask_question(questions, current_difficulty, user_performance):
         print(f"💡 Tip: {question.get('tip', 'Review the related topic for better understanding.')}")
         user_performance["incorrect"] += 1
         feedback = 0  # Incorrect answer
+    scheduler.record(LEARNER_ID, question["id"], feedback, language, current_difficulty)
 
     # Provide personalized suggestions
     total_attempts = user_performance["correct"] + user_performance["incorrect"]
@@ -85,15 +70,19 @@ def ask_question(questions, current_difficulty, user_performance):
     return next_difficulty
 
 def main():
+    parser = argparse.ArgumentParser(description="Adaptive AI Tutor in the terminal.")
+    parser.add_argument('--language', default=None, help="Only ask questions in this language (default: all)")
+    args = parser.parse_args()
+
     print("Welcome to the Adaptive AI Tutor!")
 
-    # Load questions from JSON
-    questions = load_questions(
-        r'questions.json')  # Adjust the path if needed
+    # Load questions from JSON (or a .qbank file)
+    question_bank = open_question_bank(r'questions.json')  # Adjust the path if needed
 
-    if not questions:
+    if not len(question_bank):
         print("⚠️ No questions loaded. Exiting.")
         return
+    scheduler = QuestionScheduler(question_bank)
 
     # Start with an initial difficulty level
     current_difficulty = "easy"
@@ -101,7 +90,7 @@ def main():
 
     while True:
         # Ask a question and get the next difficulty level
-        current_difficulty = ask_question(questions, current_difficulty, user_performance)
+        current_difficulty = ask_question(scheduler, current_difficulty, user_performance, args.language)
 
         # Exit option
         choice = input("\n❓ Do you want to answer another question? (y/n): ").strip().lower()
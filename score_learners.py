@@ -0,0 +1,31 @@
+import argparse
+import pickle
+import time
+
+from src.predictor import DEFAULT_CHUNK_SIZE, predict_next_difficulty_batch
+
+MODEL_PATH = "model/next_difficulty_model.pkl"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score a CSV of learners with the next-difficulty model.")
+    parser.add_argument('csv_path', help="CSV with the same feature columns as finall.csv")
+    parser.add_argument('--out', default='next_difficulty_predictions.npy', help="Output .npy file")
+    parser.add_argument('--model', default=MODEL_PATH)
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument('--n-jobs', type=int, default=-1)
+    args = parser.parse_args()
+
+    with open(args.model, "rb") as f:
+        model = pickle.load(f)
+
+    start = time.perf_counter()
+    rows = predict_next_difficulty_batch(
+        model, csv_path=args.csv_path, chunk_size=args.chunk_size, n_jobs=args.n_jobs, out_path=args.out
+    )
+    elapsed = time.perf_counter() - start
+    print(f"✅ Scored {rows:,} learners in {elapsed:.1f}s ({rows / max(elapsed, 1e-9):,.0f}/s) -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
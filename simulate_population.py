@@ -0,0 +1,52 @@
+import argparse
+import time
+
+from src.population_sim import POLICIES, compare_policies, write_comparison
+
+MODEL_PATHS = {
+    'forest': "model/next_difficulty_model.pkl",
+    'dqn': "model/adaptive_difficulty_dqn_vectorized.zip",
+}
+
+MODEL_REQUIREMENTS = """
+The simulated learners produce the app's feature schema and
+VectorizedLearningEnv's observation, so the model-backed policies are not
+run by default:
+  forest  needs a model trained by train_ml_model.py on build_training_set.py
+          output (the schema app.py checks for);
+  dqn     needs a model trained with `train_rl_agent.py --vec-env numpy`;
+          the AdaptiveLearningEnv model (adaptive_difficulty_dqn_v4.zip)
+          is refused.
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare difficulty policies offline on a large simulated learner population.",
+        epilog=MODEL_REQUIREMENTS, formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument('--policies', nargs='+', default=['rule', 'random'], choices=POLICIES)
+    parser.add_argument('--learners', type=int, default=100_000)
+    parser.add_argument('--steps', type=int, default=200, help="Attempts per learner")
+    parser.add_argument('--session-length', type=int, default=20, help="Attempts between breaks that clear fatigue")
+    parser.add_argument('--workers', type=int, default=None, help="Processes (default: one per CPU)")
+    parser.add_argument('--shard-size', type=int, default=50_000, help="Learners per parallel shard")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--forest-model', default=MODEL_PATHS['forest'], help=".pkl or an export_forest.py .npz")
+    parser.add_argument('--dqn-model', default=MODEL_PATHS['dqn'], help=".zip or an export_policy.py .npz")
+    parser.add_argument('--out', default="population_comparison.json", help="Summaries and curves as JSON")
+    parser.add_argument('--plot-out', default="population_comparison.png")
+    args = parser.parse_args()
+
+    model_paths = {'forest': args.forest_model, 'dqn': args.dqn_model}
+    policies = {policy: model_paths.get(policy) for policy in args.policies}
+    print(f"🧪 {args.learners:,} learners x {args.steps} attempts under {', '.join(policies)}")
+    start = time.perf_counter()
+    results = compare_policies(policies, args.learners, args.steps, args.workers, args.seed,
+                               args.session_length, args.shard_size)
+    write_comparison(results, args.out, args.plot_out)
+    print(f"⏱️ Finished in {time.perf_counter() - start:.1f}s; results in {args.out} and {args.plot_out}")
+
+
+if __name__ == "__main__":
+    main()
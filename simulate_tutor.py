@@ -4,6 +4,7 @@ import pickle
 from stable_baselines3 import DQN
 from src.rl_env import AdaptiveLearningEnv
 from src.nlp_feedback import correct_grammar
+from src.learner_features import build_features_bulk
 
 # Load ML model for predicting next difficulty
 with open("model/next_difficulty_model.pkl", "rb") as f:
@@ -34,7 +35,10 @@ def simulate_tutor_session(user_features, sentence):
     print(f"🤖 RL Suggests to make it: **{action_map[action]}**")
 
 if __name__ == "__main__":
-    user_features = [0.2] * 18  # Dummy features matching model input size
+    # Features of a sample learner after a short session: (difficulty, correct, seconds)
+    session_log = [("easy", 1, 8.0), ("easy", 1, 6.5), ("medium", 0, 14.0), ("medium", 1, 11.0), ("medium", 1, 9.5)]
+    difficulties, correct, seconds = zip(*session_log)
+    user_features = build_features_bulk(["demo"] * len(session_log), difficulties, correct, seconds)[-1]
     sentence = "He go to school every day"
     simulate_tutor_session(user_features, sentence)
 
@@ -0,0 +1,158 @@
+import json
+import os
+
+import numpy as np
+
+from src.npy_stream import NpyStreamWriter
+from src.predictor import TARGET_COLUMN
+
+DEFAULT_CHUNK_SIZE = 200_000
+
+
+def _source_signature(csv_path):
+    stat = os.stat(csv_path)
+    return {'csv_path': os.path.abspath(csv_path), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def _downcast_target(raw_path, out_path, chunk_size):
+    """Rewrite a float64 target file as int8 in chunks; the caller checked every value fits."""
+    raw = np.load(raw_path, mmap_mode='r')
+    with NpyStreamWriter(out_path, np.int8) as writer:
+        for start in range(0, len(raw), chunk_size):
+            writer.write(raw[start:start + chunk_size].astype(np.int8))
+    del raw
+    os.remove(raw_path)
+
+
+def cache_csv(csv_path, cache_dir, target=TARGET_COLUMN, chunk_size=DEFAULT_CHUNK_SIZE, feature_dtype=np.float32,
+              log=print):
+    """
+    Parse a finall.csv-shaped CSV once into `.npy` files under `cache_dir`.
+
+    The CSV is read `chunk_size` rows at a time, so memory stays bounded by
+    one chunk. Features are parsed as `feature_dtype` (float32 by default,
+    float64 to keep full precision) and go to X.npy, one field per column,
+    viewable as an (n, n_features) matrix without copying. The target is
+    parsed as float64 and goes to y.npy, downcast to int8 when all values
+    are small integers. The cache is reused as long as the CSV's size and
+    mtime and the feature dtype match. Returns the path of the cache's meta.json.
+    """
+    feature_dtype = np.dtype(feature_dtype)
+    os.makedirs(cache_dir, exist_ok=True)
+    meta_path = os.path.join(cache_dir, 'meta.json')
+    signature = _source_signature(csv_path)
+    if os.path.exists(meta_path):
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta.get('source') == signature and meta.get('feature_dtype', 'float32') == feature_dtype.name:
+            log(f"♻️ Reusing parsed dataset in {cache_dir} ({meta['rows']:,} rows)")
+            return meta_path
+
+    import pandas as pd
+
+    columns = list(pd.read_csv(csv_path, nrows=0).columns)
+    if target not in columns:
+        raise ValueError(f"{csv_path} has no {target!r} column.")
+    feature_columns = [column for column in columns if column != target]
+    x_dtype = np.dtype([(column, feature_dtype) for column in feature_columns])
+    column_dtypes = {column: feature_dtype for column in feature_columns}
+    column_dtypes[target] = np.float64
+
+    x_path = os.path.join(cache_dir, 'X.npy')
+    y_path = os.path.join(cache_dir, 'y.npy')
+    y_raw_path = os.path.join(cache_dir, 'y.float64.npy')
+    integral = True
+    rows = 0
+    with NpyStreamWriter(x_path, x_dtype) as x_writer, NpyStreamWriter(y_raw_path, np.float64) as y_writer:
+        for frame in pd.read_csv(csv_path, chunksize=chunk_size, dtype=column_dtypes):
+            features = np.ascontiguousarray(frame[feature_columns].to_numpy(dtype=feature_dtype))
+            x_writer.write(features.view(x_dtype).reshape(-1))
+            y = frame[target].to_numpy(dtype=np.float64)
+            y_writer.write(y)
+            integral = integral and bool(np.all((y == np.round(y)) & (y >= -128) & (y <= 127)))
+            rows += len(frame)
+            log(f"  parsed {rows:,} rows")
+
+    if integral:
+        _downcast_target(y_raw_path, y_path, chunk_size)
+    else:
+        os.replace(y_raw_path, y_path)
+
+    meta = {'source': signature, 'rows': rows, 'feature_columns': feature_columns, 'target': target,
+            'feature_dtype': feature_dtype.name}
+    with open(meta_path, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2)
+    return meta_path
+
+
+def load_cached(cache_dir):
+    """Memory-mapped (X, y, meta) from `cache_csv`; X is an (n, n_features) view in the cached feature dtype."""
+    with open(os.path.join(cache_dir, 'meta.json'), 'r', encoding='utf-8') as f:
+        meta = json.load(f)
+    X = np.load(os.path.join(cache_dir, 'X.npy'), mmap_mode='r')
+    X = X.view(np.dtype(meta.get('feature_dtype', 'float32'))).reshape(len(X), len(meta['feature_columns']))
+    y = np.load(os.path.join(cache_dir, 'y.npy'), mmap_mode='r')
+    return X, y, meta
+
+
+class StrideSplit:
+    """
+    Deterministic train/test split of `n_rows` rows: every `stride`-th row,
+    starting with the first, is held out.
+
+    Rows are addressed by their position within the train or test part and
+    mapped to row numbers arithmetically, so the split itself never builds
+    an index over the whole file.
+    """
+
+    def __init__(self, n_rows, test_size):
+        self.n_rows = n_rows
+        self.stride = max(2, round(1 / test_size))
+        self.n_test = -(-n_rows // self.stride)
+        self.n_train = n_rows - self.n_test
+
+    def train_rows(self, positions):
+        """Row numbers of the given train positions (increasing when the positions are)."""
+        positions = np.asarray(positions, dtype=np.int64)
+        per_stride = self.stride - 1
+        return positions // per_stride * self.stride + positions % per_stride + 1
+
+    def test_rows(self, positions):
+        """Row numbers of the given test positions."""
+        return np.asarray(positions, dtype=np.int64) * self.stride
+
+
+def sample_positions(n, size, rng, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Sorted uniform sample of `size` of range(n) without replacement; all of
+    them when `size` is None or at least `n`.
+
+    How many come from each block of `chunk_size` is drawn first, then the
+    positions within each block, so memory is bounded by the sample and one
+    block rather than by `n`.
+    """
+    if size is None or size >= n:
+        return np.arange(n)
+    starts = np.arange(0, n, chunk_size)
+    lengths = np.minimum(chunk_size, n - starts)
+    counts = rng.multivariate_hypergeometric(lengths, size, method='marginals')
+    picked = [start + np.sort(rng.choice(length, size=count, replace=False))
+              for start, length, count in zip(starts, lengths, counts) if count]
+    return np.concatenate(picked) if picked else np.empty(0, dtype=np.int64)
+
+
+def gather_rows(data, rows, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    `data[rows]` for sorted `rows` of a memory-mapped array, copied one
+    window of `chunk_size` file rows at a time, so only the selected rows
+    end up in memory.
+    """
+    rows = np.asarray(rows, dtype=np.int64)
+    out = np.empty((len(rows),) + data.shape[1:], dtype=data.dtype)
+    i = 0
+    while i < len(rows):
+        start = int(rows[i])
+        j = int(np.searchsorted(rows, start + chunk_size, side='left'))
+        out[i:j] = data[start:start + chunk_size][rows[i:j] - start]
+        i = j
+    return out
@@ -0,0 +1,227 @@
+import json
+import os
+import uuid
+
+import numpy as np
+
+from src.npy_stream import NpyStreamWriter
+
+MAX_CELLS = 1 << 28  # one byte per cell
+MAX_ACTIONS = 256  # actions are stored as uint8
+DEFAULT_BINS = 16
+BUILD_ID_BYTES = 16  # the table starts with its build id, which its meta repeats
+_CHUNK = 1 << 16
+
+
+def _meta_path(table_path):
+    return os.path.splitext(table_path)[0] + '.json'
+
+
+def _write_meta(meta_path, meta):
+    # Written next to the target and renamed into place, so readers see the old or the new meta, whole
+    tmp_path = f"{meta_path}.tmp{os.getpid()}"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2)
+    os.replace(tmp_path, meta_path)
+
+
+def observation_grid(model, low=None, high=None):
+    """
+    (kind, shape, low, high) of a policy's observation space.
+
+    Works for a stable-baselines3 model or a PolicyRunner. Box bounds come
+    from the space unless `low`/`high` (scalars or per-dimension lists)
+    override them; they must end up finite.
+    """
+    space = getattr(model, 'observation_space', None)
+    if space is not None and hasattr(space, 'n'):
+        return 'discrete', (), None, None
+    if space is not None:
+        shape = tuple(space.shape)
+        space_low = np.asarray(space.low, dtype=np.float64).reshape(-1)
+        space_high = np.asarray(space.high, dtype=np.float64).reshape(-1)
+    else:
+        observation = model.observation
+        if observation['kind'] == 'discrete':
+            return 'discrete', (), None, None
+        shape = tuple(observation['shape'])
+        space_low = np.full(int(np.prod(shape)), -np.inf)
+        space_high = np.full(int(np.prod(shape)), np.inf)
+    low = space_low if low is None else np.broadcast_to(np.asarray(low, dtype=np.float64), space_low.shape).copy()
+    high = space_high if high is None else np.broadcast_to(np.asarray(high, dtype=np.float64), space_high.shape).copy()
+    if not (np.all(np.isfinite(low)) and np.all(np.isfinite(high))):
+        raise ValueError("The observation space is unbounded; give finite low/high bounds for the grid.")
+    if np.any(high <= low):
+        raise ValueError("Every grid dimension needs high > low.")
+    return 'box', shape, low, high
+
+
+def build_decision_table(model, out_path, bins=DEFAULT_BINS, low=None, high=None, source=None, log=print):
+    """
+    Precompute the greedy action of `model` on a grid of observations.
+
+    Each Box dimension is cut into `bins` equal cells (an int or one per
+    dimension) and the action at every cell centre is stored as one uint8
+    in a flat `.npy` file, in C order over the cells, with the grid in a
+    `.json` next to it. A Discrete space is tabulated exactly. Returns the meta.
+
+    Both files are written under temporary names and renamed into place, the
+    meta first and the table last, so workers that have the old table mapped
+    keep reading it and a watcher of the table's mtime reloads only once the
+    new pair is complete. The table's first BUILD_ID_BYTES bytes are a random
+    build id that the meta records too, so a loader that catches the files
+    between the two renames sees that they belong to different builds.
+    """
+    kind, shape, low, high = observation_grid(model, low, high)
+    if kind == 'discrete':
+        n = int(model.observation_space.n) if hasattr(model, 'observation_space') else model.observation['n']
+        bins = np.array([n])
+    else:
+        bins = np.broadcast_to(np.asarray(bins, dtype=np.int64), low.shape).copy()
+    cells = int(np.prod(bins))
+    if cells > MAX_CELLS:
+        raise ValueError(f"{cells:,} cells is more than {MAX_CELLS:,}; use fewer bins.")
+    n_actions = int(model.action_space.n) if hasattr(model, 'action_space') else model.n_actions
+    if n_actions > MAX_ACTIONS:
+        raise ValueError(f"{n_actions} actions do not fit the table's one byte per cell (at most {MAX_ACTIONS}).")
+
+    build_id = uuid.uuid4()
+    tmp_path = f"{out_path}.tmp{os.getpid()}"
+    try:
+        with NpyStreamWriter(tmp_path, np.uint8) as writer:
+            writer.write(np.frombuffer(build_id.bytes, dtype=np.uint8))
+            for start in range(0, cells, _CHUNK):
+                flat = np.arange(start, min(start + _CHUNK, cells))
+                if kind == 'discrete':
+                    obs = flat
+                else:
+                    index = np.stack(np.unravel_index(flat, bins), axis=1)
+                    obs = (low + (index + 0.5) * (high - low) / bins).astype(np.float32).reshape((-1,) + shape)
+                actions, _ = model.predict(obs, deterministic=True)
+                writer.write(np.asarray(actions).reshape(-1).astype(np.uint8))
+                if start and start % (_CHUNK * 64) == 0:
+                    log(f"  tabulated {start:,}/{cells:,} cells")
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    meta = {
+        'format': 2,
+        'build_id': build_id.hex,
+        'kind': kind,
+        'shape': list(shape),
+        'bins': bins.tolist(),
+        'low': None if low is None else low.tolist(),
+        'high': None if high is None else high.tolist(),
+        'cells': cells,
+        'n_actions': n_actions,
+        'source': source,
+    }
+    _write_meta(_meta_path(out_path), meta)
+    os.replace(tmp_path, out_path)
+    return meta
+
+
+class DecisionTable:
+    """
+    Greedy RL decisions served by index lookup from a `build_decision_table` file.
+
+    The table is memory-mapped read-only, so every worker on the host shares
+    one copy through the page cache. Observations are snapped to their grid
+    cell; those outside the grid go to `fallback`, a callable returning the
+    live model (it is only called when needed), or raise if there is none.
+    `predict` mirrors `DQN.predict` so the table can stand in for the model.
+
+    The table is opened before its meta is read, and a meta whose build id
+    differs from the table's is refused with ValueError: the pair is caught
+    mid-rebuild, and the registry retries once the new table lands.
+    """
+
+    def __init__(self, path, fallback=None):
+        table = np.load(path, mmap_mode='r')
+        with open(_meta_path(path), 'r', encoding='utf-8') as f:
+            self.meta = json.load(f)
+        if self.meta.get('format', 1) >= 2:
+            build_id = uuid.UUID(bytes=bytes(table[:BUILD_ID_BYTES])).hex
+            if build_id != self.meta['build_id']:
+                raise ValueError(f"{path} is from build {build_id}, its meta from build {self.meta['build_id']}.")
+            table = table[BUILD_ID_BYTES:]
+        self.table = table
+        if len(self.table) != self.meta['cells']:
+            raise ValueError(f"{path} has {len(self.table)} cells, its meta says {self.meta['cells']}.")
+        self.path = path
+        self.kind = self.meta['kind']
+        self.shape = tuple(self.meta['shape'])
+        self.bins = np.asarray(self.meta['bins'], dtype=np.int64)
+        if self.kind == 'box':
+            self.low = np.asarray(self.meta['low'])
+            self.high = np.asarray(self.meta['high'])
+            self._scale = self.bins / (self.high - self.low)
+        self.fallback = fallback
+        self.lookups = 0
+        self.fallbacks = 0
+
+    def cells(self, obs):
+        """(flat cell index, inside-grid mask, single) for one observation or a batch."""
+        if self.kind == 'discrete':
+            obs = np.asarray(obs, dtype=np.int64)
+            single = obs.ndim == 0
+            obs = obs.reshape(-1)
+            inside = (obs >= 0) & (obs < self.bins[0])
+            return np.where(inside, obs, 0), inside, single
+        obs = np.asarray(obs, dtype=np.float64)
+        single = obs.shape == self.shape
+        obs = obs.reshape(-1, len(self.bins))
+        inside = np.all((obs >= self.low) & (obs <= self.high), axis=1)
+        index = np.clip(np.floor((obs - self.low) * self._scale).astype(np.int64), 0, self.bins - 1)
+        return np.ravel_multi_index(index.T, self.bins), inside, single
+
+    def predict(self, obs, state=None, episode_start=None, deterministic=True):
+        """Greedy actions for one observation or a batch, as `DQN.predict` returns them."""
+        flat, inside, single = self.cells(obs)
+        actions = self.table[flat].astype(np.int64)
+        outside = ~inside
+        self.lookups += int(inside.sum())
+        if outside.any():
+            if self.fallback is None:
+                raise ValueError(f"{int(outside.sum())} observations fall outside the decision table's grid.")
+            batch = np.asarray(obs).reshape((len(flat),) + self.shape)[outside]
+            fallback_actions, _ = self.fallback().predict(batch, deterministic=True)
+            actions[outside] = np.asarray(fallback_actions).reshape(-1)
+            self.fallbacks += int(outside.sum())
+        return (actions[0] if single else actions), state
+
+    def describe(self):
+        total = self.lookups + self.fallbacks
+        return {
+            'path': self.path,
+            'cells': self.meta['cells'],
+            'bins': self.meta['bins'],
+            'lookups': self.lookups,
+            'fallbacks': self.fallbacks,
+            'fallback_rate': self.fallbacks / total if total else 0.0,
+            'agreement': self.meta.get('agreement'),
+        }
+
+
+def agreement(table, model, observations):
+    """Share of in-grid `observations` on which the table picks the live model's action, and the in-grid share."""
+    flat, inside, _ = table.cells(observations)
+    if not inside.any():
+        return None, 0.0
+    observations = np.asarray(observations)
+    if table.kind == 'box':
+        observations = observations.reshape((len(flat),) + table.shape)
+    live, _ = model.predict(observations[inside], deterministic=True)
+    matches = table.table[flat[inside]] == np.asarray(live).reshape(-1)
+    return float(matches.mean()), float(inside.mean())
+
+
+def record_agreement(table_path, results):
+    """Store measured agreement rates in the table's meta."""
+    meta_path = _meta_path(table_path)
+    with open(meta_path, 'r', encoding='utf-8') as f:
+        meta = json.load(f)
+    meta['agreement'] = results
+    _write_meta(meta_path, meta)
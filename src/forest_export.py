@@ -0,0 +1,144 @@
+import numpy as np
+
+from src.learner_features import model_feature_columns, tag_feature_schema
+
+
+def export_forest(forest, out_path):
+    """
+    Write a fitted sklearn RandomForestClassifier/Regressor as flat node arrays.
+
+    All trees are concatenated into one set of arrays: `feature` (the split
+    feature, or -(leaf id + 1) for leaves), `threshold`, `left`/`right`
+    (global node indices) and `missing_left`, plus one row of `values` per
+    leaf. Only what prediction needs is kept, so the `.npz` is much smaller
+    than the pickled estimator. The feature columns the forest was fitted
+    on are kept with it. Returns the number of nodes written.
+    """
+    is_classifier = hasattr(forest, 'classes_')
+    if getattr(forest, 'n_outputs_', 1) != 1:
+        raise ValueError("Only single-output forests can be exported.")
+
+    features, thresholds, lefts, rights, missing_left, values, roots = [], [], [], [], [], [], []
+    offset = 0
+    n_leaves = 0
+    max_depth = 0
+    for estimator in forest.estimators_:
+        tree = estimator.tree_
+        n = tree.node_count
+        is_leaf = tree.children_left == -1
+        leaf_ids = np.cumsum(is_leaf) - 1 + n_leaves
+
+        features.append(np.where(is_leaf, -(leaf_ids + 1), tree.feature).astype(np.int32))
+        thresholds.append(tree.threshold.astype(np.float64))
+        lefts.append(np.where(is_leaf, -1, tree.children_left + offset).astype(np.int32))
+        rights.append(np.where(is_leaf, -1, tree.children_right + offset).astype(np.int32))
+        missing_left.append(np.asarray(getattr(tree, 'missing_go_to_left', np.zeros(n)), dtype=bool))
+
+        value = tree.value[is_leaf, 0, :]
+        if is_classifier:
+            # Same normalization as DecisionTreeClassifier.predict_proba
+            value = value[:, :len(forest.classes_)]
+            normalizer = value.sum(axis=1)[:, np.newaxis]
+            normalizer[normalizer == 0.0] = 1.0
+            value = value / normalizer
+        values.append(value.astype(np.float64))
+
+        roots.append(offset)
+        offset += n
+        n_leaves += int(is_leaf.sum())
+        max_depth = max(max_depth, tree.max_depth)
+
+    classes = np.asarray(forest.classes_) if is_classifier else np.empty(0)
+    if classes.dtype == object:
+        classes = classes.astype(str)
+    columns = model_feature_columns(forest)
+    np.savez(
+        out_path,
+        kind=np.array('classifier' if is_classifier else 'regressor'),
+        n_features=np.array(forest.n_features_in_),
+        max_depth=np.array(max_depth),
+        roots=np.array(roots, dtype=np.int32),
+        feature=np.concatenate(features),
+        threshold=np.concatenate(thresholds),
+        left=np.concatenate(lefts),
+        right=np.concatenate(rights),
+        missing_left=np.concatenate(missing_left),
+        values=np.concatenate(values),
+        classes=classes,
+        feature_columns=np.array(columns if columns is not None else [], dtype=str),
+    )
+    return offset
+
+
+class CompiledForest:
+    """
+    Forest prediction from `export_forest` arrays with a vectorized traversal.
+
+    Every (row, tree) pair walks down one level per step as a single NumPy
+    gather, so a prediction costs `max_depth` array operations whatever the
+    batch size, without sklearn's per-call validation and joblib dispatch.
+    Inputs are cast to float32 and compared with float64 thresholds, and
+    per-tree probabilities are accumulated in tree order, as sklearn does,
+    so `predict` matches the source estimator exactly.
+    """
+
+    def __init__(self, path):
+        with np.load(path) as artifact:
+            self.kind = str(artifact['kind'])
+            self.n_features_in_ = int(artifact['n_features'])
+            self.max_depth = int(artifact['max_depth'])
+            self.roots = artifact['roots']
+            self.feature = artifact['feature']
+            self.threshold = artifact['threshold']
+            self.left = artifact['left']
+            self.right = artifact['right']
+            self.missing_left = artifact['missing_left']
+            self.values = artifact['values']
+            self.classes_ = artifact['classes']
+            columns = artifact['feature_columns'].tolist() if 'feature_columns' in artifact.files else []
+        self.path = path
+        self.n_estimators = len(self.roots)
+        if columns:
+            tag_feature_schema(self, columns)
+
+    def _validate(self, X):
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.shape[1] != self.n_features_in_:
+            raise ValueError(f"X has {X.shape[1]} features, but the forest expects {self.n_features_in_}.")
+        return X.astype(np.float64)
+
+    def apply(self, X):
+        """Leaf id reached in every tree, shape (n_rows, n_estimators)."""
+        X = self._validate(X)
+        node = np.repeat(self.roots[np.newaxis, :], len(X), axis=0)
+        rows = np.arange(len(X))[:, np.newaxis]
+        for _ in range(self.max_depth):
+            feature = self.feature[node]
+            internal = feature >= 0
+            if not internal.any():
+                break
+            x = X[rows, np.where(internal, feature, 0)]
+            go_left = (x <= self.threshold[node]) | (np.isnan(x) & self.missing_left[node])
+            node = np.where(internal, np.where(go_left, self.left[node], self.right[node]), node)
+        return -self.feature[node] - 1
+
+    def _accumulate(self, X):
+        leaves = self.apply(X)
+        total = np.zeros((len(leaves), self.values.shape[1]))
+        for tree in range(self.n_estimators):
+            total += self.values[leaves[:, tree]]
+        total /= self.n_estimators
+        return total
+
+    def predict_proba(self, X):
+        if self.kind != 'classifier':
+            raise AttributeError("predict_proba is only available for classifiers.")
+        return self._accumulate(X)
+
+    def predict(self, X):
+        total = self._accumulate(X)
+        if self.kind == 'classifier':
+            return self.classes_.take(np.argmax(total, axis=1))
+        return total[:, 0]
@@ -0,0 +1,122 @@
+import hashlib
+import importlib.util
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+
+def correct_grammar_batch(sentences):
+    """Correct a list of sentences with src.nlp_feedback in as few model calls as it allows."""
+    from src import nlp_feedback
+    batch_fn = getattr(nlp_feedback, 'correct_grammar_batch', None)
+    if batch_fn is not None:
+        return list(batch_fn(sentences))
+    return [nlp_feedback.correct_grammar(sentence) for sentence in sentences]
+
+
+def grammar_model_id(weights_path=None):
+    """
+    Identity of the grammar model for cache keys, without importing it.
+
+    src/nlp_feedback.py names the model, so a hash of its source changes
+    whenever the model does; `weights_path`, a local checkpoint file or
+    directory, adds its modification time so retrained weights count too.
+    """
+    spec = importlib.util.find_spec('src.nlp_feedback')
+    parts = ['src.nlp_feedback']
+    if spec is not None and spec.origin and os.path.exists(spec.origin):
+        with open(spec.origin, 'rb') as f:
+            parts.append(hashlib.sha256(f.read()).hexdigest()[:16])
+    if weights_path:
+        parts.append(f"{os.path.getmtime(weights_path):.0f}")
+    return ':'.join(parts)
+
+
+class GrammarBatcher:
+    """
+    Micro-batching front end for grammar correction.
+
+    Requests from many threads are put on one queue. A single worker thread
+    takes the first waiting sentence, keeps collecting for up to `max_wait_ms`
+    or until `max_batch_size` sentences are waiting, runs the whole batch
+    through `batch_fn` in one call and resolves each caller's Future.
+    """
+
+    def __init__(self, batch_fn=correct_grammar_batch, max_batch_size=16, max_wait_ms=5.0):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.batches = 0
+        self.sentences = 0
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+
+    def _ensure_worker(self):
+        # Started lazily, and restarted in forked children where the thread doesn't exist
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid():
+                self._queue = queue.Queue()
+                self._thread = threading.Thread(target=self._run, name="grammar-batcher", daemon=True)
+                self._pid = os.getpid()
+                self._thread.start()
+
+    def submit(self, sentence):
+        """Queue one sentence; the returned Future resolves to its correction."""
+        self._ensure_worker()
+        future = Future()
+        self._queue.put((sentence, future))
+        return future
+
+    def correct(self, sentence, timeout=None):
+        return self.submit(sentence).result(timeout)
+
+    def correct_many(self, sentences, timeout=None):
+        """Correct a list of sentences, preserving order."""
+        futures = [self.submit(sentence) for sentence in sentences]
+        return [future.result(timeout) for future in futures]
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            sentences = [sentence for sentence, _ in batch]
+            try:
+                corrected = self.batch_fn(sentences)
+                if len(corrected) != len(sentences):
+                    raise RuntimeError(f"batch_fn returned {len(corrected)} results for {len(sentences)} sentences")
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            self.batches += 1
+            self.sentences += len(sentences)
+            for (_, future), result in zip(batch, corrected):
+                future.set_result(result)
+
+    def stats(self):
+        return {
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': self.max_wait * 1000.0,
+            'batches': self.batches,
+            'sentences': self.sentences,
+            'mean_batch_size': self.sentences / self.batches if self.batches else 0.0,
+            'queued': self._queue.qsize(),
+        }
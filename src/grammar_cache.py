@@ -0,0 +1,178 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+
+def normalize_sentence(sentence):
+    """Canonical form used for cache keys: NFC unicode, single spaces, no outer whitespace."""
+    return ' '.join(unicodedata.normalize('NFC', sentence).split())
+
+
+class GrammarCache:
+    """
+    Content-addressed cache of grammar corrections.
+
+    Keys are the SHA-256 of the model identifier plus the normalized sentence,
+    so switching models never serves stale corrections. The first tier is an
+    in-process LRU bounded by `max_size` entries and `ttl` seconds; the
+    optional second tier is a SQLite file (`db_path`) that survives restarts
+    and is shared by every worker on the host. Expired rows are deleted from
+    it on write, at most once every `purge_interval` seconds.
+    """
+
+    def __init__(self, model_id='default', max_size=10000, ttl=24 * 3600, db_path=None, purge_interval=3600):
+        self.model_id = model_id
+        self.max_size = max_size
+        self.ttl = ttl
+        self.db_path = db_path
+        self.purge_interval = purge_interval
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.purged = 0
+        self._next_purge = 0.0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        self._db_pid = None
+
+    def key(self, sentence):
+        text = f"{self.model_id}\0{normalize_sentence(sentence)}"
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    def _connection(self):
+        # One connection per process; SQLite handles must not cross a fork
+        if self._db is None or self._db_pid != os.getpid():
+            self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS grammar_cache ("
+                "key TEXT PRIMARY KEY, corrected TEXT NOT NULL, created REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS grammar_cache_created ON grammar_cache (created)")
+            self._db_pid = os.getpid()
+        return self._db
+
+    def _remember(self, key, corrected):
+        # Caller holds the lock
+        self._entries[key] = (corrected, time.monotonic() + self.ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _lookup(self, key):
+        # Caller holds the lock
+        entry = self._entries.get(key)
+        if entry is not None:
+            corrected, expires_at = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return corrected
+            del self._entries[key]
+
+        if self.db_path is not None:
+            row = self._connection().execute(
+                "SELECT corrected FROM grammar_cache WHERE key = ? AND created > ?",
+                (key, time.time() - self.ttl),
+            ).fetchone()
+            if row is not None:
+                self._remember(key, row[0])
+                self.disk_hits += 1
+                return row[0]
+
+        self.misses += 1
+        return None
+
+    def get(self, sentence):
+        """Cached correction for `sentence`, or None."""
+        with self._lock:
+            return self._lookup(self.key(sentence))
+
+    def put_many(self, pairs):
+        """Store (sentence, corrected) pairs in both tiers."""
+        rows = [(self.key(sentence), corrected, time.time()) for sentence, corrected in pairs]
+        with self._lock:
+            for key, corrected, _ in rows:
+                self._remember(key, corrected)
+            if self.db_path is not None and rows:
+                db = self._connection()
+                with db:
+                    db.executemany("INSERT OR REPLACE INTO grammar_cache VALUES (?, ?, ?)", rows)
+                    if time.monotonic() >= self._next_purge:
+                        self.purged += db.execute(
+                            "DELETE FROM grammar_cache WHERE created <= ?", (time.time() - self.ttl,)
+                        ).rowcount
+                        self._next_purge = time.monotonic() + self.purge_interval
+
+    def put(self, sentence, corrected):
+        self.put_many([(sentence, corrected)])
+
+    def get_or_compute_many(self, sentences, compute_many, fast_path=None):
+        """
+        Corrections for `sentences` in order. Misses are deduplicated by their
+        normalized form and sent to `compute_many(list_of_sentences)` in a
+        single call, as the user wrote the first of them, then cached.
+        `fast_path(sentence)` may answer a miss first; its answers are not
+        the model's, so they are returned but not cached.
+        """
+        results = [None] * len(sentences)
+        pending = OrderedDict()
+        with self._lock:
+            for i, sentence in enumerate(sentences):
+                key = self.key(sentence)
+                if key in pending:
+                    pending[key][1].append(i)
+                    continue
+                corrected = self._lookup(key)
+                if corrected is None:
+                    pending[key] = (sentence, [i])
+                else:
+                    results[i] = corrected
+
+        if fast_path is not None:
+            for key, (sentence, positions) in list(pending.items()):
+                corrected = fast_path(sentence)
+                if corrected is not None:
+                    for i in positions:
+                        results[i] = corrected
+                    del pending[key]
+
+        if pending:
+            to_compute = [text for text, _ in pending.values()]
+            computed = compute_many(to_compute)
+            for (_, positions), corrected in zip(pending.values(), computed):
+                for i in positions:
+                    results[i] = corrected
+            self.put_many(zip(to_compute, computed))
+        return results
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self.db_path is not None:
+                db = self._connection()
+                with db:
+                    db.execute("DELETE FROM grammar_cache")
+
+    def stats(self):
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            'model_id': self.model_id,
+            'entries': len(self._entries),
+            'max_size': self.max_size,
+            'ttl_seconds': self.ttl,
+            'disk_tier': self.db_path,
+            'hits': self.hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'purged': self.purged,
+            'hit_rate': (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+        }
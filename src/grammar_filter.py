@@ -0,0 +1,210 @@
+import json
+import math
+import random
+import re
+import threading
+import zlib
+
+from src.grammar_cache import normalize_sentence
+
+N_BUCKETS = 1 << 18
+DEFAULT_THRESHOLD = 0.1  # skip the model when P(needs more than trivial fixes) is below this
+# The rules and the filter's training sentences are English; other languages always go to the model
+FILTER_LANGUAGES = ('en',)
+_TOKENS = re.compile(r"\w+|[^\w\s]")
+# Patterns that almost always mean a real error; a match always goes to the model
+RULES = [
+    ('repeated_word', re.compile(r"\b(\w+) \1\b", re.IGNORECASE)),
+    ('third_person', re.compile(r"\b(he|she|it) (go|do|have|are|were|don't|want|like|need)\b", re.IGNORECASE)),
+    ('plural_subject', re.compile(r"\b(you|we|they) (has|is|was|does|doesn't|goes|wants)\b", re.IGNORECASE)),
+    ('first_person', re.compile(r"\bi (is|are|has|goes|does|wants)\b", re.IGNORECASE)),
+    ('article', re.compile(r"\ba (?:[aeio]\w|u[^n\W])", re.IGNORECASE)),
+    ('double_negative', re.compile(r"\b(don't|doesn't|didn't|can't|won't) \w+ (nothing|nobody|no one|never)\b", re.IGNORECASE)),
+]
+
+
+def trivial_fix(sentence):
+    """Whitespace collapsed, first letter capitalized and a final period added when missing."""
+    text = normalize_sentence(sentence)
+    if text:
+        text = text[0].upper() + text[1:]
+        if text[-1].isalnum():
+            text += '.'
+    return text
+
+
+def matched_rule(sentence):
+    for name, pattern in RULES:
+        if pattern.search(sentence):
+            return name
+    return None
+
+
+def _hashed_features(sentence):
+    text = normalize_sentence(sentence).lower()
+    words = _TOKENS.findall(text)
+    features = ['w:' + w for w in words]
+    features += ['b:' + a + ' ' + b for a, b in zip(words, words[1:])]
+    padded = f' {text} '
+    features += ['c:' + padded[i:i + 3] for i in range(len(padded) - 2)]
+    return {zlib.crc32(f.encode('utf-8')) % N_BUCKETS for f in features}
+
+
+def _sigmoid(z):
+    if z < 0:
+        e = math.exp(z)
+        return e / (1.0 + e)
+    return 1.0 / (1.0 + math.exp(-z))
+
+
+class GrammarFilter:
+    """
+    Cheap first stage of grammar correction.
+
+    A logistic regression over hashed word, word-pair and character-trigram
+    features estimates the probability that a sentence needs more than
+    `trivial_fix`. It is trained on sentences labelled by the real model and
+    scored in pure Python, in microseconds. The weights are sparse and
+    saved as JSON.
+    """
+
+    def __init__(self, weights=None, bias=0.0):
+        self.weights = weights or {}
+        self.bias = bias
+
+    def probability(self, sentence):
+        """P(the model would change `sentence` beyond trivial fixes)."""
+        weights = self.weights
+        return _sigmoid(self.bias + sum(weights.get(i, 0.0) for i in _hashed_features(sentence)))
+
+    @staticmethod
+    def label(sentence, corrected):
+        """1 when the model's correction differs from the trivial fix."""
+        return int(normalize_sentence(corrected) != trivial_fix(sentence))
+
+    @classmethod
+    def fit(cls, sentences, labels, epochs=5, learning_rate=0.5, l2=1e-6, seed=0):
+        """Train with AdaGrad on the logistic loss."""
+        rows = [(_hashed_features(s), y) for s, y in zip(sentences, labels)]
+        weights, squares = {}, {}
+        bias, bias_square = 0.0, 1e-8
+        rng = random.Random(seed)
+        for _ in range(epochs):
+            rng.shuffle(rows)
+            for features, y in rows:
+                gradient = _sigmoid(bias + sum(weights.get(i, 0.0) for i in features)) - y
+                bias_square += gradient * gradient
+                bias -= learning_rate * gradient / math.sqrt(bias_square)
+                for i in features:
+                    w = weights.get(i, 0.0)
+                    g = gradient + l2 * w
+                    squares[i] = squares.get(i, 1e-8) + g * g
+                    weights[i] = w - learning_rate * g / math.sqrt(squares[i])
+        return cls({i: w for i, w in weights.items() if abs(w) > 1e-6}, bias)
+
+    def save(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'format': 1, 'n_buckets': N_BUCKETS, 'bias': self.bias,
+                       'weights': {str(i): w for i, w in self.weights.items()}}, f)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('n_buckets') != N_BUCKETS:
+            raise ValueError(f"{path} was trained with {data.get('n_buckets')} feature buckets, expected {N_BUCKETS}.")
+        return cls({int(i): w for i, w in data['weights'].items()}, data['bias'])
+
+
+class TieredCorrector:
+    """
+    Grammar correction that only calls the expensive model when needed.
+
+    A sentence in one of `languages` that matches no RULES pattern and that
+    the filter scores below `threshold` is answered by `fast_path` with
+    `trivial_fix` right away; for everything else it returns None and the
+    caller sends the sentence to `correct_many` (app.py does both through
+    GrammarCache.get_or_compute_many). Without a filter every sentence goes
+    to the model. The counters say how much traffic was short-circuited.
+    Fast-path answers come from this filter, not the model, so callers
+    should not cache them as the model's corrections.
+    """
+
+    def __init__(self, correct_many, grammar_filter=None, threshold=DEFAULT_THRESHOLD, languages=FILTER_LANGUAGES):
+        self.correct_many = correct_many
+        self.filter = grammar_filter
+        self.threshold = threshold
+        self.languages = frozenset(languages)
+        self.checked = 0
+        self.skipped = 0
+        self.other_language = 0
+        self.rule_hits = {name: 0 for name, _ in RULES}
+        self._lock = threading.Lock()
+
+    def fast_path(self, sentence, language):
+        """The correction if it can be given without the model, else None."""
+        if self.filter is None:
+            return None
+        if language not in self.languages:
+            with self._lock:
+                self.other_language += 1
+            return None
+        rule = matched_rule(sentence)
+        skip = rule is None and self.filter.probability(sentence) < self.threshold
+        with self._lock:
+            self.checked += 1
+            if rule is not None:
+                self.rule_hits[rule] += 1
+            self.skipped += skip
+        return trivial_fix(sentence) if skip else None
+
+    def stats(self):
+        with self._lock:
+            return {
+                'enabled': self.filter is not None,
+                'threshold': self.threshold,
+                'languages': sorted(self.languages),
+                'checked': self.checked,
+                'skipped': self.skipped,
+                'skip_rate': self.skipped / self.checked if self.checked else 0.0,
+                'other_language': self.other_language,
+                'rule_hits': dict(self.rule_hits),
+            }
+
+
+def load_pairs(path):
+    """(sentences, corrections) from a JSONL file of {"sentence", "corrected"} objects."""
+    sentences, corrected = [], []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                row = json.loads(line)
+                sentences.append(row['sentence'])
+                corrected.append(row['corrected'])
+    return sentences, corrected
+
+
+def evaluate(grammar_filter, sentences, corrected, thresholds):
+    """
+    Skip rate and accuracy of the fast path at each threshold on labelled pairs.
+
+    `wrong_skip_rate` is the share of all sentences that were skipped although
+    the model would have changed them beyond trivial fixes, and
+    `accuracy` the share whose fast-path-or-model answer matches the model.
+    """
+    labels = [GrammarFilter.label(s, c) for s, c in zip(sentences, corrected)]
+    rules = [matched_rule(s) is not None for s in sentences]
+    probabilities = [grammar_filter.probability(s) for s in sentences]
+    n = len(sentences)
+    report = []
+    for threshold in thresholds:
+        skipped = [not rule and p < threshold for rule, p in zip(rules, probabilities)]
+        wrong = sum(skip and label for skip, label in zip(skipped, labels))
+        report.append({
+            'threshold': threshold,
+            'skip_rate': sum(skipped) / n if n else 0.0,
+            'wrong_skip_rate': wrong / n if n else 0.0,
+            'accuracy': 1.0 - wrong / n if n else 1.0,
+            'needs_model_rate': sum(labels) / n if n else 0.0,
+        })
+    return report
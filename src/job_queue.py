@@ -0,0 +1,279 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+class QueueFull(Exception):
+    """Raised by JobQueue.submit when every worker is busy and the backlog is full."""
+
+
+class Job:
+    def __init__(self, job_id):
+        self.id = job_id
+        self.status = 'queued'
+        self.result = None
+        self.error = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+    def describe(self):
+        return {
+            'job_id': self.id,
+            'status': self.status,
+            'result': self.result,
+            'error': self.error,
+            'submitted_at': self.submitted_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+        }
+
+
+def _percentiles(values):
+    if not values:
+        return {'p50': None, 'p95': None, 'p99': None}
+    ordered = sorted(values)
+
+    def pick(q):
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+    return {'p50': pick(0.50), 'p95': pick(0.95), 'p99': pick(0.99)}
+
+
+class JobQueue:
+    """
+    Bounded background execution for slow request handlers.
+
+    At most `max_workers` jobs run at once and at most `max_pending` more
+    wait for a thread; beyond that `submit` raises QueueFull so the caller
+    can shed load instead of piling up work. Finished jobs are kept for
+    `result_ttl` seconds (and at most `max_results` of them) for polling.
+    Queue wait and run time of the last `latency_window` jobs are kept for
+    percentile reporting.
+
+    Job records live in this process, so a job can only be polled on the
+    worker that accepted it; use SqliteJobQueue when several workers serve
+    requests.
+    """
+
+    shared_across_processes = False
+
+    def __init__(self, max_workers=4, max_pending=32, result_ttl=600.0, max_results=10000, latency_window=1000):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.result_ttl = result_ttl
+        self.max_results = max_results
+        self.submitted = 0
+        self.rejected = 0
+        self.failed = 0
+        self._jobs = OrderedDict()
+        self._next_expiry = 0.0
+        self._active = 0
+        self._wait_seconds = deque(maxlen=latency_window)
+        self._run_seconds = deque(maxlen=latency_window)
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pid = None
+
+    def _pool(self):
+        # Created lazily, and recreated in forked children where the threads don't exist
+        if self._executor is None or self._pid != os.getpid():
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="job-queue")
+            self._pid = os.getpid()
+            self._active = 0
+        return self._executor
+
+    def _expire(self):
+        # Caller holds the lock. Drops every finished job past its TTL, then the
+        # oldest finished ones beyond max_results; queued and running jobs stay.
+        deadline = time.time() - self.result_ttl
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished_at is not None]
+        excess = len(self._jobs) - self.max_results
+        for job_id in finished:
+            if self._jobs[job_id].finished_at < deadline or excess > 0:
+                del self._jobs[job_id]
+                excess -= 1
+
+    def _maybe_expire(self):
+        # Caller holds the lock; sweeps at most once a second
+        now = time.monotonic()
+        if now >= self._next_expiry:
+            self._next_expiry = now + 1.0
+            self._expire()
+
+    def _save(self, job):
+        # Caller holds the lock; the in-process Job object is the record
+        self._jobs[job.id] = job
+
+    def _load(self, job_id):
+        # Caller holds the lock
+        return self._jobs.get(job_id)
+
+    def _count_active(self):
+        # Caller holds the lock
+        queued = sum(1 for job in self._jobs.values() if job.status == 'queued')
+        running = sum(1 for job in self._jobs.values() if job.status == 'running')
+        return queued, running
+
+    def submit(self, fn, *args, **kwargs):
+        """Run `fn(*args, **kwargs)` in the background and return the job id."""
+        with self._lock:
+            pool = self._pool()
+            if self._active >= self.max_workers + self.max_pending:
+                self.rejected += 1
+                raise QueueFull(f"{self._active} simulations are already queued or running.")
+            self._maybe_expire()
+            job = Job(uuid.uuid4().hex)
+            self._save(job)
+            self._active += 1
+            self.submitted += 1
+        pool.submit(self._run, job, fn, args, kwargs)
+        return job.id
+
+    def _run(self, job, fn, args, kwargs):
+        try:
+            with self._lock:
+                job.started_at = time.time()
+                job.status = 'running'
+                self._save(job)
+            job.result = fn(*args, **kwargs)
+            job.status = 'done'
+        except Exception as e:
+            job.error = str(e)
+            job.status = 'failed'
+        finally:
+            job.finished_at = time.time()
+            with self._lock:
+                # The slot is released first, so a record that cannot be written
+                # never leaves the queue a worker short
+                self._active -= 1
+                try:
+                    self._save(job)
+                except Exception as e:
+                    # e.g. a result that is not JSON-serializable: record the failure instead
+                    job.result = None
+                    job.error = f"Could not store the job's result: {e}"
+                    job.status = 'failed'
+                    try:
+                        self._save(job)
+                    except Exception:
+                        pass  # the store is unavailable; the record is expired as stale later
+                if job.status == 'failed':
+                    self.failed += 1
+                self._wait_seconds.append(job.started_at - job.submitted_at)
+                self._run_seconds.append(job.finished_at - job.started_at)
+
+    def get(self, job_id):
+        """The Job for `job_id`, or None if it is unknown or expired."""
+        with self._lock:
+            self._maybe_expire()
+            return self._load(job_id)
+
+    def stats(self):
+        with self._lock:
+            queued, running = self._count_active()
+            return {
+                'max_workers': self.max_workers,
+                'max_pending': self.max_pending,
+                'queued': queued,
+                'running': running,
+                'submitted': self.submitted,
+                'rejected': self.rejected,
+                'failed': self.failed,
+                'wait_seconds': _percentiles(list(self._wait_seconds)),
+                'run_seconds': _percentiles(list(self._run_seconds)),
+            }
+
+
+class SqliteJobQueue(JobQueue):
+    """
+    JobQueue whose job records live in a SQLite file shared by every worker
+    on the host, so a job accepted by one worker can be polled on any other.
+
+    Jobs still run on the accepting worker's threads; their status, result
+    and timestamps are written to the `jobs` table as they change, and
+    results must be JSON-serializable. Queued/running counts in `stats`
+    cover all workers. A job still queued or running `stale_after` seconds
+    after it was submitted belonged to a worker that stopped or restarted;
+    it is marked failed, and then expires like any finished job.
+    """
+
+    shared_across_processes = True
+
+    def __init__(self, db_path, stale_after=3600.0, **kwargs):
+        super().__init__(**kwargs)
+        self.db_path = db_path
+        self.stale_after = stale_after
+        self._db = None
+        self._db_pid = None
+
+    def _connection(self):
+        # One connection per process; SQLite handles must not cross a fork
+        if self._db is None or self._db_pid != os.getpid():
+            self._db = sqlite3.connect(self.db_path, timeout=30.0, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "job_id TEXT PRIMARY KEY, status TEXT NOT NULL, result TEXT, error TEXT, "
+                "submitted_at REAL NOT NULL, started_at REAL, finished_at REAL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS jobs_finished ON jobs (finished_at)")
+            self._db_pid = os.getpid()
+        return self._db
+
+    def _expire(self):
+        db = self._connection()
+        now = time.time()
+        with db:
+            db.execute(
+                "UPDATE jobs SET status = 'failed', error = ?, finished_at = ? "
+                "WHERE finished_at IS NULL AND submitted_at < ?",
+                ("The worker running this job stopped before it finished.", now, now - self.stale_after),
+            )
+            db.execute("DELETE FROM jobs WHERE finished_at < ?", (now - self.result_ttl,))
+            db.execute(
+                "DELETE FROM jobs WHERE finished_at IS NOT NULL AND rowid NOT IN "
+                "(SELECT rowid FROM jobs ORDER BY rowid DESC LIMIT ?)",
+                (self.max_results,),
+            )
+
+    def _save(self, job):
+        db = self._connection()
+        with db:
+            db.execute(
+                "INSERT OR REPLACE INTO jobs VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job.id, job.status, None if job.result is None else json.dumps(job.result), job.error,
+                 job.submitted_at, job.started_at, job.finished_at),
+            )
+
+    def _load(self, job_id):
+        row = self._connection().execute(
+            "SELECT status, result, error, submitted_at, started_at, finished_at FROM jobs WHERE job_id = ?",
+            (job_id,),
+        ).fetchone()
+        if row is None:
+            return None
+        job = Job(job_id)
+        job.status, result, job.error, job.submitted_at, job.started_at, job.finished_at = row
+        job.result = None if result is None else json.loads(result)
+        return job
+
+    def _count_active(self):
+        # Stale jobs are not counted, even before a sweep has marked them failed
+        counts = dict(self._connection().execute(
+            "SELECT status, COUNT(*) FROM jobs WHERE status IN ('queued', 'running') AND submitted_at >= ? "
+            "GROUP BY status",
+            (time.time() - self.stale_after,),
+        ).fetchall())
+        return counts.get('queued', 0), counts.get('running', 0)
+
+
+def make_job_queue(db_path=None, **kwargs):
+    """SQLite-backed queue when `db_path` is given, in-process otherwise."""
+    if db_path:
+        return SqliteJobQueue(db_path, **kwargs)
+    return JobQueue(**kwargs)
@@ -0,0 +1,261 @@
+import numpy as np
+
+DIFFICULTY_CODES = {"easy": 0, "medium": 1, "hard": 2}
+RECENT_WINDOW = 10  # answers in the rolling accuracy
+ACCURACY_ALPHA = 0.2  # EWMA weight of the newest answer
+TIME_ALPHA = 0.3  # EWMA weight of the newest response time
+
+# Column order of the feature vector (schema v2). build_training_set.py writes these
+# columns followed by the next_difficulty target; the shipped finall.csv is schema v1
+FEATURE_COLUMNS = [
+    "attempts",
+    "correct",
+    "incorrect",
+    "accuracy",
+    "rolling_accuracy",
+    "ewma_accuracy",
+    "streak",
+    "mean_response_time",
+    "ewma_response_time",
+    "last_response_time",
+    "easy_attempts",
+    "easy_accuracy",
+    "medium_attempts",
+    "medium_accuracy",
+    "hard_attempts",
+    "hard_accuracy",
+    "last_difficulty",
+    "last_correct",
+]
+N_FEATURES = len(FEATURE_COLUMNS)
+# Bump whenever FEATURE_COLUMNS changes. Version 1 was the original finall.csv
+# layout; models record the columns they were fitted on (see tag_feature_schema)
+# and the app refuses any model whose columns differ from FEATURE_COLUMNS.
+FEATURE_SCHEMA_VERSION = 2
+
+# Layout of the per-learner running-statistics array
+(_ATTEMPTS, _CORRECT, _STREAK, _EWMA_ACCURACY, _TIMED, _TOTAL_TIME, _EWMA_TIME, _LAST_TIME,
+ _RECENT_BITS, _RECENT_CORRECT, _LAST_DIFFICULTY, _LAST_CORRECT) = range(12)
+_BY_DIFFICULTY = 12  # [attempts, correct] for easy, medium, hard
+STATE_SIZE = _BY_DIFFICULTY + 2 * len(DIFFICULTY_CODES)
+
+
+def tag_feature_schema(model, columns):
+    """Record on a fitted model the feature columns it was trained on, in order."""
+    columns = [str(column) for column in columns]
+    model.feature_columns_ = columns
+    model.feature_schema_version_ = FEATURE_SCHEMA_VERSION if columns == FEATURE_COLUMNS else None
+    return model
+
+
+def model_feature_columns(model):
+    """The columns a model was fitted on: its tag, else sklearn's feature_names_in_, else None."""
+    columns = getattr(model, 'feature_columns_', None)
+    if columns is None:
+        columns = getattr(model, 'feature_names_in_', None)
+    return None if columns is None else [str(column) for column in columns]
+
+
+def check_feature_schema(model, source='model'):
+    """Raise ValueError unless `model` was trained on FEATURE_COLUMNS, the features the app builds."""
+    columns = model_feature_columns(model)
+    if columns != FEATURE_COLUMNS:
+        trained_on = f"{len(columns)} columns ({', '.join(columns[:4])}, ...)" if columns else "an unrecorded column layout"
+        raise ValueError(
+            f"{source} was trained on {trained_on}, not feature schema v{FEATURE_SCHEMA_VERSION} "
+            f"({N_FEATURES} columns); retrain it with train_ml_model.py on build_training_set.py output."
+        )
+    return model
+
+
+def difficulty_code(difficulty):
+    """0/1/2 for easy/medium/hard, -1 when unknown. Valid codes are passed through, others are unknown."""
+    if isinstance(difficulty, (int, np.integer)):
+        return int(difficulty) if 0 <= difficulty < len(DIFFICULTY_CODES) else -1
+    return DIFFICULTY_CODES.get(difficulty, -1)
+
+
+def new_feature_state(n=None):
+    """Zeroed running statistics for one learner (1-D) or `n` learners (2-D)."""
+    return np.zeros(STATE_SIZE if n is None else (n, STATE_SIZE))
+
+
+def apply_attempts(state, difficulty, correct, seconds):
+    """
+    Fold one attempt per row into `state` (n, STATE_SIZE), in place.
+
+    Every statistic is an O(1) update: the rolling accuracy keeps the last
+    RECENT_WINDOW answers as a bitmask, and the EWMAs start at the first
+    observation. `difficulty` holds codes from `difficulty_code`, `correct`
+    0/1 and `seconds` the response time or NaN when it was not measured.
+    """
+    difficulty = np.asarray(difficulty, dtype=np.int64)
+    correct = np.asarray(correct, dtype=np.float64)
+    seconds = np.asarray(seconds, dtype=np.float64)
+    first = state[:, _ATTEMPTS] == 0
+
+    state[:, _ATTEMPTS] += 1
+    state[:, _CORRECT] += correct
+    streak = state[:, _STREAK]
+    state[:, _STREAK] = np.where(correct > 0, np.maximum(streak, 0) + 1, np.minimum(streak, 0) - 1)
+    state[:, _EWMA_ACCURACY] = np.where(
+        first, correct, state[:, _EWMA_ACCURACY] + ACCURACY_ALPHA * (correct - state[:, _EWMA_ACCURACY])
+    )
+
+    # Rolling window: drop the answer leaving the window, shift in the new one
+    bits = state[:, _RECENT_BITS].astype(np.int64)
+    leaving = (bits >> (RECENT_WINDOW - 1)) & 1
+    state[:, _RECENT_CORRECT] += correct - leaving
+    state[:, _RECENT_BITS] = ((bits << 1) & ((1 << RECENT_WINDOW) - 1)) | correct.astype(np.int64)
+
+    timed = ~np.isnan(seconds)
+    first_timed = timed & (state[:, _TIMED] == 0)
+    state[:, _TOTAL_TIME] += np.where(timed, seconds, 0.0)
+    state[:, _EWMA_TIME] = np.where(
+        first_timed, seconds,
+        np.where(timed, state[:, _EWMA_TIME] + TIME_ALPHA * (seconds - state[:, _EWMA_TIME]), state[:, _EWMA_TIME]),
+    )
+    state[:, _LAST_TIME] = np.where(timed, seconds, state[:, _LAST_TIME])
+    state[:, _TIMED] += timed
+
+    known = (difficulty >= 0) & (difficulty < len(DIFFICULTY_CODES))
+    rows = np.flatnonzero(known)
+    columns = _BY_DIFFICULTY + 2 * difficulty[known]
+    state[rows, columns] += 1
+    state[rows, columns + 1] += correct[known]
+    state[:, _LAST_DIFFICULTY] = np.where(known, difficulty, state[:, _LAST_DIFFICULTY])
+    state[:, _LAST_CORRECT] = correct
+    return state
+
+
+def _ratio(numerator, denominator):
+    return np.divide(numerator, denominator, out=np.zeros_like(numerator), where=denominator > 0)
+
+
+def features_from_state(state):
+    """The (n, N_FEATURES) float32 feature matrix for running statistics `state` (n, STATE_SIZE)."""
+    state = np.atleast_2d(state)
+    attempts = state[:, _ATTEMPTS]
+    by_difficulty = state[:, _BY_DIFFICULTY:]
+    columns = [
+        attempts,
+        state[:, _CORRECT],
+        attempts - state[:, _CORRECT],
+        _ratio(state[:, _CORRECT], attempts),
+        _ratio(state[:, _RECENT_CORRECT], np.minimum(attempts, RECENT_WINDOW)),
+        state[:, _EWMA_ACCURACY],
+        state[:, _STREAK],
+        _ratio(state[:, _TOTAL_TIME], state[:, _TIMED]),
+        state[:, _EWMA_TIME],
+        state[:, _LAST_TIME],
+    ]
+    for i in range(len(DIFFICULTY_CODES)):
+        columns.append(by_difficulty[:, 2 * i])
+        columns.append(_ratio(by_difficulty[:, 2 * i + 1], by_difficulty[:, 2 * i]))
+    columns.append(state[:, _LAST_DIFFICULTY])
+    columns.append(state[:, _LAST_CORRECT])
+    return np.stack(columns, axis=1).astype(np.float32)
+
+
+def update_feature_state(state, difficulty, correct, seconds=None):
+    """Fold a single attempt into one learner's 1-D `state`, in place."""
+    apply_attempts(
+        state.reshape(1, STATE_SIZE),
+        [difficulty_code(difficulty)],
+        [float(correct)],
+        [np.nan if seconds is None else seconds],
+    )
+    return state
+
+
+def running_totals(state):
+    """
+    Plain-number summary of one learner's 1-D `state`: attempts, correct,
+    streak (> 0 correct in a row, < 0 mistakes in a row), ewma_accuracy,
+    timed_attempts, total_seconds and by_difficulty {name: [attempts, correct]}.
+    """
+    return {
+        'attempts': int(state[_ATTEMPTS]),
+        'correct': int(state[_CORRECT]),
+        'streak': int(state[_STREAK]),
+        'ewma_accuracy': float(state[_EWMA_ACCURACY]),
+        'timed_attempts': int(state[_TIMED]),
+        'total_seconds': float(state[_TOTAL_TIME]),
+        'by_difficulty': {
+            name: [int(state[_BY_DIFFICULTY + 2 * code]), int(state[_BY_DIFFICULTY + 2 * code + 1])]
+            for name, code in DIFFICULTY_CODES.items()
+        },
+    }
+
+
+def feature_vector(state):
+    """The 18 features of one learner, ready for `model.predict([vector])`."""
+    return features_from_state(state)[0]
+
+
+def build_features_bulk(learner_ids, difficulties, correct, seconds=None):
+    """
+    Features after every attempt of an attempt log, computed with the same
+    updates as serving.
+
+    The log is given as parallel arrays ordered by time. Learners are stepped
+    together: the k-th attempts of all learners are applied in one vectorized
+    `apply_attempts` call, so the Python loop runs once per attempt *rank*,
+    not once per attempt. Returns an (n_attempts, N_FEATURES) matrix in the
+    order of the input.
+    """
+    learner_ids = np.asarray(learner_ids)
+    n = len(learner_ids)
+    if n == 0:
+        return np.empty((0, N_FEATURES), dtype=np.float32)
+    difficulties = np.asarray(difficulties)
+    if difficulties.dtype.kind not in 'iu':
+        difficulties = np.array([difficulty_code(d) for d in difficulties], dtype=np.int64)
+    correct = np.asarray(correct, dtype=np.float64)
+    seconds = np.full(n, np.nan) if seconds is None else np.asarray(seconds, dtype=np.float64)
+
+    # Position of every attempt within its learner's history
+    _, learner_index = np.unique(learner_ids, return_inverse=True)
+    order = np.argsort(learner_index, kind='stable')
+    sorted_learners = learner_index[order]
+    group_starts = np.flatnonzero(np.r_[True, sorted_learners[1:] != sorted_learners[:-1]])
+    group_sizes = np.diff(np.r_[group_starts, n])
+    rank = np.empty(n, dtype=np.int64)
+    rank[order] = np.arange(n) - np.repeat(group_starts, group_sizes)
+
+    state = new_feature_state(learner_index.max() + 1)
+    features = np.empty((n, N_FEATURES), dtype=np.float32)
+    by_rank = np.argsort(rank, kind='stable')
+    rank_bounds = np.searchsorted(rank[by_rank], np.arange(rank.max() + 2))
+    for k in range(rank.max() + 1):
+        idx = by_rank[rank_bounds[k]:rank_bounds[k + 1]]
+        rows = learner_index[idx]
+        block = apply_attempts(state[rows], difficulties[idx], correct[idx], seconds[idx])
+        state[rows] = block
+        features[idx] = features_from_state(block)
+    return features
+
+
+def build_training_frame(attempts):
+    """
+    A finall.csv-shaped DataFrame from an attempt log with columns
+    learner_id, difficulty, correct and (optionally) seconds, ordered by time.
+
+    Each row holds a learner's features after an attempt, and `next_difficulty`
+    is the difficulty code of that learner's following attempt; each learner's
+    last attempt has no target and is dropped.
+    """
+    import pandas as pd
+
+    seconds = attempts['seconds'].to_numpy() if 'seconds' in attempts else None
+    features = build_features_bulk(
+        attempts['learner_id'].to_numpy(), attempts['difficulty'].to_numpy(),
+        attempts['correct'].to_numpy(), seconds,
+    )
+    frame = pd.DataFrame(features, columns=FEATURE_COLUMNS, index=attempts.index)
+    codes = attempts['difficulty'].map(difficulty_code)
+    frame['next_difficulty'] = codes.groupby(attempts['learner_id']).shift(-1)
+    frame = frame.dropna(subset=['next_difficulty'])
+    frame = frame[frame['next_difficulty'] >= 0]
+    frame['next_difficulty'] = frame['next_difficulty'].astype(np.int64)
+    return frame.reset_index(drop=True)
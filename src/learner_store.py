@@ -0,0 +1,329 @@
+import copy
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, deque, namedtuple
+
+import numpy as np
+
+from src.learner_features import feature_vector, new_feature_state, running_totals, update_feature_state
+
+DIFFICULTIES = ("easy", "medium", "hard")
+DEFAULT_LANGUAGE = "en"
+DEFAULT_DIFFICULTY = "easy"
+
+Attempt = namedtuple("Attempt", "learner_id question_id difficulty correct seconds timestamp")
+
+
+class LearnerState:
+    """
+    Settings and running aggregates for one learner.
+
+    The aggregates all live in `features`, the running statistics behind the
+    ML feature vector, and are updated incrementally by `apply`; the counts
+    below are read from it, so reading them (or building features) never
+    replays the attempt log and nothing is stored twice.
+    """
+
+    def __init__(self, learner_id, language=DEFAULT_LANGUAGE, current_difficulty=DEFAULT_DIFFICULTY):
+        self.learner_id = learner_id
+        self.language = language
+        self.current_difficulty = current_difficulty
+        self.last_attempt_at = None
+        self.features = new_feature_state()
+
+    @property
+    def attempts(self):
+        return running_totals(self.features)['attempts']
+
+    @property
+    def correct(self):
+        return running_totals(self.features)['correct']
+
+    @property
+    def incorrect(self):
+        return self.attempts - self.correct
+
+    @property
+    def accuracy(self):
+        return self.correct / self.attempts if self.attempts else 0.0
+
+    @property
+    def streak(self):
+        """> 0: consecutive correct answers, < 0: consecutive mistakes."""
+        return running_totals(self.features)['streak']
+
+    @property
+    def recent_accuracy(self):
+        """Exponentially weighted accuracy, newest answer weighted ACCURACY_ALPHA."""
+        return running_totals(self.features)['ewma_accuracy']
+
+    @property
+    def by_difficulty(self):
+        """{difficulty: [attempts, correct]}."""
+        return running_totals(self.features)['by_difficulty']
+
+    @property
+    def mean_seconds(self):
+        totals = running_totals(self.features)
+        return totals['total_seconds'] / totals['timed_attempts'] if totals['timed_attempts'] else 0.0
+
+    def performance(self):
+        """The {"correct", "incorrect"} counts the templates used to read from the session."""
+        return {"correct": self.correct, "incorrect": self.incorrect}
+
+    def apply(self, attempt):
+        self.last_attempt_at = attempt.timestamp
+        update_feature_state(self.features, attempt.difficulty, attempt.correct, attempt.seconds)
+
+    def copy(self):
+        """An independent snapshot, safe to read while the store keeps changing the original."""
+        return copy.deepcopy(self)
+
+    def feature_vector(self):
+        """The 18 ML features for this learner, in learner_features.FEATURE_COLUMNS order."""
+        return feature_vector(self.features)
+
+    def to_dict(self):
+        return {
+            'format': 2,
+            'learner_id': self.learner_id,
+            'language': self.language,
+            'current_difficulty': self.current_difficulty,
+            'last_attempt_at': self.last_attempt_at,
+            'features': self.features.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Rebuild a state from `to_dict` output. Rows written before the running
+        statistics existed have no `features`; they load zeroed and
+        `needs_replay` tells the store to rebuild them from the attempt log.
+        """
+        state = cls(data['learner_id'], data.get('language', DEFAULT_LANGUAGE),
+                    data.get('current_difficulty', DEFAULT_DIFFICULTY))
+        state.last_attempt_at = data.get('last_attempt_at')
+        if 'features' in data:
+            state.features = np.asarray(data['features'], dtype=np.float64)
+        return state
+
+    @staticmethod
+    def needs_replay(data):
+        return 'features' not in data and data.get('attempts', 0) > 0
+
+
+class InMemoryLearnerStore:
+    """
+    Learner settings, aggregates and attempt log kept in this process.
+
+    State lives as long as the worker does and is only seen by it, so this
+    store is for a single worker process; use SqliteLearnerStore to share it
+    between workers and restarts. At most `max_learners` learners are kept,
+    least recently used first out, each with the last `max_log` attempts.
+    """
+
+    shared_across_processes = False
+
+    def __init__(self, max_learners=100_000, max_log=1000):
+        self.max_learners = max_learners
+        self.max_log = max_log
+        self.evictions = 0
+        self._states = OrderedDict()
+        self._log = {}
+        self._lock = threading.Lock()
+
+    def _modify(self, learner_id, change):
+        """
+        Run `change(state) -> (state, new_attempts)` on the learner atomically
+        and store the result. Returns a copy of the new state and the attempts.
+        """
+        with self._lock:
+            state = self._states.get(learner_id) or LearnerState(learner_id)
+            state, attempts = change(state)
+            self._states[learner_id] = state
+            self._states.move_to_end(learner_id)
+            if attempts:
+                self._log.setdefault(learner_id, deque(maxlen=self.max_log)).extend(attempts)
+            while len(self._states) > self.max_learners:
+                evicted, _ = self._states.popitem(last=False)
+                self._log.pop(evicted, None)
+                self.evictions += 1
+            return state.copy(), attempts
+
+    def get(self, learner_id):
+        """A snapshot of the learner's state; defaults for a learner never seen."""
+        with self._lock:
+            state = self._states.get(learner_id)
+            return state.copy() if state is not None else LearnerState(learner_id)
+
+    def update(self, learner_id, **settings):
+        """Change settings such as `language` or `current_difficulty`."""
+        for key in settings:
+            if key not in ('language', 'current_difficulty'):
+                raise ValueError(f"Unknown learner setting: {key}")
+
+        def change(state):
+            for key, value in settings.items():
+                setattr(state, key, value)
+            return state, []
+        return self._modify(learner_id, change)[0]
+
+    def record_attempts(self, learner_id, answers, transition=None):
+        """
+        Fold an ordered batch of (question_id, correct, seconds, answered_at)
+        answers into the learner in one pass and persist them with a single write.
+
+        `answered_at` is when the client says the answer was given (Unix
+        time), or None for now; it is clamped to the server's clock, so a
+        client can date answers back but never into the future. Each answer
+        is taken at the learner's current difficulty; when
+        `transition(difficulty, correct)` is given it sets the difficulty for
+        the next one, so the batch ends where the same answers sent one by one
+        would. Returns the state and the logged attempts.
+        """
+        def change(state):
+            now = time.time()
+            attempts = []
+            for question_id, correct, seconds, answered_at in answers:
+                timestamp = now if answered_at is None else float(min(answered_at, now))
+                attempt = Attempt(learner_id, question_id, state.current_difficulty, bool(correct), seconds, timestamp)
+                state.apply(attempt)
+                attempts.append(attempt)
+                if transition is not None:
+                    state.current_difficulty = transition(state.current_difficulty, attempt.correct)
+            return state, attempts
+        return self._modify(learner_id, change)
+
+    def reset(self, learner_id):
+        """Start the learner over with default settings. The attempt log is kept."""
+        return self._modify(learner_id, lambda state: (LearnerState(learner_id), []))[0]
+
+    def attempts(self, learner_id):
+        """The learner's most recent attempts, oldest first."""
+        with self._lock:
+            return list(self._log.get(learner_id, ()))
+
+    def stats(self):
+        return {'backend': 'memory', 'learners': len(self._states), 'max_learners': self.max_learners,
+                'evictions': self.evictions}
+
+
+class SqliteLearnerStore(InMemoryLearnerStore):
+    """
+    Learner store backed by a SQLite file in WAL mode, shared by every
+    worker on the host.
+
+    Nothing is cached in the process: each change reads the learner's row,
+    applies the change and writes the row and its new attempts back inside
+    one `BEGIN IMMEDIATE` transaction, so workers updating the same learner
+    concurrently are serialized by SQLite instead of overwriting each other.
+    Attempts go to an append-only `attempts` table and the aggregates to
+    `learners`.
+
+    Writes are not buffered in the worker: a buffer would be invisible to
+    the other workers and lost on a crash, and the learner's next answer may
+    land on any of them. What is batched is the transaction: an answer
+    batch from `record_attempts` is one transaction and one fsync-free WAL
+    commit (synchronous=NORMAL), however many attempts it holds.
+    """
+
+    shared_across_processes = True
+
+    def __init__(self, db_path, busy_timeout=30.0):
+        self.db_path = db_path
+        self.busy_timeout = busy_timeout
+        self.writes = 0
+        self._lock = threading.Lock()
+        self._db = None
+        self._db_pid = None
+
+    def _connection(self):
+        # One connection per process; SQLite handles must not cross a fork.
+        # Autocommit mode, so transactions are opened explicitly below.
+        if self._db is None or self._db_pid != os.getpid():
+            self._db = sqlite3.connect(self.db_path, timeout=self.busy_timeout,
+                                       isolation_level=None, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS attempts ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, learner_id TEXT NOT NULL, question_id INTEGER, "
+                "difficulty TEXT, correct INTEGER NOT NULL, seconds REAL, created REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS attempts_learner ON attempts (learner_id, id)")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS learners ("
+                "learner_id TEXT PRIMARY KEY, state TEXT NOT NULL, updated REAL NOT NULL)"
+            )
+            self._db_pid = os.getpid()
+        return self._db
+
+    def _load(self, db, learner_id):
+        row = db.execute("SELECT state FROM learners WHERE learner_id = ?", (learner_id,)).fetchone()
+        if row is None:
+            return None
+        data = json.loads(row[0])
+        state = LearnerState.from_dict(data)
+        if LearnerState.needs_replay(data):
+            # Saved before the running statistics existed: rebuild them from the log
+            for attempt in self._attempt_rows(db, learner_id):
+                state.apply(attempt)
+        return state
+
+    def _attempt_rows(self, db, learner_id):
+        rows = db.execute(
+            "SELECT learner_id, question_id, difficulty, correct, seconds, created "
+            "FROM attempts WHERE learner_id = ? ORDER BY id",
+            (learner_id,),
+        ).fetchall()
+        return [Attempt(lid, qid, difficulty, bool(correct), seconds, created)
+                for lid, qid, difficulty, correct, seconds, created in rows]
+
+    def _modify(self, learner_id, change):
+        # The lock keeps this process's threads off the shared connection; the
+        # IMMEDIATE transaction takes SQLite's write lock before the read, so
+        # no other worker can change the row between the read and the write.
+        with self._lock:
+            db = self._connection()
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                state = self._load(db, learner_id) or LearnerState(learner_id)
+                state, attempts = change(state)
+                db.executemany(
+                    "INSERT INTO attempts (learner_id, question_id, difficulty, correct, seconds, created) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    [(a.learner_id, a.question_id, a.difficulty, int(a.correct), a.seconds, a.timestamp)
+                     for a in attempts],
+                )
+                db.execute(
+                    "INSERT OR REPLACE INTO learners VALUES (?, ?, ?)",
+                    (learner_id, json.dumps(state.to_dict()), time.time()),
+                )
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+            db.execute("COMMIT")
+            self.writes += 1
+            return state, attempts
+
+    def get(self, learner_id):
+        with self._lock:
+            state = self._load(self._connection(), learner_id)
+        return state if state is not None else LearnerState(learner_id)
+
+    def attempts(self, learner_id):
+        with self._lock:
+            return self._attempt_rows(self._connection(), learner_id)
+
+    def stats(self):
+        return {'backend': 'sqlite', 'db_path': self.db_path, 'writes': self.writes}
+
+
+def make_learner_store(db_path=None, **kwargs):
+    """SQLite-backed store when `db_path` is given, in-memory otherwise."""
+    if db_path:
+        return SqliteLearnerStore(db_path, **kwargs)
+    return InMemoryLearnerStore(**kwargs)
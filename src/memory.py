@@ -0,0 +1,27 @@
+import os
+import sys
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def current_rss_bytes():
+    """Resident set size of this process in bytes, or None if it can't be read."""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError, AttributeError):
+        # No procfs (macOS, Windows): fall back to the peak, which is the best we have
+        return peak_rss_bytes()
+
+
+def peak_rss_bytes():
+    """Peak resident set size of this process in bytes, or None if unavailable."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes on Linux
+    return peak if sys.platform == 'darwin' else peak * 1024
@@ -0,0 +1,234 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels) + '}'
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram per label set, rendered the Prometheus way."""
+
+    def __init__(self, name, help_text, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self._series = {}  # labels tuple -> [bucket counts..., count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, seconds, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    series[i] += 1
+            series[-2] += 1
+            series[-1] += seconds
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = [(key, list(series)) for key, series in self._series.items()]
+        for key, series in sorted(items):
+            for bound, count in zip(self.buckets, series):
+                lines.append(f"{self.name}_bucket{_labels(key + (('le', repr(bound)),))} {count}")
+            lines.append(f"{self.name}_bucket{_labels(key + (('le', '+Inf'),))} {series[-2]}")
+            lines.append(f"{self.name}_count{_labels(key)} {series[-2]}")
+            lines.append(f"{self.name}_sum{_labels(key)} {series[-1]}")
+        return lines
+
+
+class CounterMetric:
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help_text = help_text
+        self._values = Counter()
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        with self._lock:
+            self._values[tuple(sorted(labels.items()))] += amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        lines.extend(f"{self.name}{_labels(key)} {value}" for key, value in items)
+        return lines
+
+
+class SamplingProfiler:
+    """
+    Wall-clock stack sampler for in-flight requests.
+
+    While at least one request is registered, a daemon thread reads the
+    registered threads' frames every `interval` seconds and counts each
+    stack. When a request ends its stacks are returned in collapsed
+    "outer;...;inner count" form, which flamegraph.pl and speedscope read.
+    """
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self._active = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+
+    def _ensure_thread(self):
+        # Started lazily, and restarted in forked children where the thread doesn't exist
+        if self._thread is None or self._pid != os.getpid():
+            self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+            self._pid = os.getpid()
+            self._thread.start()
+
+    def begin(self):
+        with self._lock:
+            self._ensure_thread()
+            self._active[threading.get_ident()] = Counter()
+
+    def end(self):
+        with self._lock:
+            return self._active.pop(threading.get_ident(), Counter())
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                active = list(self._active.items())
+            if not active:
+                continue
+            frames = sys._current_frames()
+            samples = []
+            for thread_id, stacks in active:
+                frame = frames.get(thread_id)
+                names = []
+                while frame is not None:
+                    code = frame.f_code
+                    names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                samples.append((thread_id, stacks, ';'.join(reversed(names))))
+            del frames
+            # Counted under the lock, and only for requests still running, so
+            # `end` never hands out a Counter this thread is still changing
+            with self._lock:
+                for thread_id, stacks, stack in samples:
+                    if self._active.get(thread_id) is stacks:
+                        stacks[stack] += 1
+
+    @staticmethod
+    def collapsed(stacks):
+        return ''.join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+class Metrics:
+    """
+    Request and stage latency histograms, error counters and pluggable
+    collectors, exposed in the Prometheus text format.
+
+    Metrics are per process; with several gunicorn workers each one serves
+    its own numbers, so scrape them individually or aggregate downstream.
+    Set `profile_slow_ms` to sample stacks of every request and keep the
+    ones slower than that threshold in `profile_dir`.
+    """
+
+    def __init__(self, prefix='tutor', profile_slow_ms=None, profile_dir='profiles'):
+        self.prefix = prefix
+        self.requests = Histogram(f"{prefix}_request_seconds", "Request latency by route, method and status.")
+        self.stages = Histogram(f"{prefix}_stage_seconds", "Latency of internal stages within requests.")
+        self.errors = CounterMetric(f"{prefix}_errors_total", "Errors by where they were caught.")
+        self.profiles_written = CounterMetric(f"{prefix}_slow_profiles_total", "Slow-request profiles written.")
+        self._collectors = []
+        self.profile_slow = profile_slow_ms / 1000.0 if profile_slow_ms else None
+        self.profile_dir = profile_dir
+        self.profiler = SamplingProfiler() if self.profile_slow is not None else None
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages.observe(time.perf_counter() - start, stage=name)
+
+    def record_error(self, where):
+        self.errors.inc(where=where)
+
+    def add_collector(self, collect):
+        """`collect()` returns [(name, type, help, [(labels_dict, value), ...]), ...] at scrape time."""
+        self._collectors.append(collect)
+
+    def _write_profile(self, route, seconds, stacks):
+        os.makedirs(self.profile_dir, exist_ok=True)
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}-{route.strip('/').replace('/', '_') or 'root'}-{seconds * 1000:.0f}ms.folded"
+        with open(os.path.join(self.profile_dir, name), 'w', encoding='utf-8') as f:
+            f.write(SamplingProfiler.collapsed(stacks))
+        self.profiles_written.inc(route=route)
+
+    def instrument(self, app):
+        """Time every request of a Flask app and serve the metrics on /metrics."""
+        from flask import Response, g, request
+
+        @app.before_request
+        def _start_timer():
+            g.metrics_start = time.perf_counter()
+            if self.profiler is not None:
+                self.profiler.begin()
+
+        @app.after_request
+        def _observe(response):
+            start = g.pop('metrics_start', None)
+            if start is None:
+                return response
+            seconds = time.perf_counter() - start
+            route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+            self.requests.observe(seconds, route=route, method=request.method, status=response.status_code)
+            if self.profiler is not None:
+                stacks = self.profiler.end()
+                if seconds >= self.profile_slow and stacks:
+                    self._write_profile(route, seconds, stacks)
+            return response
+
+        @app.teardown_request
+        def _count_exception(exc):
+            if exc is not None:
+                self.record_error('unhandled')
+            if self.profiler is not None:
+                self.profiler.end()
+
+        @app.route('/metrics')
+        def metrics_endpoint():
+            return Response(self.render(), mimetype='text/plain; version=0.0.4')
+
+    def render(self):
+        lines = self.requests.render() + self.stages.render() + self.errors.render()
+        if self.profiler is not None:
+            lines += self.profiles_written.render()
+        for collect in self._collectors:
+            try:
+                families = collect()
+            except Exception:
+                self.record_error('collector')
+                continue
+            for name, metric_type, help_text, samples in families:
+                name = f"{self.prefix}_{name}"
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {metric_type}")
+                for labels, value in samples:
+                    if value is not None:
+                        lines.append(f"{name}{_labels(sorted(labels.items()))} {value}")
+        return '\n'.join(lines) + '\n'
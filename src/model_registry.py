@@ -0,0 +1,117 @@
+import os
+import threading
+import time
+
+from src.memory import current_rss_bytes
+
+
+class ModelHandle:
+    """One registered model artifact and the bookkeeping around its current version."""
+
+    def __init__(self, name, path, loader):
+        self.name = name
+        self.path = path
+        self.loader = loader
+        self.model = None
+        self.version = None
+        self.failed_version = None
+        self.loads = 0
+        self.gets = 0
+        self.load_seconds = None
+        self.rss_delta_bytes = None
+        self.file_size_bytes = None
+        self.loaded_at = None
+        self.last_error = None
+        self.last_check = 0.0
+        self.lock = threading.Lock()
+
+    def describe(self):
+        return {
+            'path': self.path,
+            'loaded': self.model is not None,
+            'version_mtime_ns': self.version,
+            'loads': self.loads,
+            'gets': self.gets,
+            'load_seconds': self.load_seconds,
+            'rss_delta_bytes': self.rss_delta_bytes,
+            'file_size_bytes': self.file_size_bytes,
+            'loaded_at': self.loaded_at,
+            'last_error': self.last_error,
+        }
+
+
+class ModelRegistry:
+    """
+    Process-wide cache of model artifacts.
+
+    Each model is loaded once per worker on first use. Every `check_interval`
+    seconds `get` looks at the file's mtime; when a new version has landed the
+    new model is loaded next to the old one and swapped in with a single
+    attribute assignment, so concurrent requests keep using the old model until
+    the new one is ready. A version that fails to load is not retried until the
+    file changes again.
+    """
+
+    def __init__(self, check_interval=5.0):
+        self.check_interval = check_interval
+        self._handles = {}
+
+    def register(self, name, path, loader):
+        """Register `loader(path) -> model` under `name`. Nothing is loaded yet."""
+        self._handles[name] = ModelHandle(name, path, loader)
+
+    def get(self, name):
+        """Return the current model for `name`, loading or hot-swapping it if needed."""
+        handle = self._handles[name]
+        handle.gets += 1
+        if handle.model is None or time.monotonic() - handle.last_check >= self.check_interval:
+            self.reload(name)
+        return handle.model
+
+    def reload(self, name, force=False):
+        """Load `name` if its file changed since the last load. Returns True on swap."""
+        handle = self._handles[name]
+        with handle.lock:
+            handle.last_check = time.monotonic()
+            try:
+                stat = os.stat(handle.path)
+            except FileNotFoundError:
+                if handle.last_error is None:
+                    print(f"❌ Error: {name} model file not found at {handle.path}")
+                handle.last_error = "file not found"
+                return False
+
+            version = stat.st_mtime_ns
+            if not force and version in (handle.version, handle.failed_version):
+                return False
+
+            rss_before = current_rss_bytes()
+            start = time.perf_counter()
+            try:
+                model = handle.loader(handle.path)
+            except Exception as e:
+                print(f"❌ Error loading {name} model: {e}")
+                handle.failed_version = version
+                handle.last_error = str(e)
+                return False
+            elapsed = time.perf_counter() - start
+            rss_after = current_rss_bytes()
+
+            # Swap in the new version; readers holding the old object keep using it
+            handle.model = model
+            handle.version = version
+            handle.failed_version = None
+            handle.loads += 1
+            handle.load_seconds = elapsed
+            handle.rss_delta_bytes = rss_after - rss_before if rss_before is not None and rss_after is not None else None
+            handle.file_size_bytes = stat.st_size
+            handle.loaded_at = time.time()
+            handle.last_error = None
+            return True
+
+    def names(self):
+        return list(self._handles)
+
+    def describe(self):
+        """Load time, memory footprint and version of every registered model."""
+        return {name: handle.describe() for name, handle in self._handles.items()}
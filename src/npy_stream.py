@@ -0,0 +1,52 @@
+import numpy as np
+
+_MAGIC = b'\x93NUMPY\x01\x00'
+
+
+def _header(dtype, rows, width):
+    descr = np.lib.format.dtype_to_descr(np.dtype(dtype))
+    text = "{'descr': %r, 'fortran_order': False, 'shape': (%d,), }" % (descr, rows)
+    return text.ljust(width - 1) + '\n'
+
+
+class NpyStreamWriter:
+    """
+    Append-only writer for a 1-D (optionally structured) `.npy` file whose
+    length is not known up front.
+
+    Rows are written as they arrive; the header reserves room for any row
+    count and is rewritten with the real shape on `close`, so the result is a
+    regular file for `np.load(path, mmap_mode='r')`.
+    """
+
+    def __init__(self, path, dtype):
+        self.path = path
+        self.dtype = np.dtype(dtype)
+        self.rows = 0
+        # Size the header for the largest possible shape, rounded so data stays 64-byte aligned
+        width = len(_header(self.dtype, 2 ** 63, 0)) + 1
+        self._header_width = -(-(len(_MAGIC) + 2 + width) // 64) * 64 - len(_MAGIC) - 2
+        self._file = open(path, 'wb')
+        self._write_header()
+
+    def _write_header(self):
+        header = _header(self.dtype, self.rows, self._header_width).encode('latin1')
+        self._file.write(_MAGIC + len(header).to_bytes(2, 'little') + header)
+
+    def write(self, rows):
+        rows = np.ascontiguousarray(rows, dtype=self.dtype)
+        self._file.write(rows.tobytes())
+        self.rows += len(rows)
+
+    def close(self):
+        if self._file.closed:
+            return
+        self._file.seek(0)
+        self._write_header()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
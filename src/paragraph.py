@@ -0,0 +1,104 @@
+import re
+from collections import OrderedDict
+
+from src.grammar_cache import normalize_sentence
+
+MAX_SENTENCE_WORDS = 60  # longer runs are cut at word boundaries to stay within the model's input length
+# Abbreviations whose trailing period does not end a sentence (en, fr, de)
+ABBREVIATIONS = {
+    'mr', 'mrs', 'ms', 'dr', 'prof', 'sr', 'jr', 'st', 'vs', 'etc', 'fig', 'approx',
+    'mme', 'mlle', 'cf', 'hr', 'fr', 'nr', 'bzw', 'usw', 'ca', 'vgl',
+}
+# Abbreviations that are also words: only abbreviations when a number follows ("no. 5", not "No. I disagree.")
+NUMBER_ABBREVIATIONS = {'no'}
+# End punctuation and closing quotes/brackets, then the separating whitespace; or a bare line break
+_BOUNDARY = re.compile(r'[.!?…]+["\'”’»)\]]*(\s+)|(\s*\n\s*)')
+
+
+def _ends_sentence(text, start, punct_start, next_start):
+    # Learners often skip capitals, so only a lone period after an abbreviation
+    # ("Dr.", "e.g.") or an initial ("J.") is not taken as a boundary
+    if text[punct_start] != '.' or text[punct_start:punct_start + 2] == '..':
+        return True
+    words = text[start:punct_start].split()
+    word = words[-1].lower().lstrip('"\'“‘«(') if words else ''
+    if word in NUMBER_ABBREVIATIONS:
+        return not text[next_start:next_start + 1].isdigit()
+    return not (word in ABBREVIATIONS or '.' in word or (len(word) == 1 and word.isalpha()))
+
+
+def _cut_long(sentence, separator, max_words):
+    words = sentence.split()
+    if len(words) <= max_words:
+        return [(sentence, separator)]
+    chunks = [' '.join(words[i:i + max_words]) for i in range(0, len(words), max_words)]
+    return [(chunk, ' ') for chunk in chunks[:-1]] + [(chunks[-1], separator)]
+
+
+def split_sentences(text, max_words=MAX_SENTENCE_WORDS):
+    """
+    Split a paragraph into (sentence, separator) pairs.
+
+    Sentences end at ., !, ? or … (plus closing quotes) followed by
+    whitespace, except after common abbreviations and initials, and at
+    every line break. `separator` is the whitespace that followed, so
+    joining corrected sentences with their separators keeps the layout.
+    """
+    pieces = []
+    start = 0
+    for match in _BOUNDARY.finditer(text):
+        if match.group(1) is not None:
+            separator_start = match.start(1)
+            if not _ends_sentence(text, start, match.start(), match.end()):
+                continue
+        else:
+            separator_start = match.start(2)
+        sentence = text[start:separator_start].strip()
+        if sentence:
+            pieces.extend(_cut_long(sentence, text[separator_start:match.end()], max_words))
+        start = match.end()
+    sentence = text[start:].strip()
+    if sentence:
+        pieces.extend(_cut_long(sentence, '', max_words))
+    return pieces
+
+
+def correct_paragraph(pieces, cache, batcher, fast_path=None):
+    """
+    Correct `split_sentences` output, yielding (positions, corrected, cached)
+    for every distinct sentence as soon as its correction is known.
+
+    Identical sentences are corrected once. Cached corrections come first;
+    the rest are queued on the batcher shortest first, so its batches hold
+    sentences of similar length and little padding, and are yielded in that
+    order while later batches are still running. `fast_path(sentence)` may
+    answer a sentence without the model by returning its correction; such
+    answers are not written to the cache, which only holds the model's.
+    """
+    groups = OrderedDict()
+    for position, (sentence, _) in enumerate(pieces):
+        # The model sees the first occurrence as written; repeats share its correction
+        groups.setdefault(normalize_sentence(sentence), (sentence, []))[1].append(position)
+
+    misses = []
+    for sentence, positions in groups.values():
+        corrected = cache.get(sentence)
+        if corrected is not None:
+            yield positions, corrected, True
+            continue
+        corrected = fast_path(sentence) if fast_path is not None else None
+        if corrected is None:
+            misses.append((sentence, positions))
+        else:
+            yield positions, corrected, False
+
+    misses.sort(key=lambda item: len(item[0]))
+    futures = [batcher.submit(sentence) for sentence, _ in misses]
+    batch_size = batcher.max_batch_size
+    for start in range(0, len(misses), batch_size):
+        done = []
+        for (sentence, positions), future in zip(misses[start:start + batch_size], futures[start:start + batch_size]):
+            corrected = future.result()
+            done.append((sentence, corrected))
+            yield positions, corrected, False
+        cache.put_many(done)
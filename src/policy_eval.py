@@ -0,0 +1,108 @@
+import json
+import math
+import time
+
+import numpy as np
+
+# Two-sided normal quantiles for the reward confidence interval
+_Z_SCORES = {0.90: 1.6449, 0.95: 1.9600, 0.99: 2.5758}
+
+
+def make_eval_env(n_envs=8, vec_env='dummy', seed=0):
+    """N copies of AdaptiveLearningEnv (in-process or one process each), or the NumPy-vectorized learners."""
+    if vec_env == 'numpy':
+        from src.vec_env import VectorizedLearningEnv
+        return VectorizedLearningEnv(num_envs=n_envs, seed=seed)
+    from stable_baselines3.common.env_util import make_vec_env
+    from stable_baselines3.common.vec_env import DummyVecEnv, SubprocVecEnv
+    from src.rl_env import AdaptiveLearningEnv
+    vec_env_cls = SubprocVecEnv if vec_env == 'subproc' else DummyVecEnv
+    return make_vec_env(AdaptiveLearningEnv, n_envs=n_envs, seed=seed, vec_env_cls=vec_env_cls)
+
+
+def run_episodes(model, env, n_episodes, seed=0, deterministic=True):
+    """
+    Play `n_episodes` on a VecEnv with one batched `model.predict` per step.
+
+    Each sub-env is assigned a fixed share of the episodes up front, so the
+    result does not favour whichever envs finish short episodes first, and
+    seeding the env makes a run reproducible. Returns per-episode total
+    rewards and lengths, in order of completion.
+    """
+    n_envs = env.num_envs
+    targets = np.array([(n_episodes + i) // n_envs for i in range(n_envs)])
+    counts = np.zeros(n_envs, dtype=np.int64)
+    current_rewards = np.zeros(n_envs)
+    current_lengths = np.zeros(n_envs, dtype=np.int64)
+    episode_rewards = []
+    episode_lengths = []
+
+    env.seed(seed)
+    obs = env.reset()
+    while (counts < targets).any():
+        actions, _ = model.predict(obs, deterministic=deterministic)
+        obs, rewards, dones, _ = env.step(actions)
+        current_rewards += rewards
+        current_lengths += 1
+        for i in np.flatnonzero(dones):
+            if counts[i] < targets[i]:
+                episode_rewards.append(current_rewards[i])
+                episode_lengths.append(current_lengths[i])
+                counts[i] += 1
+            current_rewards[i] = 0.0
+            current_lengths[i] = 0
+    return np.array(episode_rewards), np.array(episode_lengths)
+
+
+def summarize(episode_rewards, episode_lengths, elapsed, confidence=0.95):
+    """Mean, standard deviation and normal-approximation confidence interval of the episode reward."""
+    n = len(episode_rewards)
+    mean = float(np.mean(episode_rewards)) if n else float('nan')
+    std = float(np.std(episode_rewards, ddof=1)) if n > 1 else 0.0
+    half_width = _Z_SCORES[confidence] * std / math.sqrt(n) if n else float('nan')
+    return {
+        'episodes': n,
+        'reward_mean': mean,
+        'reward_std': std,
+        'confidence': confidence,
+        'reward_ci_low': mean - half_width,
+        'reward_ci_high': mean + half_width,
+        'episode_length_mean': float(np.mean(episode_lengths)) if n else float('nan'),
+        'seconds': elapsed,
+        'episodes_per_second': n / elapsed if elapsed > 0 else float('nan'),
+    }
+
+
+def evaluate_policy(model, env, n_episodes=1000, seed=0, deterministic=True, confidence=0.95):
+    """Run `n_episodes` and return (metrics dict, per-episode rewards)."""
+    start = time.perf_counter()
+    episode_rewards, episode_lengths = run_episodes(model, env, n_episodes, seed, deterministic)
+    metrics = summarize(episode_rewards, episode_lengths, time.perf_counter() - start, confidence)
+    return metrics, episode_rewards
+
+
+def write_report(metrics, episode_rewards, metrics_path=None, plot_path=None):
+    """Write metrics as JSON and a reward plot as an image, without opening a window."""
+    if metrics_path:
+        with open(metrics_path, 'w', encoding='utf-8') as f:
+            json.dump(metrics, f, indent=2)
+    if plot_path:
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+
+        fig, (ax_line, ax_hist) = plt.subplots(1, 2, figsize=(12, 5))
+        ax_line.plot(episode_rewards, linewidth=0.5, label="Total reward per episode")
+        ax_line.axhline(metrics['reward_mean'], color='red', label=f"Mean {metrics['reward_mean']:.3f}")
+        ax_line.axhspan(metrics['reward_ci_low'], metrics['reward_ci_high'], color='red', alpha=0.2,
+                        label=f"{metrics['confidence']:.0%} CI")
+        ax_line.set_xlabel("Episode")
+        ax_line.set_ylabel("Reward")
+        ax_line.legend()
+        ax_hist.hist(episode_rewards, bins=50)
+        ax_hist.set_xlabel("Reward")
+        ax_hist.set_ylabel("Episodes")
+        fig.suptitle(f"Policy evaluation over {metrics['episodes']:,} episodes")
+        fig.tight_layout()
+        fig.savefig(plot_path)
+        plt.close(fig)
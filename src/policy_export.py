@@ -0,0 +1,134 @@
+import json
+
+import numpy as np
+
+QUANTIZATIONS = ('float32', 'float16', 'int8')
+_ACTIVATIONS = {
+    'ReLU': lambda x: np.maximum(x, 0.0, out=x),
+    'Tanh': lambda x: np.tanh(x, out=x),
+    'Identity': lambda x: x,
+}
+
+
+def _quantize(weight, quantize):
+    """Arrays to store for one weight matrix, keyed by suffix."""
+    if quantize == 'float16':
+        return {'': weight.astype(np.float16)}
+    if quantize == 'int8':
+        # Symmetric, one scale per output unit
+        scale = np.abs(weight).max(axis=1) / 127.0
+        scale[scale == 0] = 1.0
+        return {'': np.round(weight / scale[:, None]).astype(np.int8), '_scale': scale.astype(np.float32)}
+    return {'': weight.astype(np.float32)}
+
+
+def export_dqn_policy(model, out_path, quantize='float32'):
+    """
+    Write the Q-network of a stable-baselines3 DQN to a standalone `.npz`.
+
+    The artifact holds each Linear layer's weight (float32, float16, or int8
+    with a per-row float32 scale) and bias, the activation between layers
+    and how to turn an observation into the network input, so PolicyRunner
+    can evaluate it with NumPy alone. Only MLP policies are supported.
+    """
+    import torch.nn as nn
+    from gymnasium import spaces
+
+    if quantize not in QUANTIZATIONS:
+        raise ValueError(f"quantize must be one of {QUANTIZATIONS}, got {quantize!r}")
+
+    q_net = model.q_net
+    extractor = type(q_net.features_extractor).__name__
+    if extractor != 'FlattenExtractor':
+        raise ValueError(f"Only MLP policies can be exported, this one uses {extractor}.")
+
+    arrays = {}
+    activations = []
+    layers = 0
+    for module in q_net.q_net:
+        if isinstance(module, nn.Linear):
+            weight = module.weight.detach().cpu().numpy()
+            for suffix, array in _quantize(weight, quantize).items():
+                arrays[f'w{layers}{suffix}'] = array
+            arrays[f'b{layers}'] = module.bias.detach().cpu().numpy().astype(np.float32)
+            layers += 1
+        elif type(module).__name__ in _ACTIVATIONS:
+            activations.append(type(module).__name__)
+        else:
+            raise ValueError(f"Cannot export layer {type(module).__name__}.")
+
+    space = model.observation_space
+    if isinstance(space, spaces.Discrete):
+        observation = {'kind': 'discrete', 'n': int(space.n)}
+    elif isinstance(space, spaces.Box):
+        observation = {'kind': 'box', 'shape': list(space.shape)}
+    else:
+        raise ValueError(f"Cannot export policies for {type(space).__name__} observations.")
+
+    meta = {
+        'format': 1,
+        'layers': layers,
+        'activations': activations,
+        'quantize': quantize,
+        'observation': observation,
+        'n_actions': int(model.action_space.n),
+    }
+    np.savez(out_path, meta=np.array(json.dumps(meta)), **arrays)
+    return meta
+
+
+class PolicyRunner:
+    """
+    Greedy DQN policy evaluated with NumPy from an `export_dqn_policy` artifact.
+
+    Quantized weights are expanded to float32 once at load, so inference is a
+    few small matrix products on a batch of observations; torch and
+    stable-baselines3 are not imported. `predict` mirrors `DQN.predict` so it
+    can stand in for the model.
+    """
+
+    def __init__(self, path):
+        with np.load(path) as artifact:
+            self.meta = json.loads(str(artifact['meta']))
+            self.layers = []
+            for i in range(self.meta['layers']):
+                weight = artifact[f'w{i}'].astype(np.float32)
+                if f'w{i}_scale' in artifact:
+                    weight *= artifact[f'w{i}_scale'][:, None]
+                # Stored as (out, in) like torch; keep (in, out) for obs @ weight
+                self.layers.append((np.ascontiguousarray(weight.T), artifact[f'b{i}']))
+        self.path = path
+        self.observation = self.meta['observation']
+        self.n_actions = self.meta['n_actions']
+        self._activations = [_ACTIVATIONS[name] for name in self.meta['activations']]
+
+    def _inputs(self, obs):
+        """Batch of network inputs and whether `obs` was a single observation."""
+        if self.observation['kind'] == 'discrete':
+            obs = np.asarray(obs, dtype=np.int64)
+            single = obs.ndim == 0
+            return np.eye(self.observation['n'], dtype=np.float32)[obs.reshape(-1)], single
+        obs = np.asarray(obs, dtype=np.float32)
+        shape = tuple(self.observation['shape'])
+        single = obs.shape == shape
+        return obs.reshape(-1, int(np.prod(shape))), single
+
+    def q_values(self, obs):
+        """Q-values, shape (batch, n_actions)."""
+        x, _ = self._inputs(obs)
+        return self._forward(x)
+
+    def _forward(self, x):
+        last = len(self.layers) - 1
+        for i, (weight, bias) in enumerate(self.layers):
+            x = x @ weight
+            x += bias
+            if i < last:
+                x = self._activations[i](x)
+        return x
+
+    def predict(self, obs, state=None, episode_start=None, deterministic=True):
+        """Greedy actions for one observation or a batch, as `DQN.predict` returns them."""
+        x, single = self._inputs(obs)
+        actions = self._forward(x).argmax(axis=1)
+        return (actions.squeeze(axis=0) if single else actions), state
@@ -0,0 +1,266 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from src.learner_features import (DIFFICULTY_CODES, apply_attempts, check_feature_schema, features_from_state,
+                                   new_feature_state)
+
+EASY, MEDIUM, HARD = 0, 1, 2
+LEVEL_CENTRES = np.array([0.25, 0.5, 0.75])  # ability at which a level is answered half the time
+# The app's rule: difficulty_map on a correct answer, reverse_difficulty_map on a wrong one
+RULE_UP = np.array([MEDIUM, HARD, MEDIUM])
+RULE_DOWN = np.array([EASY, EASY, MEDIUM])
+POLICIES = ('rule', 'forest', 'dqn', 'random')
+
+
+class Population:
+    """
+    N synthetic learners held as NumPy arrays and stepped one attempt at a time.
+
+    The response model is VectorizedLearningEnv's: a learner answers level d
+    correctly with probability sigmoid(8 * (ability - fatigue - centre[d]))
+    and a correct answer raises ability by learning_rate * (1 - ability),
+    scaled up for harder levels. On top of that every attempt adds fatigue,
+    which lowers both the chance of a correct answer and how much is learned,
+    and a break every `session_length` attempts clears it. Response times
+    grow with the level and with fatigue.
+
+    The running feature statistics of every learner are kept with the same
+    `apply_attempts` update as serving, so the forest sees the features it
+    would see in the app.
+    """
+
+    def __init__(self, n, seed=None, session_length=20, accuracy_decay=0.8):
+        rng = np.random.default_rng(seed)
+        self.n = n
+        self.session_length = session_length
+        self.accuracy_decay = accuracy_decay
+        self.ability = rng.uniform(0.1, 0.7, n)
+        self.initial_ability = self.ability.copy()
+        self.learning_rate = rng.uniform(0.01, 0.05, n)
+        self.fatigue_rate = rng.uniform(0.005, 0.03, n)
+        self.base_seconds = rng.lognormal(np.log(10.0), 0.3, n)
+        self.fatigue = np.zeros(n)
+        self.difficulty = np.full(n, EASY, dtype=np.int64)
+        self.accuracy = np.full(n, 0.5)
+        self.last_correct = np.zeros(n)
+        self.features = new_feature_state(n)
+        self.attempts = 0
+
+    def step(self, uniforms, time_noise):
+        """Every learner answers one question at its current difficulty; returns the correct mask."""
+        d = self.difficulty
+        p_correct = 1.0 / (1.0 + np.exp(-8.0 * (self.ability - self.fatigue - LEVEL_CENTRES[d])))
+        correct = uniforms < p_correct
+
+        learned = self.learning_rate * (1.0 - self.ability) * (0.5 + 0.25 * d) * (1.0 - self.fatigue)
+        self.ability += np.where(correct, learned, 0.0)
+        seconds = self.base_seconds * (1.0 + 0.5 * d) * (1.0 + self.fatigue) * time_noise
+        self.fatigue = np.minimum(self.fatigue + self.fatigue_rate * (1.0 + 0.5 * d), 0.5)
+        self.attempts += 1
+        if self.attempts % self.session_length == 0:
+            self.fatigue[:] = 0.0
+
+        apply_attempts(self.features, d, correct, seconds)
+        self.accuracy = self.accuracy_decay * self.accuracy + (1.0 - self.accuracy_decay) * correct
+        self.last_correct = correct.astype(np.float64)
+        return correct
+
+    def observations(self):
+        """The DQN observation of every learner, laid out as in VectorizedLearningEnv."""
+        return np.stack([self.difficulty / 2.0, self.accuracy, self.last_correct], axis=1).astype(np.float32)
+
+
+def load_policy_model(policy, path):
+    """
+    The model behind a policy: exported .npz artifacts are served with NumPy.
+
+    The simulator only produces what the app and VectorizedLearningEnv do,
+    so a forest must be on the app's feature schema (as app.py requires) and
+    a DQN must take VectorizedLearningEnv's (3,) observation. Other models,
+    such as the AdaptiveLearningEnv DQN, are refused with a ValueError.
+    """
+    if path is None:
+        raise ValueError(f"The {policy} policy needs a model path.")
+    if policy == 'forest':
+        if path.endswith('.npz'):
+            from src.forest_export import CompiledForest
+            return check_feature_schema(CompiledForest(path), path)
+        import joblib
+        model = check_feature_schema(joblib.load(path), path)
+        if hasattr(model, 'n_jobs'):
+            model.n_jobs = 1
+        return model
+    if path.endswith('.npz'):
+        from src.policy_export import PolicyRunner
+        model = PolicyRunner(path)
+        shape = tuple(model.observation.get('shape', ()))
+    else:
+        from stable_baselines3 import DQN
+        model = DQN.load(path, device='cpu')
+        shape = model.observation_space.shape
+    if shape != (3,):
+        raise ValueError(f"{path} expects observations of shape {shape}; the simulator provides "
+                         "VectorizedLearningEnv's (3,) observation. Use a model trained with "
+                         "`train_rl_agent.py --vec-env numpy` (model/adaptive_difficulty_dqn_vectorized.zip).")
+    return model
+
+
+def make_policy(policy, model=None, seed=None):
+    """`decide(population) -> next difficulty codes` for one of POLICIES."""
+    if policy == 'rule':
+        return lambda pop: np.where(pop.last_correct > 0, RULE_UP[pop.difficulty], RULE_DOWN[pop.difficulty])
+    if policy == 'forest':
+        def decide(pop):
+            predicted = np.asarray(model.predict(features_from_state(pop.features)))
+            if predicted.dtype.kind in 'UO':
+                predicted = np.array([DIFFICULTY_CODES.get(p, MEDIUM) for p in predicted])
+            return np.clip(np.rint(predicted.astype(np.float64)), EASY, HARD).astype(np.int64)
+        return decide
+    if policy == 'dqn':
+        def decide(pop):
+            actions, _ = model.predict(pop.observations(), deterministic=True)
+            return np.clip(pop.difficulty + np.asarray(actions, dtype=np.int64).reshape(-1) - 1, EASY, HARD)
+        return decide
+    if policy == 'random':
+        rng = np.random.default_rng(seed)
+        return lambda pop: rng.integers(EASY, HARD + 1, pop.n)
+    raise ValueError(f"Unknown policy {policy!r}; use one of {POLICIES}.")
+
+
+_models = {}
+
+
+def simulate_shard(policy, model_path, n_learners, n_steps, seed, session_length=20):
+    """
+    Run one shard of the population under `policy` and return per-step sums.
+
+    The population and every random draw depend only on `seed`, never on the
+    policy, so all policies face the same learners and the same luck.
+    """
+    key = (policy, model_path)
+    if policy in ('forest', 'dqn') and key not in _models:
+        _models[key] = load_policy_model(policy, model_path)
+    population_seed, draws_seed, policy_seed = np.random.SeedSequence(seed).spawn(3)
+    decide = make_policy(policy, _models.get(key), policy_seed)
+
+    pop = Population(n_learners, population_seed, session_length)
+    draws = np.random.default_rng(draws_seed)
+    correct = np.zeros(n_steps)
+    gain = np.zeros(n_steps)
+    levels = np.zeros((n_steps, 3))
+    start = time.perf_counter()
+    for t in range(n_steps):
+        uniforms = draws.random(n_learners)
+        time_noise = draws.lognormal(0.0, 0.25, n_learners)
+        levels[t] = np.bincount(pop.difficulty, minlength=3)
+        correct[t] = pop.step(uniforms, time_noise).sum()
+        gain[t] = (pop.ability - pop.initial_ability).sum()
+        pop.difficulty = decide(pop)
+    return {'learners': n_learners, 'correct': correct, 'gain': gain, 'levels': levels,
+            'seconds': time.perf_counter() - start}
+
+
+def _single_threaded():
+    # One shard per process; keep BLAS and torch from oversubscribing the cores
+    for var in ('OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS'):
+        os.environ[var] = '1'
+
+
+def summarize_shards(shards, n_steps):
+    n = sum(shard['learners'] for shard in shards)
+    correct = sum(shard['correct'] for shard in shards) / n
+    gain = sum(shard['gain'] for shard in shards) / n
+    levels = sum(shard['levels'] for shard in shards) / n
+    tail = max(1, n_steps // 10)
+    return {
+        'learners': n,
+        'steps': n_steps,
+        'attempts': n * n_steps,
+        'final_gain': float(gain[-1]),
+        'mean_accuracy': float(correct.mean()),
+        'final_accuracy': float(correct[-tail:].mean()),
+        'mean_difficulty': float((levels @ np.arange(3)).mean()),
+        'curves': {
+            'accuracy': correct.tolist(),
+            'gain': gain.tolist(),
+            'easy_share': levels[:, EASY].tolist(),
+            'medium_share': levels[:, MEDIUM].tolist(),
+            'hard_share': levels[:, HARD].tolist(),
+        },
+    }
+
+
+def compare_policies(policies, n_learners, n_steps, workers=None, seed=0, session_length=20,
+                     shard_size=50_000, log=print):
+    """
+    Replay the same synthetic population against every policy.
+
+    `policies` maps a policy name from POLICIES to its model path (None for
+    rule and random). The population is split into shards of at most
+    `shard_size` learners that run in parallel on `workers` processes (one
+    per CPU by default; 1 runs in this process). Returns
+    {policy: summary with curves and attempts_per_second}.
+    """
+    n_shards = max(1, -(-n_learners // shard_size))
+    sizes = [n_learners // n_shards + (i < n_learners % n_shards) for i in range(n_shards)]
+    seeds = [int(s) for s in np.random.SeedSequence(seed).generate_state(n_shards)]
+    workers = min(workers or os.cpu_count() or 1, n_shards)
+
+    pool = None
+    if workers > 1:
+        import multiprocessing
+        pool = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('spawn'),
+                                   initializer=_single_threaded)
+    results = {}
+    try:
+        for policy, model_path in policies.items():
+            start = time.perf_counter()
+            args = [(policy, model_path, size, n_steps, shard_seed, session_length)
+                    for size, shard_seed in zip(sizes, seeds)]
+            if pool is None:
+                shards = [simulate_shard(*a) for a in args]
+            else:
+                shards = list(pool.map(simulate_shard, *zip(*args)))
+            elapsed = time.perf_counter() - start
+            summary = summarize_shards(shards, n_steps)
+            summary['seconds'] = elapsed
+            summary['attempts_per_second'] = summary['attempts'] / elapsed
+            results[policy] = summary
+            log(f"  {policy:<8} gain {summary['final_gain']:+.4f}  accuracy {summary['mean_accuracy']:.3f} "
+                f"(last {summary['final_accuracy']:.3f})  difficulty {summary['mean_difficulty']:.2f}  "
+                f"{summary['attempts_per_second']:,.0f} attempts/s")
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return results
+
+
+def write_comparison(results, json_path=None, plot_path=None):
+    """Write the summaries as JSON and the learning-gain and accuracy curves as an image."""
+    if json_path:
+        import json
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    if plot_path:
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+
+        fig, (ax_gain, ax_accuracy) = plt.subplots(1, 2, figsize=(12, 5))
+        for policy, summary in results.items():
+            ax_gain.plot(summary['curves']['gain'], label=policy)
+            ax_accuracy.plot(summary['curves']['accuracy'], linewidth=0.8, label=policy)
+        ax_gain.set_xlabel("Attempt")
+        ax_gain.set_ylabel("Mean ability gain")
+        ax_gain.legend()
+        ax_accuracy.set_xlabel("Attempt")
+        ax_accuracy.set_ylabel("Share answered correctly")
+        ax_accuracy.legend()
+        first = next(iter(results.values()))
+        fig.suptitle(f"Difficulty policies on {first['learners']:,} simulated learners")
+        fig.tight_layout()
+        fig.savefig(plot_path)
+        plt.close(fig)
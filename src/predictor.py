@@ -0,0 +1,99 @@
+import copy
+
+import numpy as np
+
+from src.learner_features import model_feature_columns
+from src.npy_stream import NpyStreamWriter
+
+TARGET_COLUMN = "next_difficulty"
+DEFAULT_CHUNK_SIZE = 65536
+
+
+def csv_feature_columns(csv_path, model=None):
+    """
+    The feature columns to read from `csv_path`: the columns the model was
+    fitted on when it records them, else every column but the target.
+    """
+    columns = model_feature_columns(model) if model is not None else None
+    if columns is not None:
+        return columns
+    import pandas as pd
+    return [column for column in pd.read_csv(csv_path, nrows=0).columns if column != TARGET_COLUMN]
+
+
+def iter_feature_chunks(X=None, csv_path=None, chunk_size=DEFAULT_CHUNK_SIZE, feature_columns=None):
+    """
+    Yield float32 feature blocks of at most `chunk_size` rows, either sliced
+    from a matrix (which may be an np.memmap) or streamed from a CSV shaped
+    like finall.csv. Only `feature_columns` (default: every column but the
+    target) are parsed from the CSV, in that order, so id or text columns
+    next to them are skipped.
+    """
+    if (X is None) == (csv_path is None):
+        raise ValueError("Pass exactly one of X or csv_path.")
+
+    if X is not None:
+        for start in range(0, len(X), chunk_size):
+            yield np.asarray(X[start:start + chunk_size], dtype=np.float32)
+        return
+
+    import pandas as pd
+    if feature_columns is None:
+        feature_columns = csv_feature_columns(csv_path)
+    dtypes = dict.fromkeys(feature_columns, np.float32)
+    for frame in pd.read_csv(csv_path, chunksize=chunk_size, usecols=feature_columns, dtype=dtypes):
+        yield frame[feature_columns].to_numpy(dtype=np.float32)
+
+
+def with_n_jobs(model, n_jobs):
+    """
+    `model` set to predict on `n_jobs` cores. The setting goes on a shallow
+    copy, which shares the fitted trees, so a model shared with the web
+    workers' registry is never modified under concurrent requests.
+    """
+    if n_jobs is None or getattr(model, 'n_jobs', n_jobs) == n_jobs:
+        return model
+    model = copy.copy(model)
+    model.n_jobs = n_jobs
+    return model
+
+
+def iter_next_difficulty_predictions(model, X=None, csv_path=None, chunk_size=DEFAULT_CHUNK_SIZE, n_jobs=-1):
+    """Yield one prediction array per feature chunk, so memory stays bounded by `chunk_size`."""
+    feature_columns = csv_feature_columns(csv_path, model) if csv_path is not None else None
+    model = with_n_jobs(model, n_jobs)
+    for features in iter_feature_chunks(X, csv_path, chunk_size, feature_columns):
+        yield model.predict(features)
+
+
+def predict_next_difficulty_batch(model, X=None, csv_path=None, chunk_size=DEFAULT_CHUNK_SIZE, n_jobs=-1, out_path=None):
+    """
+    Score many learners at once with the next-difficulty model.
+
+    `X` is an (n_learners, n_features) matrix, or `csv_path` points to a CSV
+    in the finall.csv schema that is read `chunk_size` rows at a time. Returns
+    the predictions as an array, or, when `out_path` is given, streams them
+    to that `.npy` file chunk by chunk (an empty one when there are no rows)
+    and returns the number of rows written.
+    """
+    chunks = iter_next_difficulty_predictions(model, X, csv_path, chunk_size, n_jobs)
+    empty_dtype = getattr(model, 'classes_', np.empty(0)).dtype
+    if out_path is None:
+        predictions = list(chunks)
+        if not predictions:
+            return np.empty(0, dtype=empty_dtype)
+        return np.concatenate(predictions)
+
+    writer = None
+    try:
+        for predictions in chunks:
+            if writer is None:
+                writer = NpyStreamWriter(out_path, predictions.dtype)
+            writer.write(predictions)
+        if writer is None:
+            # No rows: still leave a valid, empty .npy so callers never read a stale file
+            writer = NpyStreamWriter(out_path, empty_dtype)
+    finally:
+        if writer is not None:
+            writer.close()
+    return writer.rows
@@ -0,0 +1,123 @@
+import json
+import os
+import random
+import threading
+import time
+
+
+class QuestionBank:
+    """
+    Question bank that is loaded once and indexed by (language, difficulty).
+
+    The JSON file is only re-read when its modification time changes, and the
+    modification time itself is checked at most once every `check_interval`
+    seconds, so picking a question costs a dict lookup plus `random.choice`.
+    """
+
+    def __init__(self, file_path='questions.json', check_interval=1.0):
+        self.file_path = file_path
+        self.check_interval = check_interval
+        self.reloads = 0
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._last_check = 0.0
+        self._missing_reported = False
+        # (questions, index, id_index) is swapped as a single tuple so readers
+        # never see a half-built index while another thread reloads. Both
+        # indexes also have (None, difficulty) keys covering every language.
+        self._state = ((), {}, {})
+        self.reload()
+
+    def reload(self, force=False):
+        """(Re)build the index if the file changed on disk. Returns True on reload."""
+        with self._lock:
+            self._last_check = time.monotonic()
+            try:
+                mtime = os.stat(self.file_path).st_mtime_ns
+            except FileNotFoundError:
+                if not self._missing_reported:
+                    print("❌ Error: Questions file not found.")
+                    self._missing_reported = True
+                return False
+            if not force and mtime == self._mtime:
+                return False
+
+            try:
+                with open(self.file_path, 'r', encoding='utf-8') as file:
+                    raw_questions = json.load(file)
+            except json.JSONDecodeError:
+                # Keep serving the previous version and wait for the next write
+                print("❌ Error: Failed to decode JSON file.")
+                self._mtime = mtime
+                return False
+
+            questions = []
+            buckets = {}
+            for question_id, question in enumerate(raw_questions):
+                question = dict(question, id=question_id)
+                questions.append(question)
+                key = (question.get("language"), question.get("difficulty"))
+                buckets.setdefault(key, []).append(question)
+                if key[0] is not None:
+                    buckets.setdefault((None, key[1]), []).append(question)
+
+            self._state = (
+                tuple(questions),
+                {key: tuple(bucket) for key, bucket in buckets.items()},
+                {key: tuple(question['id'] for question in bucket) for key, bucket in buckets.items()},
+            )
+            self._mtime = mtime
+            self._missing_reported = False
+            self.reloads += 1
+            return True
+
+    def _maybe_reload(self):
+        if time.monotonic() - self._last_check >= self.check_interval:
+            self.reload()
+
+    def __len__(self):
+        self._maybe_reload()
+        return len(self._state[0])
+
+    def get(self, question_id):
+        """Return the question with the given id (its position in the file), or None."""
+        self._maybe_reload()
+        questions = self._state[0]
+        if 0 <= question_id < len(questions):
+            return questions[question_id]
+        return None
+
+    def bucket(self, language, difficulty):
+        """All questions for a (language, difficulty) pair, as a tuple; language None means any language."""
+        self._maybe_reload()
+        return self._state[1].get((language, difficulty), ())
+
+    def bucket_ids(self, language, difficulty):
+        """Ids of every question in a (language, difficulty) pair; language None means any language."""
+        self._maybe_reload()
+        return self._state[2].get((language, difficulty), ())
+
+    def pick(self, language, difficulty, rng=random):
+        """Pick a random question for the bucket, or None if the bucket is empty."""
+        questions = self.bucket(language, difficulty)
+        if not questions:
+            return None
+        return rng.choice(questions)
+
+    def stats(self):
+        questions, index, _ = self._state
+        return {
+            'file_path': self.file_path,
+            'questions': len(questions),
+            'buckets': {f"{language}/{difficulty}": len(bucket)
+                        for (language, difficulty), bucket in index.items() if language is not None},
+            'reloads': self.reloads,
+        }
+
+
+def open_question_bank(file_path='questions.json', check_interval=1.0):
+    """QuestionBank for a JSON file, MmapQuestionBank for a `.qbank` file from build_question_bank.py."""
+    if file_path.endswith('.qbank'):
+        from src.question_bank_file import MmapQuestionBank
+        return MmapQuestionBank(file_path, check_interval)
+    return QuestionBank(file_path, check_interval)
@@ -0,0 +1,201 @@
+import json
+import mmap
+import os
+import random
+import struct
+import threading
+import time
+
+MAGIC = b'QBANK\x00\x01\x00'
+# magic, question count, offsets position, bucket ids position, bucket table position, bucket table length
+_HEADER = struct.Struct('<8sQQQQQ')
+
+
+def _pad(f):
+    # Keep the offset and id arrays 8-byte aligned for memoryview.cast
+    f.write(b'\0' * (-f.tell() % 8))
+
+
+def convert_questions(json_path, out_path):
+    """
+    Write the questions in `json_path` to the indexed binary format at `out_path`.
+
+    Layout: header, one compact UTF-8 JSON record per question, a uint64
+    offset per record (plus the end offset), the question ids of every
+    (language, difficulty) bucket as uint32, and a small JSON table mapping
+    "language/difficulty" to its slice of those ids. Question ids are the
+    positions in the source file, as in QuestionBank. The file is written
+    next to `out_path` and renamed into place, so processes that have the old
+    version mapped keep reading a consistent file. Returns the question count.
+    """
+    with open(json_path, 'r', encoding='utf-8') as file:
+        questions = json.load(file)
+
+    buckets = {}
+    for question_id, question in enumerate(questions):
+        key = f"{question.get('language')}/{question.get('difficulty')}"
+        buckets.setdefault(key, []).append(question_id)
+
+    tmp_path = f"{out_path}.tmp{os.getpid()}"
+    with open(tmp_path, 'wb') as f:
+        f.write(b'\0' * _HEADER.size)
+        offsets = []
+        for question in questions:
+            offsets.append(f.tell())
+            f.write(json.dumps(question, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+        offsets.append(f.tell())
+
+        _pad(f)
+        offsets_pos = f.tell()
+        f.write(struct.pack(f'<{len(offsets)}Q', *offsets))
+
+        table = {}
+        ids = []
+        for key, bucket in buckets.items():
+            table[key] = [len(ids), len(bucket)]
+            ids.extend(bucket)
+        _pad(f)
+        ids_pos = f.tell()
+        f.write(struct.pack(f'<{len(ids)}I', *ids))
+
+        table_pos = f.tell()
+        table_bytes = json.dumps(table, ensure_ascii=False).encode('utf-8')
+        f.write(table_bytes)
+
+        f.seek(0)
+        f.write(_HEADER.pack(MAGIC, len(questions), offsets_pos, ids_pos, table_pos, len(table_bytes)))
+    os.replace(tmp_path, out_path)
+    return len(questions)
+
+
+class _MappedFile:
+    """One open, memory-mapped version of a question bank file."""
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, count, offsets_pos, ids_pos, table_pos, table_len = _HEADER.unpack_from(self.mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a question bank file.")
+        view = memoryview(self.mm)
+        self.count = count
+        self.offsets = view[offsets_pos:offsets_pos + 8 * (count + 1)].cast('Q')
+        self.ids = view[ids_pos:table_pos].cast('I')
+        table = json.loads(bytes(self.mm[table_pos:table_pos + table_len]).decode('utf-8'))
+        self.buckets = {tuple(key.split('/', 1)): (start, size) for key, (start, size) in table.items()}
+        self.any_language = {}  # difficulty -> ids across every language, built on first use
+
+    def record(self, question_id):
+        raw = self.mm[self.offsets[question_id]:self.offsets[question_id + 1]]
+        return dict(json.loads(raw.decode('utf-8')), id=question_id)
+
+
+class MmapQuestionBank:
+    """
+    Read-only question bank served from a file written by `convert_questions`.
+
+    The file is memory-mapped, so every worker on a host shares one copy of
+    it in the page cache and only the small bucket table lives on the Python
+    heap. A question is decoded from its byte offset when it is picked. Like
+    QuestionBank, the file is re-opened when its modification time changes,
+    checked at most once every `check_interval` seconds.
+    """
+
+    def __init__(self, file_path='questions.qbank', check_interval=1.0):
+        self.file_path = file_path
+        self.check_interval = check_interval
+        self.reloads = 0
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._last_check = 0.0
+        self._missing_reported = False
+        self._file = None
+        self.reload()
+
+    def reload(self, force=False):
+        """Re-map the file if it changed on disk. Returns True on reload."""
+        with self._lock:
+            self._last_check = time.monotonic()
+            try:
+                mtime = os.stat(self.file_path).st_mtime_ns
+            except FileNotFoundError:
+                if not self._missing_reported:
+                    print("❌ Error: Questions file not found.")
+                    self._missing_reported = True
+                return False
+            if not force and mtime == self._mtime:
+                return False
+            try:
+                mapped = _MappedFile(self.file_path)
+            except (ValueError, struct.error) as e:
+                print(f"❌ Error: Failed to read question bank file: {e}")
+                self._mtime = mtime
+                return False
+            # Readers holding the old mapping keep it alive until they are done
+            self._file = mapped
+            self._mtime = mtime
+            self._missing_reported = False
+            self.reloads += 1
+            return True
+
+    def _current(self):
+        if time.monotonic() - self._last_check >= self.check_interval:
+            self.reload()
+        return self._file
+
+    def __len__(self):
+        mapped = self._current()
+        return mapped.count if mapped is not None else 0
+
+    def get(self, question_id):
+        """Return the question with the given id (its position in the source JSON), or None."""
+        mapped = self._current()
+        if mapped is not None and 0 <= question_id < mapped.count:
+            return mapped.record(question_id)
+        return None
+
+    @staticmethod
+    def _bucket_ids(mapped, language, difficulty):
+        if mapped is None:
+            return ()
+        if language is None:
+            ids = mapped.any_language.get(difficulty)
+            if ids is None:
+                ids = mapped.any_language[difficulty] = tuple(sorted(
+                    question_id for (_, bucket_difficulty), (start, size) in mapped.buckets.items()
+                    if bucket_difficulty == difficulty for question_id in mapped.ids[start:start + size]
+                ))
+            return ids
+        start, size = mapped.buckets.get((language, difficulty), (0, 0))
+        return mapped.ids[start:start + size]
+
+    def bucket_ids(self, language, difficulty):
+        """
+        Ids of every question in a (language, difficulty) pair, without
+        decoding them; language None means any language.
+        """
+        return self._bucket_ids(self._current(), language, difficulty)
+
+    def bucket(self, language, difficulty):
+        """All questions for a (language, difficulty) pair, as a tuple."""
+        mapped = self._current()
+        return tuple(mapped.record(question_id) for question_id in self._bucket_ids(mapped, language, difficulty))
+
+    def pick(self, language, difficulty, rng=random):
+        """Pick a random question for the bucket, or None if the bucket is empty."""
+        mapped = self._current()
+        ids = self._bucket_ids(mapped, language, difficulty)
+        if not len(ids):
+            return None
+        return mapped.record(ids[rng.randrange(len(ids))])
+
+    def stats(self):
+        mapped = self._file
+        return {
+            'file_path': self.file_path,
+            'questions': mapped.count if mapped is not None else 0,
+            'buckets': {f"{language}/{difficulty}": size
+                        for (language, difficulty), (_, size) in (mapped.buckets.items() if mapped else ())},
+            'mapped_bytes': len(mapped.mm) if mapped is not None else 0,
+            'reloads': self.reloads,
+        }
@@ -0,0 +1,212 @@
+import heapq
+import math
+import random
+import threading
+import time
+from collections import OrderedDict, deque
+
+# Seconds until a question in Leitner box i is due again; a wrong answer goes back to box 0
+LEITNER_INTERVALS = (60, 5 * 60, 30 * 60, 24 * 3600, 3 * 24 * 3600, 7 * 24 * 3600)
+
+
+class _Deck:
+    """One learner's schedule for one (language, difficulty) bucket."""
+
+    __slots__ = ('n', 'a', 'b', 'cursor', 'heap', 'cards', 'signature')
+
+    def __init__(self, n, signature, rng):
+        self.cards = {}  # question id -> (box, due time)
+        self.heap = []  # (due time, question id); entries whose due no longer matches `cards` are stale
+        self.signature = signature  # identifies the bucket's ids the deck was built for
+        self.shuffle(n, rng)
+
+    def shuffle(self, n, rng):
+        # Unseen questions are walked in the order (a * k + b) mod n, a random
+        # permutation that costs O(1) memory instead of a shuffled copy of the bucket
+        self.n = n
+        self.a = 1
+        if n > 1:
+            self.a = rng.randrange(1, n)
+            while math.gcd(self.a, n) != 1:
+                self.a = rng.randrange(1, n)
+        self.b = rng.randrange(n) if n else 0
+        self.cursor = 0
+
+    def schedule(self, question_id, box, due):
+        self.cards[question_id] = (box, due)
+        heapq.heappush(self.heap, (due, question_id))
+        if len(self.heap) > 2 * len(self.cards) + 8:
+            # Mostly stale entries from re-answered questions: rebuild from the cards
+            self.heap = [(card_due, card_id) for card_id, (_, card_due) in self.cards.items()]
+            heapq.heapify(self.heap)
+
+    def pop_due(self, recent, limit):
+        """Pop the earliest non-stale entry due at or before `limit` that isn't in `recent`."""
+        skipped = []
+        chosen = None
+        while self.heap and self.heap[0][0] <= limit:
+            due, question_id = heapq.heappop(self.heap)
+            card = self.cards.get(question_id)
+            if card is None or card[1] != due:
+                continue  # superseded by a later answer
+            if question_id in recent:
+                skipped.append((due, question_id))
+                continue
+            chosen = (due, question_id)
+            break
+        for entry in skipped:
+            heapq.heappush(self.heap, entry)
+        if chosen is not None:
+            # Stays scheduled until it is answered
+            heapq.heappush(self.heap, chosen)
+            return chosen[1]
+        return None
+
+    def next_unseen(self, ids, recent):
+        while self.cursor < self.n:
+            question_id = ids[(self.a * self.cursor + self.b) % self.n]
+            self.cursor += 1
+            if question_id not in self.cards and question_id not in recent:
+                return question_id
+        return None
+
+
+class _Learner:
+    __slots__ = ('decks', 'recent', 'recent_set')
+
+    def __init__(self, recent_window):
+        self.decks = {}
+        self.recent = deque(maxlen=recent_window)
+        self.recent_set = set()
+
+    def saw(self, question_id):
+        if question_id in self.recent_set:
+            return
+        if len(self.recent) == self.recent.maxlen:
+            self.recent_set.discard(self.recent[0])
+        self.recent.append(question_id)
+        self.recent_set.add(question_id)
+
+
+class QuestionScheduler:
+    """
+    Per-learner Leitner scheduling on top of a question bank.
+
+    For each learner and (language, difficulty) bucket the scheduler keeps a
+    heap of answered questions ordered by due time. `next_question` serves,
+    in order: the earliest question that is due, then a question the learner
+    has never seen, then the question due soonest. The last `recent_window`
+    questions shown are skipped whenever anything else is available. Picks
+    and answers cost O(log n) in the learner's answered questions; unseen
+    questions come from an O(1)-memory random permutation of the bucket.
+    At most `max_learners` schedules are kept, least recently used first out.
+    Language None schedules across every language. When the bank is reloaded
+    with different ids in a bucket, the learners' decks for it start over.
+
+    Schedules live in this process: with several workers each keeps its own,
+    so the no-repeat and review guarantees hold per worker only.
+    """
+
+    def __init__(self, bank, intervals=LEITNER_INTERVALS, recent_window=5, max_learners=100_000, rng=None):
+        self.bank = bank
+        self.intervals = intervals
+        self.recent_window = recent_window
+        self.max_learners = max_learners
+        self.evictions = 0
+        self._rng = rng or random.Random()
+        self._learners = OrderedDict()
+        self._signatures = {}
+        self._signature_version = None
+        self._lock = threading.Lock()
+
+    def _learner(self, learner_id):
+        # Caller holds the lock
+        learner = self._learners.get(learner_id)
+        if learner is None:
+            learner = _Learner(self.recent_window)
+            self._learners[learner_id] = learner
+            while len(self._learners) > self.max_learners:
+                self._learners.popitem(last=False)
+                self.evictions += 1
+        else:
+            self._learners.move_to_end(learner_id)
+        return learner
+
+    def _deck(self, learner, language, difficulty, ids):
+        # Caller holds the lock. Bucket signatures are computed once per bank version.
+        version = getattr(self.bank, 'reloads', None)
+        if version != self._signature_version:
+            self._signatures.clear()
+            self._signature_version = version
+        key = (language, difficulty)
+        signature = self._signatures.get(key)
+        if signature is None:
+            signature = self._signatures[key] = hash(tuple(ids))
+        deck = learner.decks.get(key)
+        if deck is None or deck.signature != signature:
+            # New bucket, or the bank was reloaded with other questions in it
+            deck = learner.decks[key] = _Deck(len(ids), signature, self._rng)
+        return deck
+
+    def next_question(self, learner_id, language, difficulty, now=None):
+        """The next question for the learner in this bucket, or None if the bucket is empty."""
+        now = time.time() if now is None else now
+        ids = self.bank.bucket_ids(language, difficulty)
+        if not len(ids):
+            return None
+        with self._lock:
+            learner = self._learner(learner_id)
+            deck = self._deck(learner, language, difficulty, ids)
+
+            recent = learner.recent_set
+            question_id = deck.pop_due(recent, now)
+            if question_id is None:
+                question_id = deck.next_unseen(ids, recent)
+                if question_id is not None:
+                    # Shown but not answered yet: bring it back like a miss if it never is
+                    deck.schedule(question_id, 0, now + self.intervals[0])
+            if question_id is None:
+                question_id = deck.pop_due(recent, math.inf)
+            if question_id is None:
+                # Bucket smaller than the recent window: repeat the oldest one shown
+                question_id = deck.pop_due(set(), math.inf)
+            if question_id is None:
+                # Nothing scheduled yet (e.g. a fresh deck after a reload) and all of
+                # it shown recently, possibly from another bucket: oldest shown first
+                in_bucket = set(ids)
+                question_id = next((shown for shown in learner.recent if shown in in_bucket), None)
+            if question_id is None:
+                return None
+            learner.saw(question_id)
+        return self.bank.get(question_id)
+
+    def record(self, learner_id, question_id, correct, language, difficulty, now=None):
+        """Move the question up a Leitner box on a correct answer, back to box 0 otherwise."""
+        now = time.time() if now is None else now
+        ids = self.bank.bucket_ids(language, difficulty)
+        with self._lock:
+            learner = self._learner(learner_id)
+            deck = self._deck(learner, language, difficulty, ids)
+            box, _ = deck.cards.get(question_id, (0, None))
+            box = min(box + 1, len(self.intervals) - 1) if correct else 0
+            deck.schedule(question_id, box, now + self.intervals[box])
+            learner.saw(question_id)
+
+    def due_count(self, learner_id, language, difficulty, now=None):
+        """How many answered questions in the bucket are due for review."""
+        now = time.time() if now is None else now
+        with self._lock:
+            learner = self._learners.get(learner_id)
+            deck = learner.decks.get((language, difficulty)) if learner else None
+            if deck is None:
+                return 0
+            return sum(1 for _, due in deck.cards.values() if due <= now)
+
+    def stats(self):
+        return {
+            'learners': len(self._learners),
+            'max_learners': self.max_learners,
+            'evictions': self.evictions,
+            'intervals_seconds': list(self.intervals),
+            'recent_window': self.recent_window,
+        }
@@ -0,0 +1,271 @@
+import csv
+import itertools
+import json
+import math
+import multiprocessing
+import os
+import random
+import shutil
+import statistics
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+
+def grid(space):
+    """Every combination of a {param: [values]} space."""
+    names = sorted(space)
+    for values in itertools.product(*(space[name] for name in names)):
+        yield dict(zip(names, values))
+
+
+def _sample_value(spec, rng):
+    if isinstance(spec, list):
+        return rng.choice(spec)
+    low, high = spec['low'], spec['high']
+    if spec.get('log'):
+        value = math.exp(rng.uniform(math.log(low), math.log(high)))
+    else:
+        value = rng.uniform(low, high)
+    return int(round(value)) if spec.get('int') else value
+
+
+def random_search(space, n_trials, seed=0):
+    """`n_trials` samples; each param is a list to choose from or {"low", "high", "log", "int"}."""
+    rng = random.Random(seed)
+    for _ in range(n_trials):
+        yield {name: _sample_value(spec, rng) for name, spec in sorted(space.items())}
+
+
+class MedianStopper:
+    """
+    Median stopping rule shared by all trial processes.
+
+    A trial reporting a score at some step is stopped when at least
+    `min_trials` other trials have reported that step and its score is below
+    their median. Scores are "higher is better".
+    """
+
+    def __init__(self, manager, min_trials=3, warmup_steps=1):
+        self.min_trials = min_trials
+        self.warmup_steps = warmup_steps
+        self._reports = manager.list()
+
+    def should_stop(self, trial_id, step_index, score):
+        others = [s for t, i, s in list(self._reports) if i == step_index and t != trial_id]
+        self._reports.append((trial_id, step_index, score))
+        if step_index < self.warmup_steps or len(others) < self.min_trials:
+            return False
+        return score < statistics.median(others)
+
+
+class TrialPruned(Exception):
+    """Raised inside a trial when the stopper ends it early."""
+
+
+class Reporter:
+    """Handed to a trial function to report intermediate scores."""
+
+    def __init__(self, trial_id, stopper):
+        self.trial_id = trial_id
+        self.stopper = stopper
+        self.history = []
+
+    def report(self, score):
+        self.history.append(score)
+        if self.stopper is not None and self.stopper.should_stop(self.trial_id, len(self.history) - 1, score):
+            raise TrialPruned(f"stopped at report {len(self.history)} with score {score:.4f}")
+
+
+def dqn_trial(params, reporter, trial_dir, seed):
+    """
+    Train a DQN with `params` and score it by mean evaluation reward.
+
+    Reserved params: total_timesteps, n_envs, vec_env, eval_every,
+    eval_episodes; everything else goes to the DQN constructor.
+    """
+    import numpy as np
+    import torch
+    from stable_baselines3 import DQN
+    from stable_baselines3.common.callbacks import BaseCallback
+    from stable_baselines3.common.vec_env import VecMonitor
+
+    from src.policy_eval import evaluate_policy, make_eval_env
+
+    torch.set_num_threads(1)
+    params = dict(params)
+    total_timesteps = int(params.pop('total_timesteps', 5000))
+    n_envs = int(params.pop('n_envs', 1))
+    vec_env = params.pop('vec_env', 'dummy')
+    eval_every = int(params.pop('eval_every', max(total_timesteps // 5, 1)))
+    eval_episodes = int(params.pop('eval_episodes', 100))
+
+    env = make_eval_env(n_envs, vec_env, seed)
+    if vec_env == 'numpy':
+        env = VecMonitor(env)
+
+    class ReportCallback(BaseCallback):
+        # Intermediate score: mean reward of the episodes finished during training so far
+        def _on_step(self):
+            if self.num_timesteps % eval_every < self.training_env.num_envs and self.model.ep_info_buffer:
+                reporter.report(float(np.mean([info['r'] for info in self.model.ep_info_buffer])))
+            return True
+
+    try:
+        model = DQN('MlpPolicy', env, seed=seed, verbose=0, **params)
+        model.learn(total_timesteps=total_timesteps, callback=ReportCallback())
+    finally:
+        env.close()
+
+    eval_env = make_eval_env(min(8, eval_episodes), 'dummy' if vec_env == 'subproc' else vec_env, seed + 1)
+    try:
+        metrics, _ = evaluate_policy(model, eval_env, eval_episodes, seed=seed + 1)
+    finally:
+        eval_env.close()
+    artifact = os.path.join(trial_dir, 'model.zip')
+    model.save(artifact)
+    return metrics['reward_mean'], artifact
+
+
+def forest_trial(params, reporter, trial_dir, seed):
+    """
+    Fit a RandomForest on the train_ml_model.py dataset cache and score it by
+    held-out accuracy, growing trees in stages so bad settings stop early.
+
+    Reserved params: cache_dir, stages, max_rows, test_size; everything else
+    goes to RandomForestClassifier.
+    """
+    import joblib
+    import numpy as np
+    from sklearn.ensemble import RandomForestClassifier
+
+    from src.dataset_cache import StrideSplit, gather_rows, load_cached, sample_positions
+    from src.learner_features import tag_feature_schema
+
+    params = dict(params)
+    X, y, meta = load_cached(params.pop('cache_dir'))
+    stages = int(params.pop('stages', 4))
+    max_rows = params.pop('max_rows', None)
+    test_size = float(params.pop('test_size', 0.2))
+    n_estimators = int(params.pop('n_estimators', 100))
+
+    rng = np.random.default_rng(seed)
+    split = StrideSplit(len(X), test_size)
+    max_rows = None if max_rows is None else int(max_rows)
+    train_rows = split.train_rows(sample_positions(split.n_train, max_rows, rng))
+    test_rows = split.test_rows(sample_positions(split.n_test, max_rows, rng))
+    X_train, y_train = gather_rows(X, train_rows), gather_rows(y, train_rows)
+    X_test, y_test = gather_rows(X, test_rows), gather_rows(y, test_rows)
+
+    clf = RandomForestClassifier(warm_start=True, random_state=seed, n_jobs=1, **params)
+    score = None
+    for stage in range(1, stages + 1):
+        clf.set_params(n_estimators=max(1, round(n_estimators * stage / stages)))
+        clf.fit(X_train, y_train)
+        score = float(np.mean(clf.predict(X_test) == y_test))
+        if stage < stages:
+            reporter.report(score)
+
+    artifact = os.path.join(trial_dir, 'model.pkl')
+    joblib.dump(tag_feature_schema(clf, meta['feature_columns']), artifact)
+    return score, artifact
+
+
+TRIALS = {'dqn': dqn_trial, 'forest': forest_trial}
+
+
+def _pin_worker(cpu_queue):
+    # Each pool process takes one CPU for its lifetime and keeps math libraries to one thread
+    for var in ('OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS'):
+        os.environ[var] = '1'
+    cpu = cpu_queue.get()
+    if cpu is not None and hasattr(os, 'sched_setaffinity'):
+        os.sched_setaffinity(0, {cpu})
+    os.environ['SWEEP_CPU'] = '' if cpu is None else str(cpu)
+
+
+def resolve_trial(kind):
+    """A trial function from TRIALS, or any `module:function` with the same signature."""
+    if kind in TRIALS:
+        return TRIALS[kind]
+    module_name, _, function_name = kind.partition(':')
+    if not function_name:
+        raise ValueError(f"Unknown trial kind {kind!r}; use one of {sorted(TRIALS)} or module:function.")
+    import importlib
+    return getattr(importlib.import_module(module_name), function_name)
+
+
+def _run_trial(kind, trial_id, params, out_dir, seed, stopper):
+    trial_dir = os.path.join(out_dir, f'trial_{trial_id:03d}')
+    os.makedirs(trial_dir, exist_ok=True)
+    reporter = Reporter(trial_id, stopper)
+    start = time.perf_counter()
+    result = {'trial': trial_id, 'params': params, 'cpu': os.environ.get('SWEEP_CPU', ''),
+              'score': None, 'artifact': None, 'status': 'completed', 'error': None}
+    try:
+        result['score'], result['artifact'] = resolve_trial(kind)(params, reporter, trial_dir, seed + trial_id)
+    except TrialPruned as e:
+        result['status'] = 'pruned'
+        result['error'] = str(e)
+        result['score'] = reporter.history[-1]
+    except Exception:
+        result['status'] = 'failed'
+        result['error'] = traceback.format_exc(limit=3)
+    result['reports'] = reporter.history
+    result['seconds'] = time.perf_counter() - start
+    return result
+
+
+def run_sweep(kind, configs, out_dir, workers=None, seed=0, early_stop=True, min_trials=3, log=print):
+    """
+    Run one trial per config on a process pool pinned one process per CPU.
+
+    Returns the results sorted best first and writes them to
+    `out_dir/results.csv` (params as JSON).
+    """
+    configs = list(configs)
+    available = sorted(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else [None] * (os.cpu_count() or 1)
+    workers = min(workers or len(available), len(configs)) or 1
+    os.makedirs(out_dir, exist_ok=True)
+
+    context = multiprocessing.get_context('spawn')
+    manager = context.Manager()
+    cpu_queue = context.Queue()
+    for i in range(workers):
+        cpu_queue.put(available[i % len(available)])
+    stopper = MedianStopper(manager, min_trials) if early_stop else None
+
+    results = []
+    try:
+        with ProcessPoolExecutor(workers, mp_context=context, initializer=_pin_worker, initargs=(cpu_queue,)) as pool:
+            futures = [pool.submit(_run_trial, kind, trial_id, params, out_dir, seed, stopper)
+                       for trial_id, params in enumerate(configs)]
+            for future in as_completed(futures):
+                result = future.result()
+                results.append(result)
+                score = f"{result['score']:.4f}" if result['score'] is not None else "-"
+                log(f"  trial {result['trial']:3d} {result['status']:<9} score {score:>9} "
+                    f"({result['seconds']:.1f}s, cpu {result['cpu'] or '?'}) {json.dumps(result['params'])}")
+    finally:
+        manager.shutdown()
+
+    results.sort(key=lambda r: (r['status'] != 'completed', -(r['score'] if r['score'] is not None else -math.inf)))
+    with open(os.path.join(out_dir, 'results.csv'), 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['trial', 'status', 'score', 'seconds', 'cpu', 'params', 'reports', 'artifact', 'error'])
+        for r in results:
+            writer.writerow([r['trial'], r['status'], r['score'], f"{r['seconds']:.2f}", r['cpu'],
+                             json.dumps(r['params']), json.dumps(r['reports']), r['artifact'], r['error']])
+    return results
+
+
+def publish_best(results, best_path):
+    """Copy the best completed trial's artifact to `best_path`; returns that trial or None."""
+    for result in results:
+        if result['status'] == 'completed' and result['artifact']:
+            os.makedirs(os.path.dirname(best_path) or '.', exist_ok=True)
+            shutil.copyfile(result['artifact'], best_path)
+            with open(os.path.splitext(best_path)[0] + '.json', 'w', encoding='utf-8') as f:
+                json.dump({'trial': result['trial'], 'score': result['score'], 'params': result['params']}, f, indent=2)
+            return result
+    return None
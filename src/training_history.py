@@ -0,0 +1,141 @@
+import numpy as np
+
+from src.npy_stream import NpyStreamWriter
+
+HISTORY_DTYPE = np.dtype([
+    ('step', np.int64),
+    ('difficulty_mean', np.float32),
+    ('difficulty_min', np.float32),
+    ('difficulty_max', np.float32),
+    ('reward_mean', np.float32),
+    ('reward_min', np.float32),
+    ('reward_max', np.float32),
+])
+
+
+class _ParquetStreamWriter:
+    """Row-group-per-flush Parquet writer with the same write/close interface as NpyStreamWriter."""
+
+    def __init__(self, path, dtype):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Exporting training history to Parquet requires pyarrow.") from e
+        self._pa = pa
+        self.path = path
+        self.rows = 0
+        schema = pa.schema([(name, pa.from_numpy_dtype(dtype[name])) for name in dtype.names])
+        self._writer = pq.ParquetWriter(path, schema)
+
+    def write(self, rows):
+        table = self._pa.table({name: rows[name] for name in rows.dtype.names})
+        self._writer.write_table(table)
+        self.rows += len(rows)
+
+    def close(self):
+        self._writer.close()
+
+
+class TrainingHistory:
+    """
+    Fixed-memory recorder for (difficulty, reward) during training.
+
+    Every `window` steps the values seen across all sub-envs are reduced to one
+    row of mean/min/max, which goes into a preallocated ring buffer holding the
+    most recent `capacity` rows. Memory is therefore bounded no matter how long
+    training runs. When `out_path` is given (`.npy` or `.parquet`), every row is
+    also streamed to disk in blocks of `flush_rows`, so the full history is kept
+    on disk even after it has been overwritten in memory.
+    """
+
+    def __init__(self, capacity=100_000, window=1, out_path=None, flush_rows=65536):
+        if capacity < 1 or window < 1:
+            raise ValueError("capacity and window must be positive.")
+        self.capacity = capacity
+        self.window = window
+        self._rows = np.zeros(capacity, dtype=HISTORY_DTYPE)
+        self.rows_recorded = 0
+        self.steps_recorded = 0
+        self._reset_window()
+
+        self._writer = None
+        self._exported = 0
+        # Never let the ring overwrite rows that have not been exported yet
+        self._flush_rows = min(flush_rows, capacity)
+        if out_path is not None:
+            if str(out_path).endswith('.parquet'):
+                self._writer = _ParquetStreamWriter(out_path, HISTORY_DTYPE)
+            else:
+                self._writer = NpyStreamWriter(out_path, HISTORY_DTYPE)
+
+    def _reset_window(self):
+        self._count = 0
+        self._difficulty_sum = self._reward_sum = 0.0
+        self._difficulty_min = self._reward_min = np.inf
+        self._difficulty_max = self._reward_max = -np.inf
+
+    def record(self, difficulties, rewards):
+        """Add one training step; `difficulties` and `rewards` hold one value per sub-env."""
+        difficulties = np.asarray(difficulties, dtype=np.float64).ravel()
+        rewards = np.asarray(rewards, dtype=np.float64).ravel()
+        self._count += len(difficulties)
+        self._difficulty_sum += difficulties.sum()
+        self._difficulty_min = min(self._difficulty_min, difficulties.min())
+        self._difficulty_max = max(self._difficulty_max, difficulties.max())
+        self._reward_sum += rewards.sum()
+        self._reward_min = min(self._reward_min, rewards.min())
+        self._reward_max = max(self._reward_max, rewards.max())
+        self.steps_recorded += 1
+        if self.steps_recorded % self.window == 0:
+            self._emit_window()
+
+    def _emit_window(self):
+        if self._count == 0:
+            return
+        self._rows[self.rows_recorded % self.capacity] = (
+            self.steps_recorded,
+            self._difficulty_sum / self._count, self._difficulty_min, self._difficulty_max,
+            self._reward_sum / self._count, self._reward_min, self._reward_max,
+        )
+        self.rows_recorded += 1
+        self._reset_window()
+        if self._writer is not None and self.rows_recorded - self._exported >= self._flush_rows:
+            self.flush()
+
+    def _last(self, n):
+        """The last `n` rows in recording order (n <= len(self))."""
+        end = self.rows_recorded % self.capacity
+        if n <= end:
+            return self._rows[end - n:end]
+        return np.concatenate([self._rows[self.capacity - (n - end):], self._rows[:end]])
+
+    def flush(self):
+        """Write rows recorded since the last flush to `out_path`."""
+        if self._writer is None or self._exported == self.rows_recorded:
+            return
+        self._writer.write(self._last(self.rows_recorded - self._exported))
+        self._exported = self.rows_recorded
+
+    def close(self):
+        """Emit a trailing partial window and finish the export file."""
+        self._emit_window()
+        if self._writer is not None:
+            self.flush()
+            self._writer.close()
+
+    def __len__(self):
+        return min(self.rows_recorded, self.capacity)
+
+    def to_array(self):
+        """The rows still held in memory, oldest first, as a structured array."""
+        return self._last(len(self)).copy()
+
+    def column(self, name):
+        return self._last(len(self))[name].copy()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
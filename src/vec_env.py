@@ -0,0 +1,139 @@
+import numpy as np
+from gymnasium import spaces
+from stable_baselines3.common.vec_env.base_vec_env import VecEnv
+
+EASY, MEDIUM, HARD = 0, 1, 2
+ACTION_DELTA = np.array([-1, 0, 1])  # 0: EASIER, 1: SAME, 2: HARDER
+
+
+class VectorizedLearningEnv(VecEnv):
+    """
+    N simulated learners stepped together with NumPy array operations.
+
+    This is a separate, simpler learner model, not a vectorized copy of
+    AdaptiveLearningEnv: its dynamics and its 3-value observation are its
+    own. A policy trained here therefore cannot be served by app.py, which
+    feeds the model AdaptiveLearningEnv observations; train_rl_agent.py
+    saves it to its own file for that reason.
+
+    Each learner has a hidden ability in [0, 1] and a learning rate. The
+    probability of answering correctly is a logistic function of ability minus
+    the difficulty level's centre (easy 0.25, medium 0.5, hard 0.75). A correct
+    answer earns (difficulty + 1) / 3 and raises ability; a wrong one costs
+    1/3. Episodes are `episode_length` questions long and reset automatically,
+    following the SB3 VecEnv protocol.
+
+    Observation (float32, all in [0, 1]):
+        [difficulty / 2, running accuracy (EWMA), last answer correct]
+    Actions: 0 = EASIER, 1 = SAME, 2 = HARDER, as in the app's action_map.
+
+    `current_difficulty` and `last_reward` are per-learner arrays, and
+    `get_attr` returns one value per sub-env, like DummyVecEnv does for
+    AdaptiveLearningEnv.
+    """
+
+    render_mode = None
+
+    def __init__(self, num_envs=8, episode_length=20, accuracy_decay=0.8, seed=None):
+        observation_space = spaces.Box(low=0.0, high=1.0, shape=(3,), dtype=np.float32)
+        super().__init__(num_envs, observation_space, spaces.Discrete(3))
+        self.episode_length = episode_length
+        self.accuracy_decay = accuracy_decay
+        self._rng = np.random.default_rng(seed)
+        self._actions = None
+
+        self.current_difficulty = np.zeros(num_envs, dtype=np.int64)
+        self.ability = np.zeros(num_envs)
+        self.learning_rate = np.zeros(num_envs)
+        self.accuracy = np.zeros(num_envs)
+        self.last_correct = np.zeros(num_envs)
+        self.last_reward = np.zeros(num_envs)
+        self.steps = np.zeros(num_envs, dtype=np.int64)
+
+    def _reset_learners(self, mask):
+        n = int(mask.sum())
+        self.current_difficulty[mask] = EASY
+        self.ability[mask] = self._rng.uniform(0.1, 0.7, n)
+        self.learning_rate[mask] = self._rng.uniform(0.01, 0.05, n)
+        self.accuracy[mask] = 0.5
+        self.last_correct[mask] = 0.0
+        self.last_reward[mask] = 0.0
+        self.steps[mask] = 0
+
+    def _observations(self):
+        return np.stack(
+            [self.current_difficulty / 2.0, self.accuracy, self.last_correct], axis=1
+        ).astype(np.float32)
+
+    def reset(self):
+        if self._seeds[0] is not None:
+            self._rng = np.random.default_rng(self._seeds[0])
+        self._reset_seeds()
+        self._reset_learners(np.ones(self.num_envs, dtype=bool))
+        self.reset_infos = [{} for _ in range(self.num_envs)]
+        return self._observations()
+
+    def step_async(self, actions):
+        self._actions = np.asarray(actions, dtype=np.int64).reshape(self.num_envs)
+
+    def step_wait(self):
+        difficulty = np.clip(self.current_difficulty + ACTION_DELTA[self._actions], EASY, HARD)
+        p_correct = 1.0 / (1.0 + np.exp(-8.0 * (self.ability - (0.25 + 0.25 * difficulty))))
+        correct = self._rng.random(self.num_envs) < p_correct
+
+        rewards = np.where(correct, (difficulty + 1) / 3.0, -1.0 / 3.0)
+        self.ability += np.where(correct, self.learning_rate * (1.0 - self.ability) * (0.5 + 0.25 * difficulty), 0.0)
+        self.accuracy = self.accuracy_decay * self.accuracy + (1.0 - self.accuracy_decay) * correct
+        self.last_correct = correct.astype(np.float64)
+        self.current_difficulty = difficulty
+        self.last_reward = rewards
+        self.steps += 1
+
+        dones = self.steps >= self.episode_length
+        infos = [{} for _ in range(self.num_envs)]
+        obs = self._observations()
+        if dones.any():
+            for i in np.flatnonzero(dones):
+                infos[i] = {"terminal_observation": obs[i], "TimeLimit.truncated": True}
+            self._reset_learners(dones)
+            obs[dones] = self._observations()[dones]
+        return obs, rewards.astype(np.float32), dones, infos
+
+    def close(self):
+        pass
+
+    def _indices(self, indices):
+        if indices is None:
+            return range(self.num_envs)
+        if isinstance(indices, int):
+            return [indices]
+        return indices
+
+    def _per_env(self, value, indices):
+        # Per-learner arrays are split across sub-envs; anything else is shared
+        if isinstance(value, np.ndarray) and value.shape[:1] == (self.num_envs,):
+            return [value[i] for i in self._indices(indices)]
+        return [value for _ in self._indices(indices)]
+
+    def get_attr(self, attr_name, indices=None):
+        return self._per_env(getattr(self, attr_name), indices)
+
+    def set_attr(self, attr_name, value, indices=None):
+        current = getattr(self, attr_name, None)
+        if isinstance(current, np.ndarray) and current.shape[:1] == (self.num_envs,):
+            for i in self._indices(indices):
+                current[i] = value
+        else:
+            setattr(self, attr_name, value)
+
+    def env_method(self, method_name, *method_args, indices=None, **method_kwargs):
+        """
+        Call a method of the batched env once and give each requested sub-env
+        its share of the result, as `get_attr` does: row i of a per-learner
+        array, or the whole value otherwise.
+        """
+        value = getattr(self, method_name)(*method_args, **method_kwargs)
+        return self._per_env(value, indices)
+
+    def env_is_wrapped(self, wrapper_class, indices=None):
+        return [False for _ in self._indices(indices)]
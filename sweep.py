@@ -0,0 +1,59 @@
+import argparse
+import json
+import os
+import time
+
+from src.sweep import grid, publish_best, random_search, run_sweep
+
+BEST_PATHS = {
+    'dqn': "model/adaptive_difficulty_dqn_best.zip",
+    'forest': "model/next_difficulty_model_best.pkl",
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Parallel hyperparameter sweep for the DQN agent or the next-difficulty RandomForest.",
+        epilog='Example space: {"learning_rate": {"low": 1e-5, "high": 1e-2, "log": true}, "batch_size": [32, 64]}',
+    )
+    parser.add_argument('kind', help="dqn, forest, or module:function for a custom trial")
+    parser.add_argument('space', help="JSON file (or inline JSON) mapping params to value lists or ranges")
+    parser.add_argument('--random', type=int, default=None, metavar='N',
+                        help="Sample N configs instead of the full grid (needed for ranges)")
+    parser.add_argument('--fixed', default='{}', help="JSON params added to every trial, e.g. a forest cache_dir")
+    parser.add_argument('--workers', type=int, default=None, help="Parallel trials (default: one per CPU)")
+    parser.add_argument('--no-early-stop', action='store_true')
+    parser.add_argument('--min-trials', type=int, default=3,
+                        help="Trials that must report a step before the median rule can stop others")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', default=None, help="Sweep directory (default: model/sweeps/<kind>-<time>)")
+    parser.add_argument('--best', default=None, help="Where to copy the best artifact")
+    args = parser.parse_args()
+
+    if os.path.exists(args.space):
+        with open(args.space, 'r', encoding='utf-8') as f:
+            space = json.load(f)
+    else:
+        space = json.loads(args.space)
+    fixed = json.loads(args.fixed)
+    configs = random_search(space, args.random, args.seed) if args.random else grid(space)
+    configs = [dict(fixed, **config) for config in configs]
+
+    label = args.kind.replace(':', '-').replace('.', '-')
+    out_dir = args.out or os.path.join("model", "sweeps", f"{label}-{time.strftime('%Y%m%d-%H%M%S')}")
+    print(f"🔎 Running {len(configs)} {args.kind} trials -> {out_dir}")
+    start = time.perf_counter()
+    results = run_sweep(args.kind, configs, out_dir, args.workers, args.seed,
+                        early_stop=not args.no_early_stop, min_trials=args.min_trials)
+    print(f"⏱️ Sweep finished in {time.perf_counter() - start:.1f}s; results in {os.path.join(out_dir, 'results.csv')}")
+
+    best_path = args.best or BEST_PATHS.get(args.kind, os.path.join(out_dir, 'best'))
+    best = publish_best(results, best_path)
+    if best is None:
+        print("❌ No trial completed.")
+        return
+    print(f"✅ Best trial {best['trial']} scored {best['score']:.4f} with {json.dumps(best['params'])} -> {best_path}")
+
+
+if __name__ == "__main__":
+    main()
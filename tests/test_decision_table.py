@@ -0,0 +1,46 @@
+"""
+DecisionTable must serve the actions it was built from, and refuse a meta
+that belongs to another build of the table.
+
+Run from the project root:
+    python -m pytest tests/test_decision_table.py
+"""
+import shutil
+
+import numpy as np
+import pytest
+
+from src.decision_table import DecisionTable, build_decision_table
+
+
+class ModuloPolicy:
+    """Stands in for a PolicyRunner over a Discrete space: action = observation % n_actions."""
+
+    def __init__(self, n=50, n_actions=3):
+        self.observation = {'kind': 'discrete', 'n': n}
+        self.n_actions = n_actions
+
+    def predict(self, obs, deterministic=True):
+        return np.asarray(obs) % self.n_actions, None
+
+
+def test_table_matches_policy(tmp_path):
+    policy = ModuloPolicy()
+    path = str(tmp_path / "table.npy")
+    build_decision_table(policy, path, log=lambda *_: None)
+    table = DecisionTable(path)
+    obs = np.arange(50)
+    actions, _ = table.predict(obs)
+    np.testing.assert_array_equal(actions, obs % 3)
+    assert table.predict(7)[0] == 1
+
+
+def test_meta_from_another_build_is_refused(tmp_path):
+    # Same grid, so only the build id tells the pairs apart: this is what a
+    # loader sees between the meta and table renames of a rebuild
+    old_path, new_path = str(tmp_path / "old.npy"), str(tmp_path / "new.npy")
+    build_decision_table(ModuloPolicy(n_actions=3), old_path, log=lambda *_: None)
+    build_decision_table(ModuloPolicy(n_actions=2), new_path, log=lambda *_: None)
+    shutil.copy(str(tmp_path / "new.json"), str(tmp_path / "old.json"))
+    with pytest.raises(ValueError, match="build"):
+        DecisionTable(old_path)
@@ -0,0 +1,73 @@
+"""
+CompiledForest must reproduce the sklearn forest it was exported from exactly.
+
+Run from the project root:
+    python -m pytest tests/test_forest_export.py
+"""
+import os
+import pickle
+
+import numpy as np
+import pytest
+
+ensemble = pytest.importorskip("sklearn.ensemble")
+
+from src.forest_export import CompiledForest, export_forest
+from src.learner_features import FEATURE_COLUMNS, model_feature_columns, tag_feature_schema
+
+MODEL_PATH = "model/next_difficulty_model.pkl"
+N_ROWS = 20000
+
+
+def synthetic_data(seed=0, rows=5000):
+    rng = np.random.default_rng(seed)
+    X = rng.random((rows, len(FEATURE_COLUMNS)), dtype=np.float32)
+    y = np.digitize(X[:, :3].mean(axis=1), [0.4, 0.6])
+    return X, y
+
+
+def compiled(forest, tmp_path):
+    path = str(tmp_path / "forest.npz")
+    export_forest(forest, path)
+    return CompiledForest(path)
+
+
+def test_classifier_predictions_are_identical(tmp_path):
+    X, y = synthetic_data()
+    clf = ensemble.RandomForestClassifier(n_estimators=50, random_state=0).fit(X, y)
+    forest = compiled(clf, tmp_path)
+
+    rows = np.random.default_rng(1).random((N_ROWS, X.shape[1]), dtype=np.float32)
+    np.testing.assert_array_equal(forest.predict(rows), clf.predict(rows))
+    np.testing.assert_array_equal(forest.predict_proba(rows), clf.predict_proba(rows))
+    np.testing.assert_array_equal(forest.predict(rows[0]), clf.predict(rows[:1]))
+
+
+def test_string_classes_are_kept(tmp_path):
+    X, y = synthetic_data()
+    labels = np.array(["easy", "medium", "hard"])[y]
+    clf = ensemble.RandomForestClassifier(n_estimators=10, random_state=0).fit(X, labels)
+    rows = np.random.default_rng(2).random((1000, X.shape[1]), dtype=np.float32)
+    np.testing.assert_array_equal(compiled(clf, tmp_path).predict(rows), clf.predict(rows))
+
+
+def test_regressor_predictions_are_identical(tmp_path):
+    X, y = synthetic_data()
+    reg = ensemble.RandomForestRegressor(n_estimators=20, random_state=0).fit(X, y.astype(np.float64))
+    rows = np.random.default_rng(3).random((N_ROWS, X.shape[1]), dtype=np.float32)
+    np.testing.assert_array_equal(compiled(reg, tmp_path).predict(rows), reg.predict(rows))
+
+
+def test_feature_schema_travels_with_the_export(tmp_path):
+    X, y = synthetic_data()
+    clf = ensemble.RandomForestClassifier(n_estimators=5, random_state=0).fit(X, y)
+    tag_feature_schema(clf, FEATURE_COLUMNS)
+    assert model_feature_columns(compiled(clf, tmp_path)) == list(FEATURE_COLUMNS)
+
+
+@pytest.mark.skipif(not os.path.exists(MODEL_PATH), reason=f"{MODEL_PATH} not found")
+def test_production_model_predictions_are_identical(tmp_path):
+    with open(MODEL_PATH, "rb") as f:
+        clf = pickle.load(f)
+    rows = np.random.default_rng(4).random((N_ROWS, clf.n_features_in_), dtype=np.float32)
+    np.testing.assert_array_equal(compiled(clf, tmp_path).predict(rows), clf.predict(rows))
@@ -0,0 +1,58 @@
+"""
+PolicyRunner must pick the same greedy actions as the DQN it was exported from.
+
+Run from the project root:
+    python -m pytest tests/test_policy_runner.py
+"""
+import os
+
+import numpy as np
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("gymnasium")
+stable_baselines3 = pytest.importorskip("stable_baselines3")
+
+from src.policy_export import PolicyRunner, export_dqn_policy
+
+MODEL_PATH = "model/adaptive_difficulty_dqn_v4.zip"
+N_OBSERVATIONS = 512
+
+
+def untrained_dqn(env_id):
+    # Randomly initialised weights are enough: parity is about the forward
+    # pass, not about what the network has learned.
+    return stable_baselines3.DQN("MlpPolicy", env_id, policy_kwargs={"net_arch": [32, 32]},
+                                 device="cpu", seed=0)
+
+
+def sampled_observations(model, n=N_OBSERVATIONS, seed=0):
+    model.observation_space.seed(seed)
+    return np.stack([np.asarray(model.observation_space.sample()) for _ in range(n)])
+
+
+def assert_same_actions(model, path):
+    export_dqn_policy(model, path, "float32")
+    runner = PolicyRunner(path)
+    obs = sampled_observations(model)
+
+    expected, _ = model.predict(obs, deterministic=True)
+    actions, _ = runner.predict(obs, deterministic=True)
+    np.testing.assert_array_equal(actions, expected)
+
+    for single in obs[:32]:
+        expected, _ = model.predict(single, deterministic=True)
+        action, _ = runner.predict(single, deterministic=True)
+        assert int(action) == int(expected)
+
+
+@pytest.mark.parametrize("env_id", ["CartPole-v1", "FrozenLake-v1"])
+def test_untrained_policy_matches_dqn_predict(env_id, tmp_path):
+    # CartPole has a Box observation, FrozenLake a Discrete one (one-hot input)
+    assert_same_actions(untrained_dqn(env_id), str(tmp_path / "policy.npz"))
+
+
+@pytest.mark.skipif(not os.path.exists(MODEL_PATH), reason=f"{MODEL_PATH} not found")
+def test_production_policy_matches_dqn_predict(tmp_path):
+    model = stable_baselines3.DQN.load(MODEL_PATH, device="cpu")
+    assert_same_actions(model, str(tmp_path / "policy.npz"))
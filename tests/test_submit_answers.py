@@ -0,0 +1,78 @@
+"""
+/submit_answer and /submit_answers must record answers through the learner
+store and reject times that would corrupt a learner's features or schedule.
+
+Run from the project root:
+    python -m pytest tests/test_submit_answers.py
+"""
+import os
+import time
+
+import pytest
+
+pytest.importorskip("flask")
+
+
+@pytest.fixture(scope="module")
+def app_module():
+    os.environ.setdefault("TUTOR_WARM_UP", "0")
+    os.environ.pop("LEARNER_STORE_DB", None)
+    import app
+    return app
+
+
+@pytest.fixture
+def client(app_module):
+    return app_module.app.test_client()
+
+
+def test_submit_answer(app_module, client):
+    question = app_module.question_bank.get(0)
+    response = client.post('/submit_answer', data={
+        'question_id': 0, 'answer': question['answer'], 'correct_answer': question['answer'], 'time_taken': '4.5',
+    })
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['result'] == "correct"
+    assert body['next_difficulty'] == "medium"
+
+
+@pytest.mark.parametrize("time_taken", ["inf", "nan", "-3"])
+def test_submit_answer_ignores_invalid_times(app_module, client, time_taken):
+    response = client.post('/submit_answer', data={'answer': 'a', 'correct_answer': 'b', 'time_taken': time_taken})
+    assert response.status_code == 200
+    assert response.get_json()['result'] == "incorrect"
+    with client.session_transaction() as session:
+        learner = app_module.learner_store.get(session['learner_id'])
+    assert learner.attempts == 1
+    assert learner.mean_seconds == 0.0  # the answer was recorded as untimed
+
+
+def test_submit_answers(client):
+    now = time.time()
+    response = client.post('/submit_answers', json={'attempts': [
+        {'answer': 'b', 'correct_answer': 'b', 'question_id': 0, 'time_taken': 3, 'answered_at': now - 60},
+        {'answer': 'a', 'correct_answer': 'b', 'time_taken': 7.5},
+        {'answer': 'b', 'correct_answer': 'b'},
+    ]})
+    assert response.status_code == 200
+    body = response.get_json()
+    assert [r['result'] for r in body['results']] == ["correct", "incorrect", "correct"]
+    assert [r['next_difficulty'] for r in body['results']] == ["medium", "easy", "medium"]
+    assert body['next_difficulty'] == "medium"
+
+
+@pytest.mark.parametrize("field, value", [
+    ('time_taken', -1),
+    ('time_taken', 1e400),  # parsed as inf
+    ('time_taken', True),
+    ('answered_at', 0),
+    ('answered_at', "yesterday"),
+])
+def test_submit_answers_rejects_invalid_times(client, field, value):
+    response = client.post('/submit_answers', json={'attempts': [
+        {'answer': 'b', 'correct_answer': 'b'},
+        {'answer': 'b', 'correct_answer': 'b', field: value},
+    ]})
+    assert response.status_code == 200
+    assert response.get_json()['error'].startswith("Attempt 1 ")
@@ -0,0 +1,70 @@
+import argparse
+import json
+import os
+import random
+import time
+
+from src.grammar_filter import GrammarFilter, evaluate, load_pairs
+
+THRESHOLDS = [0.02, 0.05, 0.1, 0.2, 0.3, 0.5]
+
+
+def label_with_model(sentences, batch_size=32):
+    """Run the real grammar model over plain sentences to get training pairs."""
+    from src.grammar_batcher import correct_grammar_batch
+    corrected = []
+    for start in range(0, len(sentences), batch_size):
+        corrected.extend(correct_grammar_batch(sentences[start:start + batch_size]))
+        print(f"  labelled {len(corrected):,}/{len(sentences):,} sentences")
+    return corrected
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Train the grammar fast-path filter on sentences labelled by the grammar model."
+    )
+    parser.add_argument('data', help='.jsonl of {"sentence", "corrected"} pairs, or .txt with one sentence per line '
+                                     '(labelled by running the model)')
+    parser.add_argument('--out', default="model/grammar_filter.json")
+    parser.add_argument('--pairs-out', default=None, help="Save model-labelled pairs as .jsonl for reuse")
+    parser.add_argument('--test-size', type=float, default=0.2, help="Held-out share for the report")
+    parser.add_argument('--epochs', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    if args.data.endswith('.jsonl'):
+        sentences, corrected = load_pairs(args.data)
+    else:
+        with open(args.data, 'r', encoding='utf-8') as f:
+            sentences = [line.strip() for line in f if line.strip()]
+        corrected = label_with_model(sentences)
+        if args.pairs_out:
+            with open(args.pairs_out, 'w', encoding='utf-8') as f:
+                for sentence, fixed in zip(sentences, corrected):
+                    f.write(json.dumps({'sentence': sentence, 'corrected': fixed}) + "\n")
+
+    pairs = list(zip(sentences, corrected))
+    random.Random(args.seed).shuffle(pairs)
+    n_test = int(len(pairs) * args.test_size)
+    test, train = pairs[:n_test], pairs[n_test:]
+    print(f"🧹 Training on {len(train):,} sentences, holding out {len(test):,}")
+
+    start = time.perf_counter()
+    train_sentences = [s for s, _ in train]
+    labels = [GrammarFilter.label(s, c) for s, c in train]
+    grammar_filter = GrammarFilter.fit(train_sentences, labels, epochs=args.epochs, seed=args.seed)
+    print(f"⏱️ Trained in {time.perf_counter() - start:.1f}s; {len(grammar_filter.weights):,} non-zero weights")
+
+    if test:
+        print("  threshold  skip rate  wrong skips  accuracy")
+        for row in evaluate(grammar_filter, [s for s, _ in test], [c for _, c in test], THRESHOLDS):
+            print(f"  {row['threshold']:9.2f}  {row['skip_rate']:9.1%}  {row['wrong_skip_rate']:11.2%}  "
+                  f"{row['accuracy']:8.2%}")
+
+    os.makedirs(os.path.dirname(args.out) or '.', exist_ok=True)
+    grammar_filter.save(args.out)
+    print(f"✅ Filter saved to {args.out}; serve it with GRAMMAR_FILTER_PATH={args.out}")
+
+
+if __name__ == "__main__":
+    main()
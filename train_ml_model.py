@@ -1,28 +1,113 @@
-import pandas as pd
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import train_test_split
-import joblib
+import argparse
 import os
+import time
+
+import joblib
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+
+from src.dataset_cache import DEFAULT_CHUNK_SIZE, StrideSplit, cache_csv, gather_rows, load_cached, sample_positions
+from src.learner_features import FEATURE_COLUMNS, tag_feature_schema
+from src.memory import peak_rss_bytes
+
+MODEL_PATH = "model/next_difficulty_model.pkl"
+
+
+def log_progress(message, start):
+    peak = peak_rss_bytes()
+    peak_text = f", peak RSS {peak / 2**20:,.0f} MiB" if peak is not None else ""
+    print(f"[{time.perf_counter() - start:7.1f}s{peak_text}] {message}")
+
+
+def train_subsample(X, y, split, args, rng):
+    """Fit one forest on a uniform sample of at most --max-rows training rows."""
+    rows = split.train_rows(sample_positions(split.n_train, args.max_rows or None, rng))
+    clf = RandomForestClassifier(n_estimators=args.n_estimators, random_state=args.seed, n_jobs=args.n_jobs)
+    clf.fit(gather_rows(X, rows, args.chunk_size), gather_rows(y, rows, args.chunk_size))
+    return clf
+
+
+def train_incremental(X, y, split, args, rng, start):
+    """Grow the forest block by block: each block of --block-rows rows adds its share of the trees."""
+    # Strided rather than contiguous blocks, so each one is spread over the whole
+    # file and sees every class even when the log is ordered
+    n_blocks = max(1, -(-split.n_train // args.block_rows))
+    clf = RandomForestClassifier(n_estimators=0, warm_start=True, random_state=args.seed, n_jobs=args.n_jobs)
+    trees = 0
+    for i in range(n_blocks):
+        trees_after = round(args.n_estimators * (i + 1) / n_blocks)
+        if trees_after == trees:
+            continue
+        block = split.train_rows(np.arange(i, split.n_train, n_blocks))
+        clf.set_params(n_estimators=trees_after)
+        classes = getattr(clf, 'classes_', None)
+        clf.fit(gather_rows(X, block, args.chunk_size), gather_rows(y, block, args.chunk_size))
+        if classes is not None and not np.array_equal(classes, clf.classes_):
+            raise ValueError(f"Block {i + 1} has classes {clf.classes_}, earlier blocks had {classes}; use larger blocks.")
+        trees = trees_after
+        log_progress(f"block {i + 1}/{n_blocks}: {trees} trees", start)
+    return clf
+
+
+def evaluate(clf, X, y, split, args, rng):
+    rows = split.test_rows(sample_positions(split.n_test, args.eval_rows, rng))
+    if not len(rows):
+        return None
+    predicted = clf.predict(gather_rows(X, rows, args.chunk_size))
+    return float(np.mean(predicted == gather_rows(y, rows, args.chunk_size)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the next-difficulty RandomForest out of core.")
+    parser.add_argument('--csv', default='../finall.csv')
+    parser.add_argument('--cache-dir', default=None, help="Where the parsed dataset is kept (default: next to the CSV)")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help="CSV rows parsed, and cached rows read, at a time")
+    parser.add_argument('--feature-dtype', choices=['float32', 'float64'], default='float32',
+                        help="Precision the features are cached and trained in")
+    parser.add_argument('--mode', choices=['subsample', 'incremental'], default='subsample',
+                        help="subsample: one fit on --max-rows rows; incremental: trees added per --block-rows block")
+    parser.add_argument('--max-rows', type=int, default=1_000_000,
+                        help="Training rows sampled in subsample mode (0: all of them, which must fit in memory)")
+    parser.add_argument('--block-rows', type=int, default=1_000_000)
+    parser.add_argument('--n-estimators', type=int, default=100)
+    parser.add_argument('--n-jobs', type=int, default=-1)
+    parser.add_argument('--test-size', type=float, default=0.2)
+    parser.add_argument('--eval-rows', type=int, default=1_000_000, help="Held-out rows scored for accuracy")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--out', default=MODEL_PATH)
+    args = parser.parse_args()
 
-# Load your dataset
-df = pd.read_csv('../finall.csv')
+    start = time.perf_counter()
+    rng = np.random.default_rng(args.seed)
+    cache_dir = args.cache_dir or os.path.splitext(args.csv)[0] + '.cache'
+    cache_csv(args.csv, cache_dir, chunk_size=args.chunk_size, feature_dtype=args.feature_dtype,
+              log=lambda message: log_progress(message, start))
+    X, y, meta = load_cached(cache_dir)
+    log_progress(f"dataset ready: {meta['rows']:,} rows x {len(meta['feature_columns'])} features", start)
 
-# Separate features and target
-X = df.drop(columns=["next_difficulty"])
-y = df["next_difficulty"]
+    split = StrideSplit(len(X), args.test_size)
+    if args.mode == 'incremental':
+        clf = train_incremental(X, y, split, args, rng, start)
+    else:
+        clf = train_subsample(X, y, split, args, rng)
+    log_progress(f"trained {len(clf.estimators_)} trees ({args.mode})", start)
+    tag_feature_schema(clf, meta['feature_columns'])
+    if meta['feature_columns'] != FEATURE_COLUMNS:
+        log_progress("warning: the CSV's columns are not the app's feature schema; app.py will refuse this model", start)
 
-# Train-test split
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    accuracy = evaluate(clf, X, y, split, args, rng)
+    if accuracy is not None:
+        log_progress(f"held-out accuracy: {accuracy:.4f}", start)
 
-# Create and train model
-clf = RandomForestClassifier(n_estimators=100, random_state=42)
-clf.fit(X_train, y_train)
+    # Ensure model directory exists
+    os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
 
-# Ensure model directory exists
-os.makedirs("model", exist_ok=True)
+    # Save the trained model
+    joblib.dump(clf, args.out)
 
-# Save the trained model
-joblib.dump(clf, "model/next_difficulty_model.pkl")
+    log_progress(f"Model trained and saved successfully at {args.out}!", start)
 
-print("Model trained and saved successfully!")
 
+if __name__ == "__main__":
+    main()
@@ -1,59 +1,80 @@
 # File: src/train_rl_agent.py
+import argparse
 import os
+import numpy as np
 import matplotlib.pyplot as plt
 from stable_baselines3 import DQN
 from stable_baselines3.common.callbacks import BaseCallback
-from rl_env import AdaptiveLearningEnv
+from stable_baselines3.common.env_util import make_vec_env
+from stable_baselines3.common.vec_env import DummyVecEnv, SubprocVecEnv, VecMonitor
+from src.rl_env import AdaptiveLearningEnv
+from src.vec_env import VectorizedLearningEnv
+from src.training_history import TrainingHistory
 
 # Path to save the trained model (relative to project root)
 SAVE_PATH = os.path.abspath(
     os.path.join(os.path.dirname(__file__), '..', 'model', 'adaptive_difficulty_dqn_v4.zip')
 )
+# Agents trained on VectorizedLearningEnv see a different observation than the
+# app gives the production model, so they never overwrite it
+VECTORIZED_SAVE_PATH = os.path.join(os.path.dirname(SAVE_PATH), 'adaptive_difficulty_dqn_vectorized.zip')
 
 class HistoryCallback(BaseCallback):
-    def __init__(self, verbose=0):
+    """Records (difficulty, reward) for every sub-env at every step into a TrainingHistory."""
+
+    def __init__(self, history=None, verbose=0):
         super().__init__(verbose)
+        self.history = history if history is not None else TrainingHistory()
 
     def _on_step(self) -> bool:
-        # Access the VecEnv and unwrap the Monitor wrapper to the base env
-        vec_env = self.training_env
-        wrapped_env = vec_env.envs[0]
-        # Unwrap Monitor or any other wrappers
-        if hasattr(wrapped_env, 'env'):
-            base_env = wrapped_env.env
-        else:
-            base_env = wrapped_env
-        # Append (difficulty, reward) from the base env
-        base_env.history.append((base_env.current_difficulty, base_env.last_reward))
+        # get_attr unwraps Monitor and works for Dummy/Subproc and the NumPy env alike
+        difficulties = np.asarray(self.training_env.get_attr('current_difficulty'), dtype=np.float32)
+        self.history.record(difficulties, self.locals['rewards'])
         return True
 
+    def _on_training_end(self) -> None:
+        self.history.close()
+
+
+def make_training_env(n_envs=1, vec_env='dummy', seed=None):
+    """Build the training VecEnv: N copies of AdaptiveLearningEnv, or the NumPy-vectorized learners."""
+    if vec_env == 'numpy':
+        return VecMonitor(VectorizedLearningEnv(num_envs=n_envs, seed=seed))
+    vec_env_cls = SubprocVecEnv if vec_env == 'subproc' else DummyVecEnv
+    return make_vec_env(AdaptiveLearningEnv, n_envs=n_envs, seed=seed, vec_env_cls=vec_env_cls)
+
 
-def train():
-    print("⚙️ Initializing Environment...")
-    env = AdaptiveLearningEnv()
+def train(n_envs=1, vec_env='dummy', total_timesteps=5000, seed=None,
+          history_capacity=100_000, history_window=1, history_out=None):
+    print(f"⚙️ Initializing Environment ({n_envs} x {vec_env})...")
+    env = make_training_env(n_envs, vec_env, seed)
 
     print("🚀 Starting Training...")
-    model = DQN(policy='MlpPolicy', env=env, verbose=1)
-    callback = HistoryCallback()
+    model = DQN(policy='MlpPolicy', env=env, verbose=1, seed=seed)
+    callback = HistoryCallback(TrainingHistory(history_capacity, history_window, history_out))
 
-    model.learn(total_timesteps=5000, callback=callback)
+    model.learn(total_timesteps=total_timesteps, callback=callback)
+    env.close()
 
     # Ensure 'model' directory exists
-    os.makedirs(os.path.dirname(SAVE_PATH), exist_ok=True)
-    model.save(SAVE_PATH)
-    print(f"✅ Model saved at {SAVE_PATH}")
-
-    # Visualize training history from the base env
-    # Access the history directly from the unwrapped env
-    history = env.history
-    if not history:
+    save_path = VECTORIZED_SAVE_PATH if vec_env == 'numpy' else SAVE_PATH
+    os.makedirs(os.path.dirname(save_path), exist_ok=True)
+    model.save(save_path)
+    print(f"✅ Model saved at {save_path}")
+
+    if history_out:
+        print(f"✅ Training history saved at {history_out}")
+
+    # Visualize the most recent training history, averaged over the sub-envs and window
+    history = callback.history
+    if not len(history):
         print("❌ No training data to visualize.")
         return
 
-    difficulties, rewards = zip(*history)
+    steps = history.column('step')
     plt.figure(figsize=(10, 5))
-    plt.plot(difficulties, label="Difficulty")
-    plt.plot(rewards, label="Reward")
+    plt.plot(steps, history.column('difficulty_mean'), label="Difficulty")
+    plt.plot(steps, history.column('reward_mean'), label="Reward")
     plt.xlabel("Step")
     plt.ylabel("Value")
     plt.title("Training History: Difficulty & Reward over Time")
@@ -62,5 +83,20 @@ def train():
     plt.show()
 
 if __name__ == '__main__':
-    train()
-
+    parser = argparse.ArgumentParser(description="Train the adaptive-difficulty DQN agent.")
+    parser.add_argument('--n-envs', type=int, default=1, help="Number of parallel learners")
+    parser.add_argument('--vec-env', choices=['dummy', 'subproc', 'numpy'], default='dummy',
+                        help="dummy/subproc: copies of AdaptiveLearningEnv; numpy: VectorizedLearningEnv, "
+                             "a separate learner model whose agent is saved next to, not over, the app's")
+    parser.add_argument('--timesteps', type=int, default=5000)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--history-capacity', type=int, default=100_000,
+                        help="Most recent history rows kept in memory for the plot")
+    parser.add_argument('--history-window', type=int, default=1,
+                        help="Steps aggregated (mean/min/max) into one history row")
+    parser.add_argument('--history-out', default=None,
+                        help="Stream the full history to this .npy or .parquet file")
+    args = parser.parse_args()
+    train(n_envs=args.n_envs, vec_env=args.vec_env, total_timesteps=args.timesteps, seed=args.seed,
+          history_capacity=args.history_capacity, history_window=args.history_window,
+          history_out=args.history_out)